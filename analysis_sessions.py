@@ -0,0 +1,94 @@
+import os
+from collections import OrderedDict
+
+# Sesiones terminadas que se mantienen en memoria (las menos usadas se descartan)
+ANALYSIS_SESSIONS_MAX = int(os.getenv('ANALYSIS_SESSIONS_MAX', '8'))
+
+QUEUED = "En cola"
+RUNNING = "Analizando"
+COMPLETED = "Completado"
+CANCELLED = "Cancelado"
+FAILED = "Error"
+FINISHED = (COMPLETED, CANCELLED, FAILED)
+
+
+def session_key(symbol, model_name):
+    return f"{symbol}|{model_name}"
+
+
+class AnalysisSession:
+    """Estado y resultados del análisis de un símbolo con un modelo"""
+
+    def __init__(self, symbol, name, model_name, task):
+        self.key = session_key(symbol, model_name)
+        self.symbol = symbol
+        self.name = name
+        self.model_name = model_name
+        self.task = task
+        self.status = QUEUED
+        self.progress = 0
+        self.status_text = "En cola, esperando un worker libre..."
+        self.dataset_info = "Analizando..."
+        self.error = None
+
+        # Resultados (se completan al recibir el resultado del worker)
+        self.stock_data = None
+        self.predictors = None
+        self.predictions = None
+        self.evaluation = None
+        self.feature_importance = None
+        self.profiler = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+
+class SessionStore:
+    """
+    Sesiones de análisis por (símbolo, modelo) en orden de uso.
+
+    Las sesiones en cola o en curso nunca se descartan; de las terminadas se
+    conservan las `max_finished` usadas más recientemente.
+    """
+
+    def __init__(self, max_finished=ANALYSIS_SESSIONS_MAX):
+        self.max_finished = max_finished
+        self.sessions = OrderedDict()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+    def get(self, key):
+        return self.sessions.get(key)
+
+    def by_task(self, task):
+        for session in self.sessions.values():
+            if session.task == task:
+                return session
+        return None
+
+    def add(self, session):
+        """Agrega (o reemplaza) una sesión como la más reciente"""
+        self.sessions.pop(session.key, None)
+        self.sessions[session.key] = session
+
+    def touch(self, key):
+        if key in self.sessions:
+            self.sessions.move_to_end(key)
+
+    def evict(self, keep=None):
+        """Descarta las sesiones terminadas menos usadas por encima del límite; devuelve las descartadas"""
+        finished = [session for session in self.sessions.values() if session.status in FINISHED]
+        limit = self.max_finished
+        if keep in self.sessions and self.sessions[keep].status in FINISHED:
+            # La sesión que se está mostrando se conserva y ocupa un lugar
+            finished = [session for session in finished if session.key != keep]
+            limit -= 1
+        evicted = finished[:max(0, len(finished) - max(limit, 0))]
+        for session in evicted:
+            del self.sessions[session.key]
+        return evicted
@@ -0,0 +1,413 @@
+"""
+Análisis de símbolos en procesos aparte de la interfaz gráfica.
+
+El armado de features, el backtest y FinBERT retienen el GIL; corriendo en
+procesos hijos el loop de Tk no se traba. Un pool acotado de workers toma las
+tareas (análisis de un símbolo, comparación de modelos o predicción de la próxima
+sesión) de una cola compartida y responde por otra con mensajes estructurados:
+
+    {'type': 'started', 'task': id, 'worker': "analysis-worker-1"}
+    {'type': 'progress', 'task': id, 'value': 40, 'status': "..."}
+    {'type': 'log', 'task': id, 'text': "..."}
+    {'type': 'dataset_info', 'task': id, 'info': "..."}
+    {'type': 'result', 'task': id, 'arrays': {...}, ...}
+    {'type': 'cancelled' | 'error', 'task': id, ...}
+    {'type': 'done', 'task': id}
+
+Los arrays del resultado (matriz de features, predicciones, importancias) y la
+matriz que la GUI envía para comparar modelos viajan en bloques de memoria
+compartida: la cola solo lleva sus nombres y formas.
+"""
+import os
+import queue
+import threading
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+# Procesos del pool de análisis (por defecto la mitad de los núcleos, hasta 4)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', str(max(1, min(4, (os.cpu_count() or 1) // 2)))))
+# Segundos que se espera a cada worker antes de terminarlo al cerrar la aplicación
+WORKER_SHUTDOWN_TIMEOUT = 2
+# Tamaño del anillo de tareas canceladas compartido con los workers
+CANCEL_SLOTS = 1024
+
+
+def share_arrays(arrays):
+    """Copia cada array a un bloque de memoria compartida y devuelve sus descriptores"""
+    descriptors = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        descriptors[name] = (block.name, array.shape, array.dtype.str)
+        block.close()
+    return descriptors
+
+
+def attach_arrays(descriptors):
+    """Lee los arrays de share_arrays y libera los bloques de memoria compartida"""
+    arrays = {}
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        try:
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+    return arrays
+
+
+def release_arrays(descriptors):
+    """Libera los bloques de un resultado que no se va a leer (por ejemplo, de una tarea cancelada)"""
+    for block_name, _, _ in descriptors.values():
+        try:
+            block = shared_memory.SharedMemory(name=block_name)
+        except FileNotFoundError:
+            continue
+        block.close()
+        block.unlink()
+
+
+def index_to_array(index):
+    """Fechas como int64 (ns UTC) más la zona horaria para reconstruir el índice"""
+    return index.values.astype('datetime64[ns]').view('int64'), (str(index.tz) if index.tz else None, index.name)
+
+
+def array_to_index(values, meta):
+    tz, name = meta
+    index = pd.DatetimeIndex(values.view('datetime64[ns]'), name=name)
+    return index.tz_localize('UTC').tz_convert(tz) if tz else index
+
+
+def share_matrix(matrix):
+    """Descriptor de un FeatureMatrix en memoria compartida para enviarlo con una tarea"""
+    dates, index_meta = index_to_array(matrix.index)
+    return {'predictors': matrix.predictors, 'index_meta': index_meta,
+            'arrays': share_arrays({'X': matrix.X, 'y': matrix.y, 'dates': dates})}
+
+
+def attach_matrix(shared):
+    """Reconstruye (y libera) el FeatureMatrix de share_matrix"""
+    from data_from_stock import FeatureMatrix
+
+    arrays = attach_arrays(shared['arrays'])
+    return FeatureMatrix(arrays['X'], arrays['y'], array_to_index(arrays['dates'], shared['index_meta']),
+                         shared['predictors'])
+
+
+def _create_task_model(task):
+    """Modelo de la tarea; cada worker del pool usa su parte de los núcleos"""
+    from models import create_model
+
+    return create_model(task['model_name'], n_jobs=task.get('n_jobs'))
+
+
+def predictions_path(stock_symbol, model_name):
+    """CSV de predicciones de una sesión: uno por símbolo y modelo, así los workers no se pisan"""
+    safe_symbol = stock_symbol.upper().replace('/', '_').replace('^', '_')
+    return f"predictions_{safe_symbol}_{model_name}.csv"
+
+
+def run_analysis(task, emit, cancel_token):
+    """
+    Etapas del análisis (datos, backtesting e importancia) dentro del worker.
+    `emit` envía un mensaje a la GUI; devuelve el mensaje 'result'.
+    """
+    # Imports pesados solo en el proceso del worker
+    from data_from_stock import load_feature_matrix
+    from stock_analysis import backtest
+    from models import model_label, feature_importances
+    from news_analysis import clear_sentiment_cache, sentiment_model
+    from model_cache import model_cache
+
+    def progress(value, status):
+        emit({'type': 'progress', 'value': value, 'status': status})
+
+    def log(text):
+        emit({'type': 'log', 'text': text})
+
+    def report_fold(fold):
+        source = "cache" if fold['cached'] else f"{fold['seconds']:.1f}s"
+        progress(40 + 30 * fold['completed'] / fold['folds'],
+                 f"Backtesting: {fold['completed']}/{fold['folds']} pasos (accuracy {fold['accuracy']:.2%}, {source})")
+        log(f"  🔁 Paso {fold['fold']}/{fold['folds']}: {fold['train_rows']} filas de entrenamiento, "
+            f"{fold['predictions']} predicciones, accuracy {fold['accuracy']:.2%} ({source})")
+
+    def warm_up_sentiment_model():
+        try:
+            sentiment_model.warm_up()
+            log("🧠 Modelo de sentimiento cargado")
+        except Exception as e:
+            log(f"⚠️ No se pudo precargar el modelo de sentimiento: {str(e)}")
+
+    stock_symbol, stock_name = task['symbol'], task['name']
+    progress(0, "Iniciando análisis...")
+    log(f"🚀 Iniciando análisis de {stock_symbol} ({stock_name})")
+
+    # Limpiar cache de noticias adicional
+    progress(10, "Limpiando cache de noticias...")
+    clear_sentiment_cache()
+    log("🧹 Cache de noticias limpiado")
+
+    # Cargar FinBERT en segundo plano mientras se descargan los precios
+    if not sentiment_model.loaded:
+        threading.Thread(target=warm_up_sentiment_model, daemon=True).start()
+
+    # Obtener y procesar datos
+    progress(20, "Obteniendo datos históricos...")
+    log("📊 Obteniendo datos históricos de la acción...")
+    try:
+        matrix, predictors = load_feature_matrix(stock_symbol, stock_name)
+    except Exception as e:
+        raise Exception(f"Error al obtener datos: {str(e)}")
+    log(f"✅ Datos obtenidos: {len(matrix)} registros, {len(predictors)} predictores")
+    emit({'type': 'dataset_info',
+          'info': f"Registros: {len(matrix)} | Predictores: {len(predictors)} | Preparando análisis..."})
+    cancel_token.raise_if_cancelled()
+
+    # Ejecutar backtesting
+    progress(40, "Ejecutando backtesting...")
+    log(f"🔄 Ejecutando backtesting con modelo {model_label(task['model_name'])}...")
+    model = _create_task_model(task)
+    try:
+        predictions = backtest(matrix, model, predictors, start=2500, step=250,
+                               stockSymbol=stock_symbol, stockName=stock_name,
+                               model_cache=model_cache, progress=report_fold, cancel_token=cancel_token)
+    except Exception as e:
+        if cancel_token.cancelled:
+            raise
+        raise Exception(f"Error en backtesting: {str(e)}")
+    if predictions.empty:
+        raise Exception("Error en backtesting: No se pudieron generar predicciones")
+    log(f"✅ Backtesting completado: {len(predictions)} predicciones generadas")
+    cancel_token.raise_if_cancelled()
+
+    # Calcular importancia de características
+    progress(85, "Calculando importancia de predictores...")
+    log("🏆 Calculando importancia de predictores...")
+    try:
+        # Los modelos sin feature_importances_ usan permutación sobre el último paso
+        importances = feature_importances(model, matrix.X[-250:], matrix.y[-250:], n_jobs=task.get('n_jobs'))
+    except Exception as e:
+        raise Exception(f"Error al calcular importancia: {str(e)}")
+    log("✅ Top 5 predictores calculados")
+
+    # Guardar predicciones
+    progress(95, "Guardando resultados...")
+    try:
+        path = predictions_path(stock_symbol, task['model_name'])
+        predictions.to_csv(path)
+        log(f"💾 Predicciones guardadas en {path}")
+    except Exception as e:
+        log(f"⚠️ Error al guardar: {str(e)}")
+
+    matrix_dates, matrix_index_meta = index_to_array(matrix.index)
+    prediction_dates, prediction_index_meta = index_to_array(predictions.index)
+    arrays = {
+        'X': matrix.X, 'y': matrix.y, 'dates': matrix_dates,
+        'prediction_dates': prediction_dates,
+        'target': predictions["Target"].to_numpy(), 'predictions': predictions["Predictions"].to_numpy(),
+    }
+    if importances is not None:
+        arrays['importances'] = np.asarray(importances, dtype=np.float64)
+    return {'type': 'result', 'predictors': predictors, 'index_meta': matrix_index_meta,
+            'prediction_index_meta': prediction_index_meta, 'arrays': share_arrays(arrays)}
+
+
+def run_model_comparison(task, emit, cancel_token):
+    """Backtest de cada modelo del registro sobre la matriz de la sesión; devuelve la tabla"""
+    from stock_analysis import compare_models
+    from models import MODEL_BACKENDS
+
+    matrix = task['matrix']
+    emit({'type': 'progress', 'value': 10, 'status': "Comparando modelos..."})
+    emit({'type': 'log', 'text': f"⚖️ Comparando {len(MODEL_BACKENDS)} modelos..."})
+    comparison = compare_models(matrix, matrix.predictors, start=2500, step=250,
+                                stockSymbol=task['symbol'], stockName=task['name'],
+                                model_n_jobs=task.get('n_jobs'), cancel_token=cancel_token)
+    for _, row in comparison.iterrows():
+        emit({'type': 'log', 'text': f"  {row['Modelo']}: {row['Tiempo (s)']:.1f}s, accuracy {row['Accuracy']:.4f}"})
+    return {'type': 'result', 'comparison': comparison}
+
+
+def run_next_session(task, emit, cancel_token):
+    """Predicción de la sesión siguiente a la última barra; devuelve el dict de predict_next_session"""
+    from stock_analysis import predict_next_session
+    from model_cache import model_cache
+    from predict_next import format_prediction
+
+    emit({'type': 'progress', 'value': 50, 'status': "Prediciendo próxima sesión..."})
+    result = predict_next_session(task['symbol'], task['name'] or None, model=_create_task_model(task),
+                                  start=2500, step=250, model_cache=model_cache)
+    emit({'type': 'log', 'text': f"🔮 {format_prediction(result)}"})
+    return {'type': 'result', 'prediction': result}
+
+
+# Tipo de tarea -> función que la ejecuta en el worker
+TASK_RUNNERS = {
+    'analysis': run_analysis,
+    'compare': run_model_comparison,
+    'next_session': run_next_session,
+}
+
+
+def load_result(message):
+    """
+    Reconstruye en la GUI el resultado del worker:
+    (FeatureMatrix, predictores, DataFrame de predicciones, importancias o None)
+    """
+    from data_from_stock import FeatureMatrix
+
+    arrays = attach_arrays(message['arrays'])
+    predictors = message['predictors']
+    matrix = FeatureMatrix(arrays['X'], arrays['y'], array_to_index(arrays['dates'], message['index_meta']),
+                           predictors)
+    predictions = pd.DataFrame({"Target": arrays['target'], "Predictions": arrays['predictions']},
+                               index=array_to_index(arrays['prediction_dates'], message['prediction_index_meta']))
+    return matrix, predictors, predictions, arrays.get('importances')
+
+
+class _TaskCancelFlag:
+    """
+    Vista tipo Event de una tarea sobre el anillo de tareas canceladas compartido
+    con la GUI: la tarea `id` está cancelada si su casilla (id % CANCEL_SLOTS) tiene su id.
+    """
+
+    def __init__(self, cancelled_tasks, task_id):
+        self.cancelled_tasks = cancelled_tasks
+        self.task_id = task_id
+
+    def set(self):
+        self.cancelled_tasks[self.task_id % len(self.cancelled_tasks)] = self.task_id
+
+    def is_set(self):
+        return self.cancelled_tasks[self.task_id % len(self.cancelled_tasks)] == self.task_id
+
+
+def _worker_main(tasks, messages, cancelled_tasks, sentiment_generation):
+    """Loop de cada proceso del pool: atiende tareas hasta recibir None"""
+    from stock_analysis import CancellationToken, BacktestCancelled
+    from news_analysis import clear_sentiment_cache
+    from profiling import Profiler
+
+    seen_generation = 0
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        # Comando de la GUI para todos los workers: se aplica antes de la próxima tarea
+        if sentiment_generation.value != seen_generation:
+            seen_generation = sentiment_generation.value
+            clear_sentiment_cache()
+        if 'matrix' in task:
+            # Se lee (y libera) aunque la tarea esté cancelada para no dejar bloques huérfanos
+            task['matrix'] = attach_matrix(task['matrix'])
+
+        def emit(message, task_id=task['id']):
+            message['task'] = task_id
+            messages.put(message)
+
+        cancel_token = CancellationToken(_TaskCancelFlag(cancelled_tasks, task['id']))
+        profiler = Profiler()
+        start_time = time.perf_counter()
+        try:
+            # Una tarea cancelada mientras esperaba en la cola no llega a empezar
+            cancel_token.raise_if_cancelled()
+            emit({'type': 'started', 'worker': mp.current_process().name})
+            with profiler.activate():
+                result = TASK_RUNNERS[task['kind']](task, emit, cancel_token)
+            result['profile'] = profiler.records
+            result['seconds'] = time.perf_counter() - start_time
+            emit(result)
+        except BacktestCancelled:
+            emit({'type': 'cancelled'})
+        except Exception as e:
+            if cancel_token.cancelled:
+                emit({'type': 'cancelled'})
+            else:
+                emit({'type': 'error', 'text': str(e)})
+        finally:
+            emit({'type': 'done'})
+
+
+class AnalysisPool:
+    """
+    Pool acotado de procesos worker de larga vida para los análisis de la GUI.
+
+    Los procesos se lanzan con "spawn" (no heredan el estado de Tk) a medida que se
+    envían tareas, hasta `workers`, y mantienen FinBERT y el resto de los módulos
+    cargados entre análisis. Las tareas esperan en una cola compartida y las toma
+    el primer worker libre; cada modelo usa los núcleos divididos entre los workers.
+    """
+
+    def __init__(self, workers=ANALYSIS_WORKERS):
+        self.workers = max(1, workers)
+        self.model_n_jobs = max(1, (os.cpu_count() or 1) // self.workers)
+        self._context = mp.get_context('spawn')
+        self.tasks = self._context.Queue()
+        self.messages = self._context.Queue()
+        # Anillo de ids de tareas canceladas: cancelar una no afecta a las demás
+        self.cancelled_tasks = self._context.Array('q', CANCEL_SLOTS, lock=False)
+        # Cada worker limpia su cache de noticias cuando cambia este contador
+        self.sentiment_generation = self._context.Value('q', 0, lock=False)
+        self.processes = []
+        self._next_id = 0
+
+    def submit(self, symbol, name, model_name=None, kind='analysis', matrix=None):
+        """
+        Encola una tarea de TASK_RUNNERS ('analysis', 'compare' o 'next_session') y
+        devuelve su id. `matrix` (un FeatureMatrix) viaja en memoria compartida.
+        """
+        self.processes = [process for process in self.processes if process.is_alive()]
+        if len(self.processes) < self.workers:
+            process = self._context.Process(target=_worker_main, name=f"analysis-worker-{len(self.processes) + 1}",
+                                            args=(self.tasks, self.messages, self.cancelled_tasks,
+                                                  self.sentiment_generation), daemon=True)
+            process.start()
+            self.processes.append(process)
+        self._next_id += 1
+        task = {'id': self._next_id, 'kind': kind, 'symbol': symbol, 'name': name, 'model_name': model_name,
+                'n_jobs': self.model_n_jobs}
+        if matrix is not None:
+            task['matrix'] = share_matrix(matrix)
+        self.tasks.put(task)
+        return self._next_id
+
+    def clear_sentiment_cache(self):
+        """Pide a todos los workers que limpien su cache de noticias antes de su próxima tarea"""
+        self.sentiment_generation.value += 1
+
+    def cancel(self, task_id):
+        """Pide cancelar una tarea en curso o en cola (el backtest corta entre tandas de árboles)"""
+        _TaskCancelFlag(self.cancelled_tasks, task_id).set()
+
+    def poll(self):
+        """Mensajes pendientes de los workers, sin bloquear"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def shutdown(self):
+        if not self.processes:
+            return
+        # Cancelar lo que esté en curso o en cola antes de pedir la salida
+        for task_id in range(max(1, self._next_id - CANCEL_SLOTS + 1), self._next_id + 1):
+            self.cancel(task_id)
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(WORKER_SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        # Liberar los bloques de resultados que nadie llegó a leer
+        for message in self.poll():
+            if message['type'] == 'result' and 'arrays' in message:
+                release_arrays(message['arrays'])
+        self.processes = []
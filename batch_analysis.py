@@ -0,0 +1,147 @@
+"""
+Análisis en lote (sin interfaz gráfica) de una lista de símbolos.
+
+Uso:
+    python batch_analysis.py watchlist.txt --output results.csv --jobs 4
+
+El archivo de símbolos tiene un símbolo por línea, opcionalmente seguido del
+nombre de la empresa separado por coma (ej. "AAPL,Apple"). Las líneas vacías
+y las que empiezan con # se ignoran.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from data_from_stock import load_feature_matrix
+from stock_analysis import backtest
+from models import create_model, MODEL_BACKENDS, DEFAULT_MODEL
+from evaluation import EvaluationSummary
+from news_analysis import get_bulk_news_for_symbols, set_bulk_news, sentiment_model
+
+RESULT_COLUMNS = ['Symbol', 'Name', 'Records', 'Predictions', 'Start', 'End',
+                  'Accuracy', 'Precision', 'Up_Ratio', 'Seconds', 'Error']
+
+
+def read_watchlist(path):
+    """Devuelve una lista de (símbolo, nombre) a partir del archivo de símbolos"""
+    symbols = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            symbol, _, name = line.partition(',')
+            symbols.append((symbol.strip().upper(), name.strip() or None))
+    return symbols
+
+
+def analyze_symbol(stockSymbol, stockName=None, sentiment_by_date=None, start=2500, step=250, mode="refit",
+                   model_name=None):
+    """
+    Ejecuta datos, indicadores, backtest y métricas para un símbolo.
+    Devuelve solo una fila de resultados (no los DataFrames) para acotar la memoria.
+    """
+    result = {'Symbol': stockSymbol, 'Name': stockName}
+    start_time = time.perf_counter()
+    try:
+        if sentiment_by_date is not None:
+            set_bulk_news(stockSymbol, sentiment_by_date)
+
+        stockData, predictors = load_feature_matrix(stockSymbol, stockName)
+        # Cada proceso ya analiza un símbolo: un núcleo por modelo evita sobresuscribir la CPU
+        model = create_model(model_name, n_jobs=1)
+        predictions = backtest(stockData, model, predictors, start=start, step=step,
+                               stockSymbol=stockSymbol, stockName=stockName, mode=mode)
+        if predictions.empty:
+            raise Exception("No se pudieron generar predicciones")
+
+        evaluation = EvaluationSummary(predictions)
+        result.update({
+            'Records': len(stockData),
+            'Predictions': len(predictions),
+            'Start': predictions.index[0].strftime('%Y-%m-%d'),
+            'End': predictions.index[-1].strftime('%Y-%m-%d'),
+            'Accuracy': evaluation.accuracy,
+            'Precision': evaluation.precision,
+            'Up_Ratio': evaluation.up_ratio,
+            'Error': None,
+        })
+    except Exception as e:
+        result['Error'] = str(e)
+    result['Seconds'] = round(time.perf_counter() - start_time, 2)
+    return result
+
+
+def run_batch(symbols, jobs=None, start=2500, step=250, mode="refit", use_news=True, model_name=None):
+    """Analiza todos los símbolos en paralelo y devuelve la tabla de resultados"""
+    sentiment = {}
+    if use_news:
+        # Las noticias se descargan y analizan una sola vez en este proceso (un único FinBERT)
+        sentiment = get_bulk_news_for_symbols(symbols)
+        sentiment_model.unload()
+
+    jobs = jobs or os.cpu_count() or 1
+    names = dict(symbols)
+    rows = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(analyze_symbol, symbol, name, sentiment.get(symbol, {}), start, step, mode, model_name): symbol
+            for symbol, name in symbols
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                row = future.result()
+            except Exception as e:
+                # Un worker que muere (BrokenProcessPool) solo marca como fallidos sus símbolos
+                symbol = futures[future]
+                row = {'Symbol': symbol, 'Name': names[symbol], 'Error': f"{type(e).__name__}: {e}"}
+            rows.append(row)
+            status = f"❌ {row['Error']}" if row['Error'] else f"✅ accuracy {row['Accuracy']:.4f}"
+            seconds = f" ({row['Seconds']}s)" if 'Seconds' in row else ""
+            print(f"[{done}/{len(symbols)}] {row['Symbol']}: {status}{seconds}")
+
+    # Mantener el orden del archivo de símbolos
+    order = {symbol: i for i, (symbol, _) in enumerate(symbols)}
+    rows.sort(key=lambda row: order[row['Symbol']])
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis en lote de acciones sin interfaz gráfica")
+    parser.add_argument('watchlist', help="Archivo con un símbolo por línea (opcional: ,Nombre)")
+    parser.add_argument('--output', default='batch_results.csv', help="Archivo de resultados (.csv o .parquet)")
+    parser.add_argument('--jobs', type=int, default=None, help="Procesos en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument('--start', type=int, default=2500, help="Tamaño inicial de entrenamiento del backtest")
+    parser.add_argument('--step', type=int, default=250, help="Paso del backtest")
+    parser.add_argument('--mode', choices=['refit', 'warm_start'], default='refit', help="Modo del backtest")
+    parser.add_argument('--model', choices=list(MODEL_BACKENDS), default=DEFAULT_MODEL, help="Modelo de clasificación")
+    parser.add_argument('--no-news', action='store_true', help="No usar análisis de noticias")
+    args = parser.parse_args(argv)
+
+    symbols = read_watchlist(args.watchlist)
+    if not symbols:
+        print("❌ El archivo de símbolos está vacío")
+        return 1
+
+    print(f"🚀 Analizando {len(symbols)} símbolos...")
+    start_time = time.perf_counter()
+    results = run_batch(symbols, jobs=args.jobs, start=args.start, step=args.step,
+                        mode=args.mode, use_news=not args.no_news, model_name=args.model)
+
+    if args.output.endswith('.parquet'):
+        results.to_parquet(args.output, index=False)
+    else:
+        results.to_csv(args.output, index=False)
+
+    failed = results['Error'].notna().sum()
+    print(f"💾 Resultados guardados en {args.output}")
+    print(f"🎉 {len(results) - failed} símbolos analizados, {failed} con errores, en {time.perf_counter() - start_time:.1f}s")
+    return 1 if failed == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
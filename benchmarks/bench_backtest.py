@@ -0,0 +1,45 @@
+"""
+Compara el backtest que reentrena todo en cada paso con el modo warm_start.
+
+Uso: python -m benchmarks.bench_backtest [--rows 8000] [--trees-per-step 50]
+"""
+import argparse
+import time
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import precision_score
+
+from benchmarks.synthetic import generate_ohlcv
+from data_from_stock import prepare_training_data
+from stock_analysis import backtest
+
+
+def run(rows, trees_per_step, retire_per_step):
+    stockData, predictors = prepare_training_data(generate_ohlcv(rows, seed=rows))
+    configs = [
+        ("refit", {}),
+        ("warm_start", {'trees_per_step': trees_per_step, 'retire_per_step': retire_per_step}),
+    ]
+
+    results = []
+    for mode, options in configs:
+        model = RandomForestClassifier(n_estimators=200, min_samples_split=50, random_state=1)
+        start = time.perf_counter()
+        predictions = backtest(stockData, model, predictors, start=2500, step=250, mode=mode, **options)
+        elapsed = time.perf_counter() - start
+        accuracy = (predictions["Target"] == predictions["Predictions"]).mean()
+        precision = precision_score(predictions["Target"], predictions["Predictions"])
+        results.append((mode, elapsed, accuracy, precision))
+
+    print(f"\n{'Modo':<12} {'Tiempo (s)':>11} {'Accuracy':>9} {'Precision':>10}")
+    for mode, elapsed, accuracy, precision in results:
+        print(f"{mode:<12} {elapsed:>11.2f} {accuracy:>9.4f} {precision:>10.4f}")
+    print(f"Speedup warm_start: {results[0][1] / results[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de backtest refit vs warm_start")
+    parser.add_argument('--rows', type=int, default=8000)
+    parser.add_argument('--trees-per-step', type=int, default=50)
+    parser.add_argument('--retire-per-step', type=int, default=None)
+    args = parser.parse_args()
+    run(args.rows, args.trees_per_step, args.retire_per_step)
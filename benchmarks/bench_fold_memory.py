@@ -0,0 +1,86 @@
+"""
+Memoria asignada por paso del backtest: camino anterior (copias de DataFrame por
+paso) contra el actual (vistas de FeatureMatrix).
+
+Se mide solo el manejo de datos de cada paso (slices de entrenamiento y test,
+conversión de X a float32 como hace el árbol al entrenar, predicción y
+umbralizado); el modelo se entrena una sola vez para que el costo de los árboles
+no tape la diferencia.
+
+Uso: python -m benchmarks.bench_fold_memory [--rows 8000] [--step 250]
+"""
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.utils import check_array
+
+from benchmarks.synthetic import generate_ohlcv
+from data_from_stock import prepare_training_data, FeatureMatrix
+from stock_analysis import _test_features, _predictions_frame
+
+
+def legacy_fold(stockData, predictors, model, i, step):
+    """Paso del backtest como estaba antes: copias del train/test y umbral en Python"""
+    train = stockData.iloc[0:i].copy()
+    test = stockData.iloc[i:i + step].copy()
+    check_array(train[predictors], dtype=np.float32)
+    train["Target"].to_numpy()
+
+    test_with_updated_sentiment = test.copy()
+    preds = model.predict_proba(test_with_updated_sentiment[predictors])[:, 1]
+    preds = [1 if x >= 0.5 else 0 for x in preds]
+    preds = pd.Series(preds, index=test.index, name="Predictions")
+    return pd.concat([test["Target"], preds], axis=1)
+
+
+def matrix_fold(matrix, model, i, step):
+    """Paso del backtest actual: vistas de la matriz float32 y umbral vectorizado"""
+    stop = min(i + step, len(matrix))
+    check_array(matrix.X[:i], dtype=np.float32)
+    X_test = _test_features(matrix, i, stop, None, None, None)
+    preds = (model.predict_proba(X_test)[:, 1] >= 0.5).astype(int)
+    return _predictions_frame(matrix, i, stop, preds)
+
+
+def measure(fold_fn, starts):
+    """Pico de memoria (bytes) sobre la base de cada paso"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in starts:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fold_fn(i)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+    return np.array(peaks)
+
+
+def run(rows, step, start):
+    stockData, predictors = prepare_training_data(generate_ohlcv(rows, seed=rows))
+    matrix = FeatureMatrix.from_frame(stockData, predictors)
+    model = RandomForestClassifier(n_estimators=20, min_samples_split=50, random_state=1)
+    model.fit(matrix.X[:start], matrix.y[:start])
+
+    starts = list(range(start, len(matrix), step))
+    legacy = measure(lambda i: legacy_fold(stockData, predictors, model, i, step), starts)
+    current = measure(lambda i: matrix_fold(matrix, model, i, step), starts)
+
+    print(f"{len(matrix)} filas, {len(predictors)} predictores, {len(starts)} pasos")
+    print(f"\n{'Camino':<10} {'Media/paso':>12} {'Máximo':>12} {'Total':>12}")
+    for name, peaks in (("anterior", legacy), ("actual", current)):
+        print(f"{name:<10} {peaks.mean() / 1e6:>10.2f}MB {peaks.max() / 1e6:>10.2f}MB {peaks.sum() / 1e6:>10.1f}MB")
+    print(f"Reducción: {legacy.sum() / max(current.sum(), 1):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de memoria por paso del backtest")
+    parser.add_argument('--rows', type=int, default=8000)
+    parser.add_argument('--step', type=int, default=250)
+    parser.add_argument('--start', type=int, default=2500)
+    args = parser.parse_args()
+    run(args.rows, args.step, args.start)
@@ -0,0 +1,50 @@
+"""
+Compara el OBV vectorizado con el bucle original fila por fila.
+
+Uso: python -m benchmarks.bench_obv [--sizes 10000 100000 1000000]
+"""
+import argparse
+import time
+import numpy as np
+
+from benchmarks.synthetic import generate_ohlcv
+from technical_indicators import on_balance_volume
+
+
+def obv_loop(stockData):
+    """Implementación original con .iloc (referencia)"""
+    obv = []
+    obv_value = 0
+    for i in range(len(stockData)):
+        if i == 0:
+            obv_value = stockData['Volume'].iloc[i]
+        else:
+            if stockData['Close'].iloc[i] > stockData['Close'].iloc[i-1]:
+                obv_value += stockData['Volume'].iloc[i]
+            elif stockData['Close'].iloc[i] < stockData['Close'].iloc[i-1]:
+                obv_value -= stockData['Volume'].iloc[i]
+        obv.append(obv_value)
+    return np.array(obv, dtype=float)
+
+
+def run(sizes):
+    print(f"{'Filas':>10} {'Bucle (s)':>12} {'Vectorizado (s)':>16} {'Speedup':>10} {'Idéntico':>9}")
+    for rows in sizes:
+        stockData = generate_ohlcv(rows, seed=rows)
+
+        start = time.perf_counter()
+        expected = obv_loop(stockData)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = on_balance_volume(stockData['Close'].to_numpy(), stockData['Volume'].to_numpy())
+        vector_time = time.perf_counter() - start
+
+        identical = np.array_equal(expected, result)
+        print(f"{rows:>10} {loop_time:>12.4f} {vector_time:>16.6f} {loop_time / vector_time:>9.0f}x {str(identical):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de On-Balance Volume")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    run(parser.parse_args().sizes)
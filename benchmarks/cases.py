@@ -0,0 +1,149 @@
+"""
+Casos del benchmark (ver benchmarks/suite.py).
+
+Cada caso recibe un parámetro, prepara sus datos fuera de la medición y devuelve
+la función a medir. Todo usa datos sintéticos: no hace falta red ni FinBERT.
+"""
+import copy
+import os
+import tempfile
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic import generate_ohlcv, generate_news, stub_sentiment_pipeline
+from data_from_stock import add_advanced_technical_indicators, prepare_training_data, FeatureMatrix
+from technical_indicators import TechnicalIndicatorEngine
+from stock_analysis import backtest
+from stock_graph import create_graph, DownsampledLines
+from evaluation import EvaluationSummary
+import news_analysis
+from sentiment_cache import ArticleSentimentCache
+
+CASES = []
+
+
+def case(name, params=(None,), repeat=5):
+    """Registra un caso del benchmark; `repeat` es la cantidad de mediciones por parámetro"""
+    def register(factory):
+        CASES.append({'name': name, 'factory': factory, 'params': list(params), 'repeat': repeat})
+        return factory
+    return register
+
+
+@case("indicadores", params=[1_000, 10_000, 50_000])
+def indicators(rows):
+    stockData = generate_ohlcv(rows, seed=rows)
+    return lambda: add_advanced_technical_indicators(stockData.copy())
+
+
+@case("indicadores_incremental", params=[10_000, 50_000])
+def incremental_indicators(rows):
+    """Agregar una barra nueva a un motor que ya procesó el resto del historial"""
+    stockData = generate_ohlcv(rows, seed=rows)
+    engine = TechnicalIndicatorEngine()
+    engine.update(stockData.iloc[:-1])
+    return lambda: copy.deepcopy(engine).update(stockData.iloc[-1:])
+
+
+@case("datos_entrenamiento", params=[5_000, 20_000])
+def training_data(rows):
+    stockData = generate_ohlcv(rows, seed=rows)
+    return lambda: prepare_training_data(stockData.copy())
+
+
+@case("backtest", params=["refit", "warm_start"], repeat=3)
+def backtest_folds(mode):
+    """Cuatro pasos del backtest sobre 6000 filas con un bosque chico"""
+    stockData, predictors = prepare_training_data(generate_ohlcv(6_000, seed=6))
+    matrix = FeatureMatrix.from_frame(stockData, predictors)
+    options = {'trees_per_step': 10} if mode == "warm_start" else {}
+
+    def run():
+        model = RandomForestClassifier(n_estimators=50, min_samples_split=50, random_state=1)
+        return backtest(matrix, model, predictors, start=len(matrix) - 2_000, step=500, mode=mode, **options)
+    return run
+
+
+@case("sentiment_lotes", params=[200, 2_000])
+def sentiment_scoring(articles):
+    """score_articles con el pipeline simulado: mide el armado de lotes y resultados"""
+    news = [{'source': article['source']['name'], 'title': article['title'],
+             'text': f"{article['title']} {article['content']}"}
+            for article in generate_news("BENCH", articles, seed=articles)]
+    return lambda: news_analysis.score_articles(stub_sentiment_pipeline, news, batch_size=32)
+
+
+@case("noticias_bulk", params=["sin_cache", "con_cache"])
+def bulk_news(state):
+    """get_bulk_news_for_period sobre 2000 artículos ya descargados, con el cache SQLite vacío o lleno"""
+    articles = generate_news("BENCH", 2_000, seed=1)
+    cache_path = os.path.join(tempfile.mkdtemp(), 'sentiment.sqlite')
+    news_analysis.article_sentiment_cache = ArticleSentimentCache(cache_path)
+    news_analysis.sentiment_model.set_backend(lambda model_id: stub_sentiment_pipeline)
+
+    def run():
+        news_analysis.clear_sentiment_cache()
+        if state == "sin_cache":
+            news_analysis.article_sentiment_cache.clear()
+        return news_analysis.get_bulk_news_for_period("BENCH", articles=articles)
+    if state == "con_cache":
+        run()
+    return run
+
+
+@case("grafico", params=[1_000, 10_000])
+def graph_rendering(points):
+    """Render del gráfico de predicciones sin interfaz (backend Agg)"""
+    rng = np.random.default_rng(points)
+    predictions = pd.DataFrame({
+        'Target': rng.integers(0, 2, points),
+        'Predictions': rng.integers(0, 2, points),
+    }, index=pd.bdate_range('2000-01-01', periods=points, name='Date'))
+
+    def run():
+        create_graph(predictions, "BENCH")
+        plt.gcf().canvas.draw()
+        plt.close('all')
+    return run
+
+
+@case("evaluacion", params=[1_000, 10_000])
+def evaluation_summary(points):
+    """Resumen de evaluación (métricas, accuracy por período y estadísticas por año)"""
+    rng = np.random.default_rng(points)
+    predictions = pd.DataFrame({
+        'Target': rng.integers(0, 2, points),
+        'Predictions': rng.integers(0, 2, points),
+    }, index=pd.bdate_range('2000-01-01', periods=points, name='Date'))
+    return lambda: EvaluationSummary(predictions)
+
+
+@case("grafico_predicciones", params=["completo", "nivel_de_detalle"])
+def predictions_graph(renderer):
+    """Gráfico de predicciones de la GUI (10 x 5 pulgadas, 100 dpi) con 6000 puntos por serie"""
+    rng = np.random.default_rng(6)
+    dates = pd.bdate_range('2000-01-01', periods=6_000, name='Date')
+    targets = rng.integers(0, 2, len(dates))
+    predictions = rng.integers(0, 2, len(dates))
+    styles = [(targets, 'o-', 'blue'), (predictions, 's-', 'red')]
+
+    def run():
+        fig = Figure(figsize=(10, 5), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        if renderer == "completo":
+            for values, style, color in styles:
+                ax.plot(dates, values, style, color=color, alpha=0.7, markersize=1.5, linewidth=1)
+        else:
+            lod = DownsampledLines(ax, dates)
+            for values, style, color in styles:
+                lod.plot(values, style, color=color, alpha=0.7, markersize=1.5, linewidth=1)
+            lod.show_all()
+        fig.canvas.draw()
+    return run
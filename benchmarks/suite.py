@@ -0,0 +1,154 @@
+"""
+Corre los casos de benchmarks/cases.py, guarda los resultados y los compara
+con una corrida anterior.
+
+Uso:
+    python -m benchmarks.suite                       # corre todo y guarda en benchmarks/results/
+    python -m benchmarks.suite --filter indicadores  # solo los casos cuyo nombre contiene el texto
+    python -m benchmarks.suite --compare latest      # compara con la última corrida guardada
+    python -m benchmarks.suite --compare benchmarks/results/20250101-120000_abc1234.json
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Variación a partir de la cual se marca una diferencia en la comparación
+REGRESSION_THRESHOLD = 0.10
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def run_case(factory, param, repeat):
+    """Prepara el caso, hace una corrida de calentamiento y mide `repeat` corridas"""
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        func = factory(param) if param is not None else factory()
+        func()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'repeat': repeat,
+    }
+
+
+def run_suite(name_filter=None, repeat=None):
+    from benchmarks.cases import CASES
+
+    results = {}
+    for bench_case in CASES:
+        if name_filter and name_filter not in bench_case['name']:
+            continue
+        for param in bench_case['params']:
+            key = bench_case['name'] if param is None else f"{bench_case['name']}[{param}]"
+            stats = run_case(bench_case['factory'], param, repeat or bench_case['repeat'])
+            results[key] = stats
+            print(f"  {key:<40} {_format_seconds(stats['median']):>10}  (min {_format_seconds(stats['min'])})")
+    return results
+
+
+def _format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.3f}s"
+
+
+def save_results(results, directory=RESULTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    commit = _git_commit()
+    payload = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+        },
+        'results': results,
+    }
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def _previous_results(directory=RESULTS_DIR, exclude=None):
+    paths = sorted(path for path in glob.glob(os.path.join(directory, '*.json')) if path != exclude)
+    return paths[-1] if paths else None
+
+
+def compare(results, baseline_path):
+    """Imprime la relación actual/base de la mediana de cada caso"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparación con {os.path.basename(baseline_path)} (commit {baseline.get('commit')}):")
+    print(f"  {'Caso':<40} {'Base':>10} {'Actual':>10} {'Relación':>9}")
+    for key, stats in results.items():
+        if key not in baseline['results']:
+            continue
+        before = baseline['results'][key]['median']
+        ratio = stats['median'] / before if before else float('nan')
+        mark = "⚠️ más lento" if ratio > 1 + REGRESSION_THRESHOLD else "🚀 más rápido" if ratio < 1 - REGRESSION_THRESHOLD else ""
+        print(f"  {key:<40} {_format_seconds(before):>10} {_format_seconds(stats['median']):>10} {ratio:>8.2f}x {mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de benchmarks con datos sintéticos")
+    parser.add_argument('--filter', default=None, help="Solo casos cuyo nombre contiene este texto")
+    parser.add_argument('--repeat', type=int, default=None, help="Mediciones por caso (por defecto, las de cada caso)")
+    parser.add_argument('--compare', default=None, help="Archivo de resultados a comparar, o 'latest'")
+    parser.add_argument('--no-save', action='store_true', help="No guardar los resultados")
+    args = parser.parse_args(argv)
+
+    print("⏱️ Corriendo benchmarks...")
+    results = run_suite(args.filter, args.repeat)
+
+    saved_path = None
+    if not args.no_save:
+        saved_path = save_results(results)
+        print(f"💾 Resultados guardados en {saved_path}")
+
+    if args.compare:
+        baseline_path = _previous_results(exclude=saved_path) if args.compare == 'latest' else args.compare
+        if baseline_path is None:
+            print("⚠️ No hay resultados anteriores para comparar")
+        else:
+            compare(results, baseline_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
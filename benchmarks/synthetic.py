@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+def generate_ohlcv(rows, seed=0, start='1990-01-01'):
+    """
+    Genera precios OHLCV diarios sintéticos (paseo aleatorio geométrico) sin usar la red.
+    La misma semilla siempre produce los mismos datos.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    high = close * (1 + rng.uniform(0, 0.02, rows))
+    low = close * (1 - rng.uniform(0, 0.02, rows))
+    open_ = low + (high - low) * rng.uniform(size=rows)
+    volume = rng.integers(100_000, 10_000_000, rows).astype(float)
+    index = pd.bdate_range(start, periods=rows, name='Date')
+    return pd.DataFrame({'Close': close, 'High': high, 'Low': low, 'Open': open_, 'Volume': volume}, index=index)
+
+
+NEWS_SOURCES = ['Reuters', 'Bloomberg', 'MarketWatch', 'CNBC', 'Yahoo Finance', 'WSJ']
+NEWS_WORDS = ['earnings', 'revenue', 'shares', 'guidance', 'growth', 'margin', 'outlook', 'demand',
+              'analysts', 'quarter', 'dividend', 'buyback', 'forecast', 'rally', 'slump', 'upgrade']
+
+
+def generate_news(stockSymbol, articles, days=30, seed=0, end=None):
+    """
+    Genera artículos con el formato de NewsAPI (publishedAt, source, title, content)
+    repartidos en los últimos `days` días, sin usar la red.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.now().normalize())
+    offsets = rng.integers(1, days + 1, articles)
+    seconds = rng.integers(0, 86400, articles)
+    generated = []
+    for k in range(articles):
+        published = end - pd.Timedelta(days=int(offsets[k])) + pd.Timedelta(seconds=int(seconds[k]))
+        words = rng.choice(NEWS_WORDS, size=rng.integers(20, 60))
+        generated.append({
+            'source': {'name': NEWS_SOURCES[k % len(NEWS_SOURCES)]},
+            'title': f"{stockSymbol} {' '.join(words[:6])} #{k}",
+            'description': ' '.join(words[:12]),
+            'content': ' '.join(words),
+            'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        })
+    return generated
+
+
+def stub_sentiment_pipeline(texts, batch_size=None, truncation=True, max_length=512):
+    """
+    Reemplazo determinístico del pipeline de FinBERT: mismo formato de salida
+    (lista de scores por etiqueta para cada texto) sin cargar ningún modelo.
+    """
+    results = []
+    for text in texts:
+        rng = np.random.default_rng(sum(text.encode('utf-8')) + len(text))
+        scores = rng.dirichlet([2.0, 2.0, 3.0])
+        results.append([{'label': label, 'score': float(score)}
+                        for label, score in zip(('positive', 'negative', 'neutral'), scores)])
+    return results
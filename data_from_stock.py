@@ -1,111 +1,143 @@
-import yfinance as yf
+from price_store import load_prices
 from news_analysis import sentiment_analysis
+from technical_indicators import TechnicalIndicatorEngine, INDICATOR_COLUMNS
+from profiling import span
 import pandas as pd
 import numpy as np
 
 
-def add_advanced_technical_indicators(stockData):
+def add_advanced_technical_indicators(stockData, engine=None):
     """
-    Agrega indicadores técnicos avanzados para mejorar las predicciones
+    Agrega indicadores técnicos avanzados para mejorar las predicciones.
+    Se puede pasar un `engine` para conservar su estado y luego actualizar
+    solo las barras nuevas con engine.update (ver TechnicalIndicatorEngine).
     """
-    # RSI (Relative Strength Index)
-    def calculate_rsi(prices, window=14):
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
-    
-    stockData['RSI_14'] = calculate_rsi(stockData['Close'])
-    stockData['RSI_7'] = calculate_rsi(stockData['Close'], 7)
-    stockData['RSI_30'] = calculate_rsi(stockData['Close'], 30)
-    
-    # MACD (Moving Average Convergence Divergence)
-    ema12 = stockData['Close'].ewm(span=12).mean()
-    ema26 = stockData['Close'].ewm(span=26).mean()
-    stockData['MACD'] = ema12 - ema26
-    stockData['MACD_Signal'] = stockData['MACD'].ewm(span=9).mean()
-    stockData['MACD_Histogram'] = stockData['MACD'] - stockData['MACD_Signal']
-    
-    # MACD ratios para normalizar
-    stockData['MACD_Ratio'] = stockData['MACD'] / stockData['Close']
-    stockData['MACD_Signal_Ratio'] = stockData['MACD_Signal'] / stockData['Close']
-    
-    # Bollinger Bands
-    sma20 = stockData['Close'].rolling(window=20).mean()
-    std20 = stockData['Close'].rolling(window=20).std()
-    stockData['BB_Upper'] = sma20 + (std20 * 2)
-    stockData['BB_Lower'] = sma20 - (std20 * 2)
-    stockData['BB_Position'] = (stockData['Close'] - stockData['BB_Lower']) / (stockData['BB_Upper'] - stockData['BB_Lower'])
-    stockData['BB_Width'] = (stockData['BB_Upper'] - stockData['BB_Lower']) / sma20
-    
-    # Stochastic Oscillator
-    low_min = stockData['Low'].rolling(window=14).min()
-    high_max = stockData['High'].rolling(window=14).max()
-    stockData['Stoch_K'] = 100 * (stockData['Close'] - low_min) / (high_max - low_min)
-    stockData['Stoch_D'] = stockData['Stoch_K'].rolling(window=3).mean()
-    
-    # Williams %R
-    stockData['Williams_R'] = -100 * (high_max - stockData['Close']) / (high_max - low_min)
-    
-    # Average True Range (ATR) - Volatilidad
-    high_low = stockData['High'] - stockData['Low']
-    high_close = np.abs(stockData['High'] - stockData['Close'].shift())
-    low_close = np.abs(stockData['Low'] - stockData['Close'].shift())
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    stockData['ATR_14'] = true_range.rolling(window=14).mean()
-    stockData['ATR_Ratio'] = stockData['ATR_14'] / stockData['Close']
-    
-    # Commodity Channel Index (CCI)
-    typical_price = (stockData['High'] + stockData['Low'] + stockData['Close']) / 3
-    sma_tp = typical_price.rolling(window=20).mean()
-    mad = typical_price.rolling(window=20).apply(lambda x: np.mean(np.abs(x - x.mean())))
-    stockData['CCI'] = (typical_price - sma_tp) / (0.015 * mad)
-    
-    # Money Flow Index (MFI)
-    typical_price = (stockData['High'] + stockData['Low'] + stockData['Close']) / 3
-    money_flow = typical_price * stockData['Volume']
-    
-    positive_flow = money_flow.where(typical_price > typical_price.shift(), 0).rolling(14).sum()
-    negative_flow = money_flow.where(typical_price < typical_price.shift(), 0).rolling(14).sum()
-    
-    money_ratio = positive_flow / negative_flow
-    stockData['MFI'] = 100 - (100 / (1 + money_ratio))
-    
-    # On-Balance Volume (OBV)
-    obv = []
-    obv_value = 0
-    
-    for i in range(len(stockData)):
-        if i == 0:
-            obv_value = stockData['Volume'].iloc[i]
-        else:
-            if stockData['Close'].iloc[i] > stockData['Close'].iloc[i-1]:
-                obv_value += stockData['Volume'].iloc[i]
-            elif stockData['Close'].iloc[i] < stockData['Close'].iloc[i-1]:
-                obv_value -= stockData['Volume'].iloc[i]
-        obv.append(obv_value)
-    
-    stockData['OBV'] = obv
-    stockData['OBV_Ratio'] = stockData['OBV'] / stockData['OBV'].rolling(20).mean()
-    
-    # Momentum indicators
-    stockData['Momentum_5'] = stockData['Close'] / stockData['Close'].shift(5) - 1
-    stockData['Momentum_10'] = stockData['Close'] / stockData['Close'].shift(10) - 1
-    stockData['Momentum_20'] = stockData['Close'] / stockData['Close'].shift(20) - 1
-    
-    # Rate of Change (ROC)
-    stockData['ROC_5'] = stockData['Close'].pct_change(periods=5) * 100
-    stockData['ROC_10'] = stockData['Close'].pct_change(periods=10) * 100
-    stockData['ROC_20'] = stockData['Close'].pct_change(periods=20) * 100
-    
+    engine = engine or TechnicalIndicatorEngine()
+    indicators = engine.update(stockData)
+    for column in INDICATOR_COLUMNS:
+        stockData[column] = indicators[column]
     return stockData
 
 
-def setDataForTraining(stockSymbol, stockName=None):
+# Horizontes (en días) de las columnas Close_Ratio_N y Trend_N
+TENDENCY_DAYS = [2, 5, 60, 250, 1000]
+
+
+def horizon_features(close, target, horizons):
+    """
+    Calcula Close_Ratio y Trend para todos los horizontes en una sola pasada.
+
+    Usa sumas acumuladas: la media móvil de N días es (S[i+1] - S[i+1-N]) / N, y
+    Trend_N es la suma de los N targets anteriores (target desplazado un día).
+    Devuelve dos arrays (filas, len(horizons)) con NaN donde la ventana no está completa.
+    """
+    close = np.asarray(close, dtype=float)
+    target = np.asarray(target, dtype=float)
+    rows = len(close)
+
+    # Sumas acumuladas con un cero al inicio; los NaN se cuentan aparte para invalidar sus ventanas
+    close_nan = np.isnan(close)
+    close_sum = np.concatenate([[0.0], np.cumsum(np.where(close_nan, 0.0, close))])
+    nan_count = np.concatenate([[0], np.cumsum(close_nan)])
+    target_sum = np.concatenate([[0.0], np.cumsum(target)])
+
+    ratios = np.full((rows, len(horizons)), np.nan)
+    trends = np.full((rows, len(horizons)), np.nan)
+    for column, horizon in enumerate(horizons):
+        if rows >= horizon:
+            window_sum = close_sum[horizon:] - close_sum[:-horizon]
+            window_nans = nan_count[horizon:] - nan_count[:-horizon]
+            rolling_mean = np.where(window_nans == 0, window_sum / horizon, np.nan)
+            ratios[horizon - 1:, column] = close[horizon - 1:] / rolling_mean
+        if rows > horizon:
+            # Fila i: suma de target[i - horizon : i]
+            trends[horizon:, column] = target_sum[horizon:rows] - target_sum[:rows - horizon]
+    return ratios, trends
+
+
+class FeatureMatrix:
+    """
+    Matriz compacta para entrenar: solo las columnas de predictores en un array
+    float32 contiguo, el vector Target y el índice de fechas.
+
+    Los árboles de sklearn convierten X a float32 al entrenar, así que los modelos
+    son los mismos que con el DataFrame completo; los slices por fila (X[:i]) son
+    vistas y no copian datos.
+    """
+
+    def __init__(self, X, y, index, predictors):
+        self.X = X
+        self.y = y
+        self.index = index
+        self.predictors = list(predictors)
+
+    @classmethod
+    def from_frame(cls, stockData, predictors, dtype=np.float32):
+        X = np.ascontiguousarray(stockData[predictors].to_numpy(dtype=dtype))
+        y = stockData["Target"].to_numpy(dtype=np.int64, copy=True)
+        return cls(X, y, stockData.index, predictors)
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def nbytes(self):
+        return self.X.nbytes + self.y.nbytes
+
+
+def load_feature_matrix(stockSymbol, stockName=None, horizons=None):
+    """Igual que setDataForTraining pero descarta las columnas que no son predictores"""
+    stockData, predictors = setDataForTraining(stockSymbol, stockName, horizons)
+    return FeatureMatrix.from_frame(stockData, predictors), predictors
+
+
+def load_live_data(stockSymbol, horizons=None):
+    """
+    Datos para predecir la próxima sesión: FeatureMatrix de entrenamiento, predictores
+    y la última barra (ver prepare_live_data). Los precios salen del almacén local,
+    que solo descarga las barras nuevas.
+    """
+    stockData = load_prices(stockSymbol, start='1990-01-01')
+    training, predictors, live_row = prepare_live_data(stockData, horizons)
+    return FeatureMatrix.from_frame(training, predictors), predictors, live_row
+
+
+def setDataForTraining(stockSymbol, stockName=None, horizons=None):
     startYear = '1990-01-01'
-    stockData = yf.download(stockSymbol, start=startYear, end=None)
-    
+    with span('datos.setDataForTraining', symbol=stockSymbol):
+        # Usa el almacén local y solo descarga las barras nuevas
+        with span('datos.precios'):
+            stockData = load_prices(stockSymbol, start=startYear)
+        return prepare_training_data(stockData, horizons)
+
+
+def prepare_training_data(stockData, horizons=None):
+    """
+    Construye las columnas de entrenamiento (indicadores, Target y tendencias)
+    a partir de precios OHLCV diarios. Devuelve (stockData, predictors).
+    `horizons` reemplaza a TENDENCY_DAYS para las columnas Close_Ratio_N / Trend_N.
+    """
+    stockData, predictors = build_features(stockData, horizons)
+    stockData=stockData.dropna()
+    return  stockData, predictors
+
+
+def prepare_live_data(stockData, horizons=None):
+    """
+    Igual que prepare_training_data, pero además devuelve la última barra (la que
+    todavía no tiene Tomorrow/Target) con sus predictores, para predecir la próxima
+    sesión. Devuelve (stockData, predictors, live_row); live_row es None si la última
+    barra no tiene todos los predictores.
+    """
+    features, predictors = build_features(stockData, horizons)
+    live_row = features.iloc[-1:]
+    if not live_row["Tomorrow"].isna().all() or np.isnan(live_row[predictors].to_numpy(dtype=float)).any():
+        live_row = None
+    return features.dropna(), predictors, live_row
+
+
+def build_features(stockData, horizons=None):
+    """Columnas de prepare_training_data sin descartar las filas con NaN"""
     # Si las columnas son MultiIndex, aplanarlas manteniendo solo el nombre de la columna
     if isinstance(stockData.columns, pd.MultiIndex):
         stockData.columns = [col[0] for col in stockData.columns]
@@ -122,19 +154,20 @@ def setDataForTraining(stockSymbol, stockName=None):
     stockData["Sentiment_Neutral"] = 0.34
     
     # Agregar indicadores técnicos avanzados
-    stockData = add_advanced_technical_indicators(stockData)
+    with span('datos.indicadores', rows=len(stockData)):
+        stockData = add_advanced_technical_indicators(stockData)
     
     stockData["Tomorrow"]=stockData["Close"].shift(-1)
     stockData["Target"]= (stockData["Tomorrow"] > stockData["Close"]).astype(int)
     
     predictors = []  # Inicializar la lista de predictores
-    tendencyDays = [2,5,60,250,1000]
-    for tendencyDay in tendencyDays:
-        rollingAverage=stockData.rolling(tendencyDay).mean()
+    tendencyDays = horizons or TENDENCY_DAYS
+    ratios, trends = horizon_features(stockData["Close"], stockData["Target"], tendencyDays)
+    for column, tendencyDay in enumerate(tendencyDays):
         ratioColumn="Close_Ratio_" + str(tendencyDay)
-        stockData[ratioColumn]=stockData["Close"]/rollingAverage["Close"]
+        stockData[ratioColumn]=ratios[:, column]
         trendColumn="Trend_" + str(tendencyDay)
-        stockData[trendColumn]=stockData["Target"].shift(1).rolling(tendencyDay).sum()
+        stockData[trendColumn]=trends[:, column]
         predictors.append(ratioColumn)
         predictors.append(trendColumn)
     
@@ -161,6 +194,4 @@ def setDataForTraining(stockSymbol, stockName=None):
         if indicator in stockData.columns and not stockData[indicator].isna().all():
             predictors.append(indicator)
     
-    stockData=stockData.dropna()
-    return  stockData, predictors
-
+    return stockData, predictors
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Serie del gráfico "Accuracy por Período": ventana de 100 predicciones cada 25
+PERIOD_WINDOW = 100
+PERIOD_STEP = 25
+
+
+def _prefix_sum(values):
+    """Suma acumulada con un cero al inicio: la suma de values[a:b] es S[b] - S[a]"""
+    return np.concatenate([[0], np.cumsum(values)])
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), np.nan)
+
+
+class EvaluationSummary:
+    """
+    Resumen de las predicciones del backtest calculado una sola vez.
+
+    Con sumas acumuladas de aciertos, verdaderos positivos y predicciones positivas,
+    cualquier ventana sale en O(1): accuracy por período, matriz de confusión y
+    estadísticas por año. Los gráficos y métricas leen de acá.
+    """
+
+    def __init__(self, predictions):
+        self.dates = predictions.index
+        self.target = predictions["Target"].to_numpy(dtype=np.int64)
+        self.predictions = predictions["Predictions"].to_numpy(dtype=np.int64)
+        self.size = len(self.target)
+
+        correct = self.target == self.predictions
+        predicted_up = self.predictions == 1
+        true_positive = predicted_up & (self.target == 1)
+        self._correct = _prefix_sum(correct)
+        self._predicted_up = _prefix_sum(predicted_up)
+        self._true_positive = _prefix_sum(true_positive)
+
+        # Matriz de confusión y distribución
+        tp = int(true_positive.sum())
+        fp = int(predicted_up.sum()) - tp
+        fn = int((self.target == 1).sum()) - tp
+        tn = self.size - tp - fp - fn
+        self.confusion = {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp}
+        self.predicted_counts = {0: tn + fn, 1: tp + fp}
+        self.target_counts = {0: tn + fp, 1: tp + fn}
+
+        self.accuracy = self._correct[-1] / self.size if self.size else np.nan
+        self.precision = tp / (tp + fp) if tp + fp else 0.0
+        self.up_ratio = (tp + fp) / self.size if self.size else np.nan
+
+        self.accuracy_by_period = self._accuracy_by_period(PERIOD_WINDOW, PERIOD_STEP)
+        self.per_year = self._per_year()
+
+    def _window_stats(self, starts, ends):
+        """Accuracy y precision de las ventanas [starts, ends) a partir de las sumas acumuladas"""
+        accuracy = (self._correct[ends] - self._correct[starts]) / (ends - starts)
+        precision = _ratio(self._true_positive[ends] - self._true_positive[starts],
+                           self._predicted_up[ends] - self._predicted_up[starts])
+        return accuracy, precision
+
+    def _accuracy_by_period(self, window, step):
+        """Accuracy de las ventanas [i - window, i) para i = window, window + step, ... (< size)"""
+        ends = np.arange(window, self.size, step)
+        if len(ends) == 0:
+            return pd.Series(dtype=float, name='Accuracy')
+        accuracy, _ = self._window_stats(ends - window, ends)
+        return pd.Series(accuracy, index=self.dates[ends - 1], name='Accuracy')
+
+    def _per_year(self):
+        if self.size == 0:
+            return pd.DataFrame(columns=['Predicciones', 'Accuracy', 'Precision', 'Up_Ratio'])
+        years = np.asarray(self.dates.year)
+        # Las predicciones están ordenadas por fecha: cada año es un rango contiguo
+        boundaries = np.flatnonzero(np.diff(years)) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [self.size]])
+        accuracy, precision = self._window_stats(starts, ends)
+        counts = ends - starts
+        up_ratio = (self._predicted_up[ends] - self._predicted_up[starts]) / counts
+        return pd.DataFrame({'Predicciones': counts, 'Accuracy': accuracy,
+                             'Precision': np.nan_to_num(precision), 'Up_Ratio': up_ratio},
+                            index=pd.Index(years[starts], name='Año'))
@@ -1,15 +1,15 @@
 import pandas as pd
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import threading
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import queue
 import time
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import precision_score
-from data_from_stock import getDataFromStock, setDataForTraining
-from stock_analysis import backtest 
-from news_analysis import clear_sentiment_cache
-from stock_graph import create_graph
+from contextlib import nullcontext
+from models import create_model, model_label, MODEL_BACKENDS, DEFAULT_MODEL
+from profiling import Profiler
+from stock_graph import create_graph, DownsampledLines
+from evaluation import EvaluationSummary
+from analysis_worker import AnalysisPool, load_result, release_arrays
+from analysis_sessions import AnalysisSession, SessionStore, session_key, RUNNING, COMPLETED, CANCELLED, FAILED
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import warnings
@@ -33,10 +33,29 @@ class StockPredictionGUI:
         self.model = None
         self.feature_importance = None
         
-        # Variable para controlar hilos
-        self.analysis_thread = None
+        # Resumen de evaluación (evaluation.py) de las predicciones actuales
+        self.evaluation = None
+        
+        # Comparación de modelos o predicción de la próxima sesión en curso (una a la vez)
         self.analysis_running = False
         
+        # Los análisis corren en un pool de procesos aparte para no trabar el loop de Tk;
+        # cada símbolo analizado es una sesión y se muestra la seleccionada
+        self.pool = AnalysisPool()
+        self.sessions = SessionStore()
+        self.current_session = None
+        # Tareas del pool que no son sesiones: id -> 'compare' o 'next_session'
+        self.jobs = {}
+        
+        # Perfil de tiempos del último análisis
+        self.profiler = None
+        
+        # Líneas con nivel de detalle del gráfico de predicciones
+        self.predictions_lod = None
+        
+        # Modelo elegido en el registro de models.py
+        self.model_name = DEFAULT_MODEL
+        
         # Queue para comunicación thread-safe
         self.ui_queue = queue.Queue()
         
@@ -50,10 +69,11 @@ class StockPredictionGUI:
         
     def reset_model(self):
         """Resetea el modelo y limpia todos los datos"""
-        self.model = RandomForestClassifier(n_estimators=200, min_samples_split=50, random_state=1)
+        self.model = create_model(self.model_name)
         self.stock_data = None
         self.predictors = None
         self.predictions = None
+        self.evaluation = None
         self.feature_importance = None
         
         # Limpiar figuras de matplotlib para evitar problemas de memoria
@@ -64,6 +84,7 @@ class StockPredictionGUI:
     
     def process_ui_queue(self):
         """Procesa mensajes de la queue para actualizar UI de manera thread-safe"""
+        self.poll_worker()
         try:
             while True:
                 # Intentar obtener mensaje de la queue sin bloquear
@@ -79,30 +100,24 @@ class StockPredictionGUI:
                     self.logs_text.insert(tk.END, f"{message['text']}\n")
                     self.logs_text.see(tk.END)
                     
-                elif message['type'] == 'metrics':
-                    self.accuracy_var.set(message['accuracy'])
-                    self.precision_var.set(message['precision'])
-                    
-                elif message['type'] == 'dataset_info':
-                    self.dataset_info_var.set(message['info'])
+                elif message['type'] == 'model_comparison':
+                    for _, row in message['data'].iterrows():
+                        self.models_tree.insert("", tk.END, values=(
+                            row['Modelo'], f"{row['Tiempo (s)']:.2f}", f"{row['Entrenamiento (s)']:.2f}",
+                            f"{row['Accuracy']:.4f}", f"{row['Precision']:.4f}", row['Predicciones']))
                     
-                elif message['type'] == 'predictors':
-                    self.feature_importance = message['data']
-                    self.update_predictors_display()
-                    
-                elif message['type'] == 'enable_graph':
-                    self.update_graph()  # Actualizar gráfico automáticamente
+                elif message['type'] == 'next_session':
+                    self.next_session_var.set(message['text'])
                     
                 elif message['type'] == 'analysis_complete':
                     self.analysis_running = False
                     self.analyze_button.config(state="normal")
-                    self.cancel_button.config(state="disabled")
+                    self.compare_button.config(state="normal")
+                    self.next_session_button.config(state="normal")
+                    self.update_cancel_button()
                     
                 elif message['type'] == 'error':
                     messagebox.showerror("Error", message['text'])
-                    self.analysis_running = False
-                    self.analyze_button.config(state="normal")
-                    self.cancel_button.config(state="disabled")
                     
         except queue.Empty:
             pass
@@ -160,9 +175,17 @@ class StockPredictionGUI:
         self.stock_name_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(10, 0), pady=5)
         ttk.Label(input_frame, text="(ej: Apple, Microsoft, Google)", foreground="gray").grid(row=1, column=2, sticky=tk.W, padx=(5, 0))
         
+        # Modelo de clasificación
+        ttk.Label(input_frame, text="Modelo:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.model_var = tk.StringVar(value=model_label(self.model_name))
+        self.model_combo = ttk.Combobox(input_frame, textvariable=self.model_var, state="readonly",
+                                        values=[model_label(name) for name in MODEL_BACKENDS], width=30)
+        self.model_combo.grid(row=2, column=1, sticky=tk.W, padx=(10, 0), pady=5)
+        self.model_combo.bind("<<ComboboxSelected>>", self.on_model_selected)
+        
         # Frame para botones
         buttons_frame = ttk.Frame(input_frame)
-        buttons_frame.grid(row=2, column=0, columnspan=3, pady=20)
+        buttons_frame.grid(row=3, column=0, columnspan=3, pady=20)
         
         # Botón de análisis
         self.analyze_button = ttk.Button(buttons_frame, text="🔍 Analizar Acción", 
@@ -174,16 +197,42 @@ class StockPredictionGUI:
                                        command=self.cancel_analysis, state="disabled")
         self.cancel_button.pack(side=tk.LEFT)
         
+        # Botón para comparar todos los modelos sobre los datos ya cargados
+        self.compare_button = ttk.Button(buttons_frame, text="⚖️ Comparar Modelos", 
+                                        command=self.start_model_comparison)
+        self.compare_button.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Botón para predecir solo la próxima sesión (usa el modelo en cache)
+        self.next_session_button = ttk.Button(buttons_frame, text="🔮 Predecir Próxima Sesión", 
+                                             command=self.start_next_session_prediction)
+        self.next_session_button.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Barra de progreso
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(input_frame, variable=self.progress_var, 
                                           maximum=100, length=400)
-        self.progress_bar.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        self.progress_bar.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
         
         # Label de estado
         self.status_var = tk.StringVar(value="Listo para analizar")
         self.status_label = ttk.Label(input_frame, textvariable=self.status_var, foreground="white")
-        self.status_label.grid(row=4, column=0, columnspan=3, pady=5)
+        self.status_label.grid(row=5, column=0, columnspan=3, pady=5)
+        
+        # Sesiones de análisis (una por símbolo y modelo); se muestra la seleccionada
+        sessions_frame = ttk.LabelFrame(input_frame, text="Sesiones", padding="5")
+        sessions_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        
+        columns = ("Símbolo", "Modelo", "Estado", "Progreso", "Accuracy")
+        self.sessions_tree = ttk.Treeview(sessions_frame, columns=columns, show="headings", height=4,
+                                          selectmode="browse")
+        for column in columns:
+            self.sessions_tree.heading(column, text=column, anchor="center")
+            self.sessions_tree.column(column, width=220 if column == "Modelo" else 110, anchor="center")
+        sessions_scrollbar = ttk.Scrollbar(sessions_frame, orient=tk.VERTICAL, command=self.sessions_tree.yview)
+        self.sessions_tree.configure(yscrollcommand=sessions_scrollbar.set)
+        self.sessions_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        sessions_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.sessions_tree.bind("<<TreeviewSelect>>", self.on_session_selected)
         
         # Notebook para pestañas
         self.notebook = ttk.Notebook(main_frame)
@@ -202,6 +251,9 @@ class StockPredictionGUI:
         # Pestaña de Gráficos
         self.setup_graphics_tab()
         
+        # Pestaña de comparación de modelos
+        self.setup_models_tab()
+        
         # Pestaña de Logs
         self.setup_logs_tab()
         
@@ -230,6 +282,14 @@ class StockPredictionGUI:
         ttk.Label(precision_frame, textvariable=self.precision_var, font=("Arial", 12), 
                  foreground="green").pack(side=tk.LEFT, padx=(10, 0))
         
+        # Próxima sesión
+        next_session_frame = ttk.Frame(main_metrics_frame)
+        next_session_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(next_session_frame, text="Próxima sesión:", font=("Arial", 12, "bold")).pack(side=tk.LEFT)
+        self.next_session_var = tk.StringVar(value="N/A")
+        ttk.Label(next_session_frame, textvariable=self.next_session_var, font=("Arial", 12), 
+                 foreground="green").pack(side=tk.LEFT, padx=(10, 0))
+        
         # Información adicional
         info_frame = ttk.LabelFrame(metrics_frame, text="Información del Dataset", padding="10")
         info_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -237,6 +297,30 @@ class StockPredictionGUI:
         self.dataset_info_var = tk.StringVar(value="No hay datos cargados")
         ttk.Label(info_frame, textvariable=self.dataset_info_var, font=("Arial", 10)).pack()
         
+        # Rendimiento por año
+        yearly_frame = ttk.LabelFrame(metrics_frame, text="Rendimiento por Año", padding="10")
+        yearly_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ("Año", "Predicciones", "Accuracy", "Precision", "% Sube")
+        self.yearly_tree = ttk.Treeview(yearly_frame, columns=columns, show="headings", height=8)
+        for column in columns:
+            self.yearly_tree.heading(column, text=column)
+            self.yearly_tree.column(column, width=110, anchor=tk.CENTER)
+        
+        yearly_scrollbar = ttk.Scrollbar(yearly_frame, orient=tk.VERTICAL, command=self.yearly_tree.yview)
+        self.yearly_tree.configure(yscrollcommand=yearly_scrollbar.set)
+        self.yearly_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        yearly_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    
+    def update_yearly_display(self, per_year):
+        """Muestra las estadísticas por año del resumen de evaluación"""
+        for item in self.yearly_tree.get_children():
+            self.yearly_tree.delete(item)
+        for year, row in per_year.iterrows():
+            self.yearly_tree.insert("", tk.END, values=(
+                year, int(row['Predicciones']), f"{row['Accuracy']:.2%}",
+                f"{row['Precision']:.2%}", f"{row['Up_Ratio']:.2%}"))
+        
     def setup_predictors_tab(self):
         """Configura la pestaña de predictores"""
         predictors_frame = ttk.Frame(self.notebook)
@@ -343,6 +427,21 @@ class StockPredictionGUI:
         # Gráfico inicial vacío
         self.create_empty_graph()
         
+    def setup_models_tab(self):
+        """Configura la pestaña de comparación de modelos"""
+        models_frame = ttk.Frame(self.notebook)
+        self.notebook.add(models_frame, text="⚖️ Modelos")
+        
+        ttk.Label(models_frame, text="Mismo backtest con cada modelo (usa los datos de la sesión seleccionada)",
+                 font=("Arial", 10)).pack(pady=(10, 5))
+        
+        columns = ("Modelo", "Tiempo (s)", "Entrenamiento (s)", "Accuracy", "Precision", "Predicciones")
+        self.models_tree = ttk.Treeview(models_frame, columns=columns, show="headings", height=8)
+        for column in columns:
+            self.models_tree.heading(column, text=column, anchor="center")
+            self.models_tree.column(column, width=220 if column == "Modelo" else 120, anchor="center")
+        self.models_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
     def setup_logs_tab(self):
         """Configura la pestaña de logs"""
         logs_frame = ttk.Frame(self.notebook)
@@ -353,10 +452,21 @@ class StockPredictionGUI:
                                                   width=80, height=20)
         self.logs_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Botón para limpiar logs
-        clear_button = ttk.Button(logs_frame, text="🗑️ Limpiar Logs", 
+        # Botones para limpiar logs y exportar el perfil del análisis
+        buttons_frame = ttk.Frame(logs_frame)
+        buttons_frame.pack(pady=5)
+        
+        clear_button = ttk.Button(buttons_frame, text="🗑️ Limpiar Logs", 
                                  command=self.clear_logs)
-        clear_button.pack(pady=5)
+        clear_button.pack(side=tk.LEFT, padx=5)
+        
+        export_json_button = ttk.Button(buttons_frame, text="⏱️ Exportar Perfil (JSON)",
+                                       command=lambda: self.export_profile("json"))
+        export_json_button.pack(side=tk.LEFT, padx=5)
+        
+        export_trace_button = ttk.Button(buttons_frame, text="⏱️ Exportar Chrome Trace",
+                                        command=lambda: self.export_profile("chrome"))
+        export_trace_button.pack(side=tk.LEFT, padx=5)
         
     def log_message(self, message):
         """Añade un mensaje al log"""
@@ -368,6 +478,25 @@ class StockPredictionGUI:
         """Limpia el área de logs"""
         self.logs_text.delete(1.0, tk.END)
         
+    def export_profile(self, fmt):
+        """Guarda el perfil del último análisis como JSON o Chrome trace"""
+        if self.profiler is None or not self.profiler.records:
+            messagebox.showinfo("Perfil", "Todavía no hay un análisis para exportar.")
+            return
+        default_name = "profile.json" if fmt == "json" else "trace.json"
+        path = filedialog.asksaveasfilename(defaultextension=".json", initialfile=default_name,
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            if fmt == "json":
+                self.profiler.to_json(path)
+            else:
+                self.profiler.to_chrome_trace(path)
+            self.log_message(f"💾 Perfil exportado en {path}")
+        except Exception as e:
+            self.log_message(f"❌ Error exportando perfil: {str(e)}")
+        
     def on_tab_changed(self, event):
         """Callback para cuando se cambia de pestaña"""
         pass  # Simplificado para evitar problemas
@@ -397,40 +526,117 @@ class StockPredictionGUI:
         return True
         
     def start_analysis(self):
-        """Inicia el análisis en un hilo separado"""
+        """Inicia el análisis en el proceso worker"""
         if not self.validate_inputs():
             return
             
-        # Verificar si ya hay un análisis en curso
+        stock_symbol = self.stock_symbol_var.get().strip().upper()
+        stock_name = self.stock_name_var.get().strip()
+        
+        # Verificar si este símbolo ya se está analizando con el mismo modelo
+        existing = self.sessions.get(session_key(stock_symbol, self.model_name))
+        if existing is not None and existing.active:
+            messagebox.showwarning("Análisis en Curso",
+                                   f"{stock_symbol} ya se está analizando con {model_label(self.model_name)}.")
+            self.show_session(existing.key)
+            return
+            
+        # Resetear modelo y limpiar el cache de noticias de los workers
+        self.reset_model()
+        self.pool.clear_sentiment_cache()
+        
+        # Encolar el análisis en el pool; otros símbolos pueden seguir analizándose en paralelo
+        task = self.pool.submit(stock_symbol, stock_name, self.model_name)
+        session = AnalysisSession(stock_symbol, stock_name, self.model_name, task)
+        self.sessions.add(session)
+        self.refresh_session_row(session)
+        self.safe_log_message(f"🗂️ [{stock_symbol}] Análisis en cola con {model_label(self.model_name)} "
+                              f"(pool de {self.pool.workers} workers)")
+        self.show_session(session.key)
+        
+    def on_model_selected(self, event=None):
+        """Actualiza el modelo elegido en el combo"""
+        labels = {model_label(name): name for name in MODEL_BACKENDS}
+        self.model_name = labels.get(self.model_var.get(), DEFAULT_MODEL)
+        
+    def start_model_comparison(self):
+        """Compara todos los modelos del registro en el pool de workers"""
         if self.analysis_running:
             messagebox.showwarning("Análisis en Curso", "Ya hay un análisis en progreso. Por favor espere a que termine.")
             return
+        session = self.sessions.get(self.current_session)
+        if session is None or session.stock_data is None:
+            messagebox.showinfo("Comparar Modelos", "Primero realiza un análisis para cargar los datos.")
+            return
             
-        # Deshabilitar botón de análisis y habilitar cancelar
         self.analyze_button.config(state="disabled")
-        self.cancel_button.config(state="normal")
-        self.clear_previous_results()
+        self.compare_button.config(state="disabled")
+        for item in self.models_tree.get_children():
+            self.models_tree.delete(item)
+            
+        self.analysis_running = True
+        # La matriz de la sesión viaja al worker en memoria compartida
+        task = self.pool.submit(session.symbol, session.name, kind='compare', matrix=session.stock_data)
+        self.jobs[task] = 'compare'
         
-        # Resetear modelo y limpiar cache
-        self.reset_model()
-        clear_sentiment_cache()
+    def start_next_session_prediction(self):
+        """Predice la próxima sesión en el pool de workers"""
+        if not self.validate_inputs():
+            return
+        if self.analysis_running:
+            messagebox.showwarning("Análisis en Curso", "Ya hay un análisis en progreso. Por favor espere a que termine.")
+            return
+            
+        self.analyze_button.config(state="disabled")
+        self.next_session_button.config(state="disabled")
+        self.next_session_var.set("Calculando...")
         
-        # Iniciar análisis en hilo separado
-        self.analysis_thread = threading.Thread(target=self.perform_analysis)
-        self.analysis_thread.daemon = True
         self.analysis_running = True
-        self.analysis_thread.start()
+        task = self.pool.submit(self.stock_symbol_var.get().strip().upper(), self.stock_name_var.get().strip(),
+                                self.model_name, kind='next_session')
+        self.jobs[task] = 'next_session'
+        
+    def apply_job_message(self, kind, message):
+        """Aplica los mensajes del worker de una comparación de modelos o predicción de la próxima sesión"""
+        if message['type'] == 'progress':
+            self.safe_update_progress(message['value'], message['status'])
+        elif message['type'] == 'log':
+            self.safe_log_message(message['text'])
+        elif message['type'] == 'result' and kind == 'compare':
+            self.ui_queue.put({'type': 'model_comparison', 'data': message['comparison']})
+            self.safe_update_progress(100, "Comparación de modelos completada")
+        elif message['type'] == 'result':
+            result = message['prediction']
+            direction = "SUBE 📈" if result['prediction'] == 1 else "BAJA 📉"
+            self.ui_queue.put({
+                'type': 'next_session',
+                'text': f"{direction} (p={result['probability']:.2%}) después del {result['date'].strftime('%Y-%m-%d')}"
+            })
+            self.safe_update_progress(100, "Predicción de la próxima sesión completada")
+        elif message['type'] in ('error', 'cancelled'):
+            text = message.get('text', "cancelado")
+            if kind == 'compare':
+                self.safe_log_message(f"❌ Error comparando modelos: {text}")
+            else:
+                self.ui_queue.put({'type': 'next_session', 'text': "N/A"})
+                self.safe_log_message(f"❌ Error prediciendo la próxima sesión: {text}")
+            self.safe_update_progress(0, f"Error: {text}")
+        elif message['type'] == 'done':
+            del self.jobs[message['task']]
+            self.ui_queue.put({'type': 'analysis_complete'})
         
     def cancel_analysis(self):
-        """Cancela el análisis en curso"""
-        if self.analysis_running:
-            self.analysis_running = False
-            self.safe_log_message("🛑 Cancelando análisis...")
+        """Cancela el análisis de la sesión seleccionada (en curso o en cola)"""
+        session = self.sessions.get(self.current_session)
+        if session is not None and session.active:
+            self.pool.cancel(session.task)
+            session.status = CANCELLED
+            session.progress = 0
+            session.status_text = "Análisis cancelado"
+            self.refresh_session_row(session)
+            self.safe_log_message(f"🛑 [{session.symbol}] Cancelando análisis...")
             self.safe_update_progress(0, "Análisis cancelado")
-            
-            # Rehabilitar botones
-            self.analyze_button.config(state="normal")
-            self.cancel_button.config(state="disabled")
+            self.update_cancel_button()
             
             messagebox.showinfo("Análisis Cancelado", "El análisis ha sido cancelado exitosamente.")
         
@@ -452,156 +658,157 @@ class StockPredictionGUI:
         self.stock_data = None
         self.predictors = None
         self.predictions = None
+        self.evaluation = None
         self.feature_importance = None
         
+        # Limpiar tabla por año
+        for item in self.yearly_tree.get_children():
+            self.yearly_tree.delete(item)
+        
         # Crear gráfico vacío
         self.create_empty_graph()
         
-    def perform_analysis(self):
-        """Realiza el análisis completo"""
-        try:
-            stock_symbol = self.stock_symbol_var.get().strip().upper()
-            stock_name = self.stock_name_var.get().strip()
-            
-            self.safe_update_progress(0, "Iniciando análisis...")
-            self.safe_log_message(f"🚀 Iniciando análisis de {stock_symbol} ({stock_name})")
-            
-            # Limpiar cache de noticias adicional
-            self.safe_update_progress(10, "Limpiando cache de noticias...")
-            clear_sentiment_cache()
-            self.safe_log_message("🧹 Cache de noticias limpiado")
-            
-            # Pequeña pausa para asegurar que el cache se limpie
-            time.sleep(0.5)
-            
-            # Obtener y procesar datos
-            self.safe_update_progress(20, "Obteniendo datos históricos...")
-            self.safe_log_message("📊 Obteniendo datos históricos de la acción...")
-            
-            try:
-                self.stock_data, self.predictors = setDataForTraining(stock_symbol, stock_name)
-                self.safe_log_message(f"✅ Datos obtenidos: {len(self.stock_data)} registros, {len(self.predictors)} predictores")
-                
-                # Solo mostrar info básica inicialmente, las fechas reales se mostrarán después del backtesting
-                dataset_info = f"Registros: {len(self.stock_data)} | Predictores: {len(self.predictors)} | Preparando análisis..."
-                self.ui_queue.put({
-                    'type': 'dataset_info',
-                    'info': dataset_info
-                })
-                
-            except Exception as e:
-                raise Exception(f"Error al obtener datos: {str(e)}")
-            
-            # Verificar que el análisis no fue cancelado
-            if not self.analysis_running:
-                return
-                
-            # Ejecutar backtesting
-            self.safe_update_progress(40, "Ejecutando backtesting...")
-            self.safe_log_message("🔄 Ejecutando backtesting con modelo Random Forest...")
-            
-            try:
-                self.predictions = backtest(self.stock_data, self.model, self.predictors, 
-                                          start=2500, step=250, 
-                                          stockSymbol=stock_symbol, stockName=stock_name)
-                
-                if self.predictions.empty:
-                    raise Exception("No se pudieron generar predicciones")
-                    
-                self.safe_log_message(f"✅ Backtesting completado: {len(self.predictions)} predicciones generadas")
-                
-                # Actualizar información del dataset con fechas reales de predicciones
-                start_date = self.predictions.index[0].strftime('%Y-%m-%d')
-                end_date = self.predictions.index[-1].strftime('%Y-%m-%d')
-                total_records = len(self.stock_data)
-                prediction_records = len(self.predictions)
-                
-                dataset_info = f"Registros: {total_records} | Predictores: {len(self.predictors)} | Predicciones: {prediction_records} | Período: {start_date} a {end_date}"
-                self.ui_queue.put({
-                    'type': 'dataset_info',
-                    'info': dataset_info
-                })
-                
-            except Exception as e:
-                raise Exception(f"Error en backtesting: {str(e)}")
-            
-            # Verificar que el análisis no fue cancelado
-            if not self.analysis_running:
-                return
-                
-            # Calcular métricas
-            self.safe_update_progress(70, "Calculando métricas...")
-            self.safe_log_message("📈 Calculando métricas de rendimiento...")
-            
-            try:
-                precision = precision_score(self.predictions["Target"], self.predictions["Predictions"])
-                accuracy = (self.predictions["Target"] == self.predictions["Predictions"]).mean()
-                
-                # Actualizar UI con métricas thread-safe
-                self.ui_queue.put({
-                    'type': 'metrics',
-                    'accuracy': f"{accuracy:.4f} ({accuracy*100:.2f}%)",
-                    'precision': f"{precision:.4f} ({precision*100:.2f}%)"
-                })
-                
-                self.safe_log_message(f"📊 Accuracy: {accuracy:.4f} ({accuracy*100:.2f}%)")
-                self.safe_log_message(f"📊 Precision: {precision:.4f} ({precision*100:.2f}%)")
-                
-            except Exception as e:
-                raise Exception(f"Error al calcular métricas: {str(e)}")
+    def poll_worker(self):
+        """Aplica los mensajes del pool de workers a su sesión"""
+        for message in self.pool.poll():
+            if message['task'] in self.jobs:
+                self.apply_job_message(self.jobs[message['task']], message)
+                continue
+            session = self.sessions.by_task(message['task'])
+            if session is None or (session.status == CANCELLED and message['type'] != 'done'):
+                # Mensaje de una sesión cancelada, reemplazada o descartada
+                if message['type'] == 'result':
+                    release_arrays(message['arrays'])
+                continue
             
-            # Verificar que el análisis no fue cancelado
-            if not self.analysis_running:
-                return
-                
-            # Calcular importancia de características
-            self.safe_update_progress(85, "Calculando importancia de predictores...")
-            self.safe_log_message("🏆 Calculando importancia de predictores...")
+            if message['type'] == 'started':
+                session.status = RUNNING
+                session.status_text = f"Analizando en {message['worker']}..."
+            elif message['type'] == 'progress':
+                session.progress = message['value']
+                session.status_text = message['status']
+            elif message['type'] == 'log':
+                self.safe_log_message(f"[{session.symbol}] {message['text']}")
+            elif message['type'] == 'dataset_info':
+                session.dataset_info = message['info']
+            elif message['type'] == 'result':
+                self.load_session_result(session, message)
+            elif message['type'] == 'error':
+                session.status = FAILED
+                session.error = message['text']
+                session.progress = 0
+                session.status_text = f"Error: {message['text']}"
+                self.safe_log_message(f"❌ [{session.symbol}] Error: {message['text']}")
+                if session.key == self.current_session:
+                    self.ui_queue.put({
+                        'type': 'error',
+                        'text': f"Error durante el análisis de {session.symbol}:\n{message['text']}"
+                    })
+            elif message['type'] == 'done':
+                self.evict_sessions()
+                continue
             
-            try:
-                feature_importance = pd.DataFrame({
-                    'Feature': self.predictors,
-                    'Importance': self.model.feature_importances_
-                }).sort_values('Importance', ascending=False)
-                
-                # Enviar datos de predictores thread-safe
-                self.ui_queue.put({
-                    'type': 'predictors',
-                    'data': feature_importance
-                })
-                self.safe_log_message(f"✅ Top 5 predictores calculados")
-                
-            except Exception as e:
-                raise Exception(f"Error al calcular importancia: {str(e)}")
+            self.refresh_session_row(session)
+            if session.key == self.current_session:
+                self.progress_var.set(session.progress)
+                self.status_var.set(session.status_text)
+                self.dataset_info_var.set(session.dataset_info)
+                self.update_cancel_button()
+        
+    def load_session_result(self, session, message):
+        """Toma el resultado del worker (arrays en memoria compartida) y lo guarda en la sesión"""
+        session.stock_data, session.predictors, session.predictions, importances = load_result(message)
+        
+        # Se calcula una sola vez: métricas y gráficos leen de este resumen
+        session.evaluation = EvaluationSummary(session.predictions)
+        
+        # Información del dataset con fechas reales de predicciones
+        start_date = session.predictions.index[0].strftime('%Y-%m-%d')
+        end_date = session.predictions.index[-1].strftime('%Y-%m-%d')
+        session.dataset_info = f"Registros: {len(session.stock_data)} | Predictores: {len(session.predictors)} | Predicciones: {len(session.predictions)} | Período: {start_date} a {end_date}"
+        
+        if importances is not None:
+            session.feature_importance = pd.DataFrame({
+                'Feature': session.predictors,
+                'Importance': importances
+            }).sort_values('Importance', ascending=False)
+        
+        # Perfil de tiempos medido en el worker
+        session.profiler = Profiler.from_records(message['profile'])
+        
+        session.status = COMPLETED
+        session.progress = 100
+        session.status_text = "¡Análisis completado exitosamente!"
+        
+        accuracy = session.evaluation.accuracy
+        precision = session.evaluation.precision
+        self.safe_log_message(f"📊 [{session.symbol}] Accuracy: {accuracy:.4f} ({accuracy*100:.2f}%)")
+        self.safe_log_message(f"📊 [{session.symbol}] Precision: {precision:.4f} ({precision*100:.2f}%)")
+        self.safe_log_message(f"⏱️ [{session.symbol}] Perfil del análisis ({message['seconds']:.1f}s en el worker):\n{session.profiler.report()}")
+        self.safe_log_message(f"🎉 [{session.symbol}] ¡Análisis completado exitosamente!")
+        
+        if session.key == self.current_session:
+            self.show_session(session.key)
             
-            # Guardar predicciones
-            self.safe_update_progress(95, "Guardando resultados...")
-            try:
-                self.predictions.to_csv("predictions.csv")
-                self.safe_log_message("💾 Predicciones guardadas en predictions.csv")
-            except Exception as e:
-                self.safe_log_message(f"⚠️ Error al guardar: {str(e)}")
+    def refresh_session_row(self, session):
+        """Actualiza (o agrega) la fila de la sesión en la lista de sesiones"""
+        accuracy = f"{session.evaluation.accuracy:.2%}" if session.evaluation is not None else "-"
+        values = (session.symbol, model_label(session.model_name), session.status,
+                  f"{session.progress:.0f}%", accuracy)
+        if self.sessions_tree.exists(session.key):
+            self.sessions_tree.item(session.key, values=values)
+        else:
+            self.sessions_tree.insert("", 0, iid=session.key, values=values)
             
-            # Completar
-            if self.analysis_running:  # Solo completar si no fue cancelado
-                self.safe_update_progress(100, "¡Análisis completado exitosamente!")
-                self.safe_log_message("🎉 ¡Análisis completado exitosamente!")
-                
-                # Habilitar gráficos thread-safe
-                self.ui_queue.put({'type': 'enable_graph'})
+    def evict_sessions(self):
+        """Descarta de memoria las sesiones terminadas menos usadas por encima del límite"""
+        for session in self.sessions.evict(keep=self.current_session):
+            if self.sessions_tree.exists(session.key):
+                self.sessions_tree.delete(session.key)
+            self.safe_log_message(f"🗑️ [{session.symbol}] Sesión descartada de memoria "
+                                  f"(límite de {self.sessions.max_finished} sesiones terminadas)")
             
-        except Exception as e:
-            if self.analysis_running:  # Solo mostrar error si no fue cancelado
-                self.safe_log_message(f"❌ Error: {str(e)}")
-                self.safe_update_progress(0, f"Error: {str(e)}")
-                self.ui_queue.put({
-                    'type': 'error',
-                    'text': f"Error durante el análisis:\n{str(e)}"
-                })
+    def on_session_selected(self, event=None):
+        """Muestra la sesión elegida en la lista"""
+        selection = self.sessions_tree.selection()
+        if selection and selection[0] != self.current_session:
+            self.show_session(selection[0])
             
-        finally:
-            # Notificar finalización thread-safe
-            self.ui_queue.put({'type': 'analysis_complete'})
+    def show_session(self, key):
+        """Carga en las pestañas las métricas, predictores y gráficos de una sesión"""
+        session = self.sessions.get(key)
+        if session is None:
+            return
+        self.current_session = key
+        self.sessions.touch(key)
+        if self.sessions_tree.selection() != (key,):
+            self.sessions_tree.selection_set(key)
+        
+        self.clear_previous_results()
+        self.stock_data = session.stock_data
+        self.predictors = session.predictors
+        self.predictions = session.predictions
+        self.evaluation = session.evaluation
+        self.feature_importance = session.feature_importance
+        self.profiler = session.profiler
+        
+        self.dataset_info_var.set(session.dataset_info)
+        self.progress_var.set(session.progress)
+        self.status_var.set(session.status_text)
+        if self.evaluation is not None:
+            accuracy = self.evaluation.accuracy
+            precision = self.evaluation.precision
+            self.accuracy_var.set(f"{accuracy:.4f} ({accuracy*100:.2f}%)")
+            self.precision_var.set(f"{precision:.4f} ({precision*100:.2f}%)")
+            self.update_yearly_display(self.evaluation.per_year)
+            self.update_predictors_display()
+            self.update_graph()
+        self.update_cancel_button()
+        
+    def update_cancel_button(self):
+        """El botón cancelar aplica a la sesión seleccionada si está en cola o en curso"""
+        session = self.sessions.get(self.current_session)
+        self.cancel_button.config(state="normal" if session is not None and session.active else "disabled")
             
     def update_predictors_display(self):
         """Actualiza la visualización de predictores"""
@@ -625,6 +832,9 @@ class StockPredictionGUI:
     
     def create_empty_graph(self):
         """Crea un gráfico vacío inicial"""
+        if self.predictions_lod is not None:
+            self.predictions_lod.disconnect()
+            self.predictions_lod = None
         self.fig.clear()
         
         ax = self.fig.add_subplot(111)
@@ -649,25 +859,31 @@ class StockPredictionGUI:
     
     def update_graph(self):
         """Actualiza el gráfico según el tipo seleccionado"""
-        if self.predictions is None or self.predictions.empty:
+        if self.evaluation is None or self.evaluation.size == 0:
             self.create_empty_graph()
             return
             
         graph_type = self.graph_type_var.get()
         
         try:
-            self.fig.clear()
-            
-            if graph_type == "predicciones":
-                self.create_predictions_graph()
-            elif graph_type == "accuracy":
-                self.create_accuracy_graph()
-            elif graph_type == "distribucion":
-                self.create_distribution_graph()
-            elif graph_type == "importancia":
-                self.create_importance_graph()
+            start_time = time.perf_counter()
+            with self.profiler.span('grafico.render', tipo=graph_type) if self.profiler else nullcontext():
+                if self.predictions_lod is not None:
+                    self.predictions_lod.disconnect()
+                    self.predictions_lod = None
+                self.fig.clear()
                 
-            self.canvas.draw()
+                if graph_type == "predicciones":
+                    self.create_predictions_graph()
+                elif graph_type == "accuracy":
+                    self.create_accuracy_graph()
+                elif graph_type == "distribucion":
+                    self.create_distribution_graph()
+                elif graph_type == "importancia":
+                    self.create_importance_graph()
+                    
+                self.canvas.draw()
+            self.log_message(f"🖼️ Gráfico '{graph_type}' renderizado en {(time.perf_counter() - start_time) * 1000:.0f} ms")
             
         except Exception as e:
             self.log_message(f"❌ Error creando gráfico: {str(e)}")
@@ -677,15 +893,18 @@ class StockPredictionGUI:
         ax = self.fig.add_subplot(111)
         
         # Usar todas las predicciones, no solo una muestra
-        dates = self.predictions.index
-        targets = self.predictions['Target']
-        predictions = self.predictions['Predictions']
-        
-        # Crear gráfico de líneas más claro
-        ax.plot(dates, targets, 'o-', color='blue', alpha=0.7, markersize=1.5, linewidth=1, label='Real')
-        ax.plot(dates, predictions, 's-', color='red', alpha=0.7, markersize=1.5, linewidth=1, label='Predicción')
-        
-        ax.set_title(f'Predicciones vs Realidad ({len(self.predictions)} predicciones)', fontsize=12, fontweight='bold')
+        dates = self.evaluation.dates
+        targets = self.evaluation.target
+        predictions = self.evaluation.predictions
+        
+        # Crear gráfico de líneas más claro; solo se dibujan los puntos que entran en el
+        # ancho visible y al hacer zoom se vuelven a pedir desde los datos completos
+        self.predictions_lod = DownsampledLines(ax, dates)
+        self.predictions_lod.plot(targets, 'o-', color='blue', alpha=0.7, markersize=1.5, linewidth=1, label='Real')
+        self.predictions_lod.plot(predictions, 's-', color='red', alpha=0.7, markersize=1.5, linewidth=1, label='Predicción')
+        self.predictions_lod.show_all()
+        
+        ax.set_title(f'Predicciones vs Realidad ({self.evaluation.size} predicciones)', fontsize=12, fontweight='bold')
         ax.set_xlabel('Fecha', fontsize=10)
         ax.set_ylabel('Dirección (0=Baja, 1=Sube)', fontsize=10)
         ax.set_ylim(-0.1, 1.1)
@@ -707,8 +926,7 @@ class StockPredictionGUI:
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right', fontsize=8)
         
         # Agregar estadísticas
-        accuracy = (targets == predictions).mean()
-        ax.text(0.02, 0.98, f'Accuracy: {accuracy:.2%}', transform=ax.transAxes, 
+        ax.text(0.02, 0.98, f'Accuracy: {self.evaluation.accuracy:.2%}', transform=ax.transAxes, 
                 bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
                 verticalalignment='top', fontsize=9)
         
@@ -719,18 +937,11 @@ class StockPredictionGUI:
         """Crea gráfico de accuracy por período"""
         ax = self.fig.add_subplot(111)
         
-        # Calcular accuracy por ventanas de tiempo
-        window_size = 100
-        accuracies = []
-        dates = []
-        
-        for i in range(window_size, len(self.predictions), 25):
-            window_data = self.predictions.iloc[i-window_size:i]
-            accuracy = (window_data['Target'] == window_data['Predictions']).mean()
-            accuracies.append(accuracy)
-            dates.append(window_data.index[-1])
+        # Accuracy por ventanas de tiempo, ya calculada en el resumen de evaluación
+        by_period = self.evaluation.accuracy_by_period
+        dates = by_period.index
         
-        ax.plot(dates, accuracies, linewidth=2, color='blue', marker='o', markersize=3)
+        ax.plot(dates, by_period.to_numpy(), linewidth=2, color='blue', marker='o', markersize=3)
         ax.axhline(y=0.5, color='red', linestyle='--', alpha=0.7, label='Línea base (50%)')
         
         ax.set_title('Evolución del Accuracy por Período', fontsize=12, fontweight='bold')
@@ -758,13 +969,13 @@ class StockPredictionGUI:
         """Crea gráfico de distribución de predicciones"""
         ax = self.fig.add_subplot(111)
         
-        # Contar predicciones
-        pred_counts = self.predictions['Predictions'].value_counts()
-        target_counts = self.predictions['Target'].value_counts()
+        # Conteos de la matriz de confusión del resumen de evaluación
+        pred_counts = self.evaluation.predicted_counts
+        target_counts = self.evaluation.target_counts
         
         x = ['Baja (0)', 'Sube (1)']
-        pred_values = [pred_counts.get(0, 0), pred_counts.get(1, 0)]
-        target_values = [target_counts.get(0, 0), target_counts.get(1, 0)]
+        pred_values = [pred_counts[0], pred_counts[1]]
+        target_values = [target_counts[0], target_counts[1]]
         
         x_pos = range(len(x))
         width = 0.35
@@ -834,12 +1045,12 @@ def main():
             if hasattr(app, 'analysis_running') and app.analysis_running:
                 app.analysis_running = False
             
+            # Detener los procesos del pool
+            app.pool.shutdown()
+            
             # Limpiar figuras de matplotlib
             plt.close('all')
             
-            # Limpiar cache de noticias
-            clear_sentiment_cache()
-            
         except Exception as e:
             print(f"Error durante limpieza: {e}")
         finally:
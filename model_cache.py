@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+import tempfile
+import joblib
+
+# Directorio con los modelos entrenados por paso del backtest (un archivo joblib por modelo)
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.model_cache'))
+MODEL_CACHE_MAX_MB = float(os.getenv('MODEL_CACHE_MAX_MB', '2048'))
+
+# Parámetros que no cambian el modelo entrenado
+IGNORED_PARAMS = {'n_jobs', 'verbose'}
+
+
+def model_key(model, predictors, train_index, X_train, y_train, stockSymbol=None):
+    """
+    Clave del modelo entrenado con un slice: hash del símbolo, la última fecha de
+    entrenamiento, los predictores, los hiperparámetros y el contenido del slice
+    (así un ajuste de precios por splits/dividendos invalida los modelos viejos).
+    """
+    params = {name: value for name, value in model.get_params().items() if name not in IGNORED_PARAMS}
+    header = json.dumps({
+        'symbol': stockSymbol,
+        'model': type(model).__name__,
+        'params': params,
+        'predictors': list(predictors),
+        'rows': len(train_index),
+        'last_date': str(train_index[-1]) if len(train_index) else None,
+    }, sort_keys=True, default=str)
+    digest = hashlib.blake2b(header.encode('utf-8'), digest_size=20)
+    digest.update(memoryview(X_train).cast('B'))
+    digest.update(memoryview(y_train).cast('B'))
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    Cache en disco de modelos entrenados por símbolo y paso del backtest.
+
+    Cada modelo se guarda con joblib bajo su clave; al superar `max_mb` se eliminan
+    los usados hace más tiempo (la fecha de modificación marca el último uso).
+    """
+
+    def __init__(self, directory=MODEL_CACHE_DIR, max_mb=MODEL_CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def get(self, key):
+        """Devuelve el modelo guardado con `key` o None"""
+        # Otro proceso (un worker del pool) puede borrar el archivo en cualquier momento
+        path = self._path(key)
+        try:
+            model = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Modelo en cache corrupto, se descarta: {e}")
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return model
+
+    def put(self, key, model):
+        os.makedirs(self.directory, exist_ok=True)
+        # Escribir a un archivo temporal propio y renombrar: no deja archivos corruptos
+        # y dos procesos que guardan la misma clave no pisan el temporal del otro
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{key}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                joblib.dump(model, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.joblib'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for _, _, path in self._entries():
+                self._remove(path)
+
+
+model_cache = ModelCache()
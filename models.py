@@ -0,0 +1,73 @@
+import os
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier, HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
+
+# Núcleos que usan los modelos de árboles (-1 = todos). Dentro de un pool de procesos
+# cada worker usa solo su parte (ver worker_n_jobs) para no sobresuscribir la CPU
+MODEL_N_JOBS = int(os.getenv('MODEL_N_JOBS', '-1'))
+# Modelo por defecto de la GUI y del análisis en lote
+DEFAULT_MODEL = os.getenv('MODEL_BACKEND', 'random_forest')
+
+
+def _random_forest():
+    return RandomForestClassifier(n_estimators=200, min_samples_split=50, random_state=1, n_jobs=MODEL_N_JOBS)
+
+
+def _extra_trees():
+    return ExtraTreesClassifier(n_estimators=200, min_samples_split=50, random_state=1, n_jobs=MODEL_N_JOBS)
+
+
+def _hist_gradient_boosting():
+    # Agrupa cada predictor en 255 bins una sola vez por fit: entrenar cuesta mucho
+    # menos que evaluar todos los cortes posibles en cada nodo como los bosques
+    return HistGradientBoostingClassifier(max_iter=200, learning_rate=0.05, max_leaf_nodes=31,
+                                          min_samples_leaf=50, l2_regularization=1.0,
+                                          early_stopping=False, random_state=1)
+
+
+# nombre -> (etiqueta para la GUI, constructor)
+MODEL_BACKENDS = {
+    'random_forest': ("Random Forest (multinúcleo)", _random_forest),
+    'hist_gradient_boosting': ("Histogram Gradient Boosting", _hist_gradient_boosting),
+    'extra_trees': ("Extra Trees (multinúcleo)", _extra_trees),
+}
+
+
+def worker_n_jobs(workers):
+    """Núcleos por worker cuando `workers` procesos entrenan modelos a la vez"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def create_model(name=None, n_jobs=None):
+    """
+    Crea un modelo sin entrenar del registro (por defecto, DEFAULT_MODEL).
+    `n_jobs` reemplaza a MODEL_N_JOBS en los modelos que lo admiten.
+    """
+    name = name or DEFAULT_MODEL
+    if name not in MODEL_BACKENDS:
+        raise ValueError(f"Modelo desconocido: {name}. Opciones: {', '.join(MODEL_BACKENDS)}")
+    model = MODEL_BACKENDS[name][1]()
+    if n_jobs is not None and 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    return model
+
+
+def model_label(name):
+    return MODEL_BACKENDS[name][0]
+
+
+def feature_importances(model, X=None, y=None, n_jobs=None):
+    """
+    Importancia de cada predictor del modelo entrenado. Los bosques la traen
+    calculada; para los modelos sin feature_importances_ (gradient boosting) se usa
+    importancia por permutación sobre X, y con `n_jobs` núcleos (por defecto
+    MODEL_N_JOBS). Devuelve None si no se puede calcular.
+    """
+    if hasattr(model, 'feature_importances_'):
+        return model.feature_importances_
+    if X is None or y is None:
+        return None
+    result = permutation_importance(model, X, y, n_repeats=3, random_state=1,
+                                    n_jobs=MODEL_N_JOBS if n_jobs is None else n_jobs)
+    return np.clip(result.importances_mean, 0, None)
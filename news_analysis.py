@@ -1,21 +1,17 @@
-import requests
-from transformers import pipeline
-import pandas as pd
-import logging
-import warnings
-from datetime import datetime, timedelta
-
-import requests
-from transformers import pipeline
 import pandas as pd
 import logging
+import threading
 import warnings
 from datetime import datetime, timedelta
+from news_client import fetch_news
+from profiling import span
+from sentiment_cache import ArticleSentimentCache, article_key, SCORE_FIELDS
 
 # Suprimir warnings y mensajes verbosos
 warnings.filterwarnings("ignore")
 logging.getLogger("transformers").setLevel(logging.ERROR)
 import os
+import time
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 
 # Función simple para cargar archivo .env
@@ -41,6 +37,14 @@ NEWS_API_KEY = os.getenv('NEWS_API_KEY', 'your_news_api_key_here')
 NEWS_API_BASE_URL = os.getenv('NEWS_API_BASE_URL', 'https://newsapi.org/v2/everything')
 NEWS_API_LANGUAGE = os.getenv('NEWS_API_LANGUAGE', 'en')
 NEWS_API_SORT_BY = os.getenv('NEWS_API_SORT_BY', 'relevancy')
+# Cantidad de artículos que FinBERT analiza por lote
+SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', '16'))
+# Modelo y backend de análisis de sentimiento (transformers, onnx o quantized)
+SENTIMENT_MODEL_ID = os.getenv('SENTIMENT_MODEL_ID', 'ProsusAI/finbert')
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'transformers')
+
+# Valores de sentiment cuando no hay noticias (positivo, negativo, neutral)
+NEUTRAL_SENTIMENT = (0.33, 0.33, 0.34)
 
 # Validar que la API key esté configurada
 if NEWS_API_KEY == 'your_news_api_key_here':
@@ -48,31 +52,95 @@ if NEWS_API_KEY == 'your_news_api_key_here':
     print("   Para obtener análisis de sentimientos completo, configura tu API key de NewsAPI")
     print("   Visita: https://newsapi.org/register")
 
-# Cache global para evitar requests duplicadas
-_sentiment_cache = {}
-_bulk_news_cache = {}  # Cache para noticias en bulk
+def _transformers_backend(model_id):
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=model_id, top_k=None)
+
+
+def _onnx_backend(model_id):
+    """FinBERT exportado a ONNX Runtime (requiere `optimum[onnxruntime]`)"""
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+    model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, top_k=None)
 
-def get_news(api_url):
-    response = requests.get(api_url)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return None
 
-def get_bulk_news_for_period(stockSymbol, stockName=None, days_back=30):
+def _quantized_backend(model_id):
+    """FinBERT con las capas lineales cuantizadas dinámicamente a int8 (CPU)"""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, top_k=None)
+
+
+SENTIMENT_BACKENDS = {
+    'transformers': _transformers_backend,
+    'onnx': _onnx_backend,
+    'quantized': _quantized_backend,
+}
+
+
+class SentimentModel:
     """
-    Obtiene todas las noticias de los últimos N días en una sola llamada
-    y las organiza por fecha para uso eficiente
+    Mantiene un único pipeline de sentimiento por proceso.
+
+    El modelo se carga recién en el primer uso (thread-safe) y puede precargarse
+    con warm_up() o liberarse con unload(). `backend` es el nombre de un backend
+    de SENTIMENT_BACKENDS o una función model_id -> pipeline.
     """
-    global _bulk_news_cache
-    
-    cache_key = f"{stockSymbol}_{days_back}"
-    
-    
-    # Si ya tenemos las noticias en cache, devolverlas
-    if cache_key in _bulk_news_cache:
-        return _bulk_news_cache[cache_key]
 
+    def __init__(self, model_id=SENTIMENT_MODEL_ID, backend=SENTIMENT_BACKEND):
+        self._lock = threading.Lock()
+        self._pipeline = None
+        self.model_id = model_id
+        self.backend = backend
+
+    @property
+    def loaded(self):
+        return self._pipeline is not None
+
+    def get(self):
+        """Devuelve el pipeline, cargándolo si todavía no existe"""
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    factory = SENTIMENT_BACKENDS[self.backend] if isinstance(self.backend, str) else self.backend
+                    print(f"🧠 Cargando modelo de sentimiento {self.model_id}...")
+                    with span('noticias.carga_modelo', backend=self.backend):
+                        self._pipeline = factory(self.model_id)
+        return self._pipeline
+
+    def warm_up(self):
+        self.get()
+
+    def unload(self):
+        with self._lock:
+            self._pipeline = None
+
+    def set_backend(self, backend, model_id=None):
+        """Cambia el backend (y opcionalmente el modelo); se carga en el próximo uso"""
+        with self._lock:
+            self.backend = backend
+            if model_id is not None:
+                self.model_id = model_id
+            self._pipeline = None
+
+
+# Modelo de sentimiento compartido por todo el proceso
+sentiment_model = SentimentModel()
+
+# Scores por artículo persistidos entre ejecuciones
+article_sentiment_cache = ArticleSentimentCache()
+
+# Cache global para evitar requests duplicadas
+_sentiment_cache = {}
+_bulk_news_cache = {}  # Cache para noticias en bulk
+
+def news_query_params(stockSymbol, stockName=None, days_back=30):
+    """Parámetros de búsqueda en NewsAPI para las noticias financieras del símbolo"""
     current_date = pd.Timestamp.now()
     from_date = (current_date - pd.Timedelta(days=days_back)).strftime('%Y-%m-%d')
     to_date = (current_date - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
@@ -87,21 +155,107 @@ def get_bulk_news_for_period(stockSymbol, stockName=None, days_back=30):
     # Dominios financieros confiables
     financial_domains = "reuters.com,bloomberg.com,marketwatch.com,cnbc.com,finance.yahoo.com,wsj.com,ft.com,nasdaq.com"
     
-    # Construir URL usando variables de entorno
-    url = f"{NEWS_API_BASE_URL}?q={search_term}&apiKey={NEWS_API_KEY}&language={NEWS_API_LANGUAGE}&from={from_date}&to={to_date}&domains={financial_domains}&sortBy={NEWS_API_SORT_BY}&pageSize=100"
+    return {
+        'q': search_term,
+        'language': NEWS_API_LANGUAGE,
+        'from': from_date,
+        'to': to_date,
+        'domains': financial_domains,
+        'sortBy': NEWS_API_SORT_BY,
+    }
+
+
+def get_news(params_by_key):
+    """Descarga en paralelo las noticias de varias búsquedas: {key: params} -> {key: artículos o None}"""
+    with span('noticias.descarga', busquedas=len(params_by_key)):
+        return fetch_news(NEWS_API_KEY, NEWS_API_BASE_URL, params_by_key)
+
+def score_articles(sentiment_analyzer, articles, batch_size=None):
+    """
+    Analiza el sentimiento de los artículos en lotes a través del pipeline.
+    El tokenizer trunca cada texto al largo máximo del modelo (512 tokens).
+    Devuelve una lista de (article, sentiment_data) en el mismo orden de `articles`.
+    """
+    batch_size = batch_size or SENTIMENT_BATCH_SIZE
+    scored = []
+    start_time = time.perf_counter()
+
+    for batch_start in range(0, len(articles), batch_size):
+        batch = articles[batch_start:batch_start + batch_size]
+        try:
+            with span('noticias.finbert', articulos=len(batch)):
+                batch_results = sentiment_analyzer(
+                    [article['text'] for article in batch],
+                    batch_size=batch_size,
+                    truncation=True,
+                    max_length=512
+                )
+        except Exception as e:
+            print(f"⚠️ Error analizando lote de {len(batch)} artículos: {e}")
+            continue
+
+        for article, sentiment_results in zip(batch, batch_results):
+            # Con top_k=None cada resultado es la lista de scores de todas las etiquetas
+            if isinstance(sentiment_results, dict):
+                sentiment_results = [sentiment_results]
+            main_prediction = max(sentiment_results, key=lambda x: x['score'])
+            
+            sentiment_data = {
+                'source': article['source'],
+                'sentiment': main_prediction['label'],
+                'confidence': main_prediction['score'],
+                'positive_score': next((s['score'] for s in sentiment_results if s['label'] == 'positive'), 0),
+                'negative_score': next((s['score'] for s in sentiment_results if s['label'] == 'negative'), 0),
+                'neutral_score': next((s['score'] for s in sentiment_results if s['label'] == 'neutral'), 0),
+                'title': article['title']
+            }
+            scored.append((article, sentiment_data))
+
+    elapsed = time.perf_counter() - start_time
+    if scored and elapsed > 0:
+        print(f"🧠 {len(scored)} artículos analizados en {elapsed:.2f}s ({len(scored) / elapsed:.1f} artículos/s, lotes de {batch_size})")
+    return scored
+
+
+def get_bulk_news_for_period(stockSymbol, stockName=None, days_back=30, batch_size=None, articles=None):
+    """
+    Obtiene todas las noticias de los últimos N días en una sola llamada
+    y las organiza por fecha para uso eficiente.
+    Si se pasan `articles` (ya descargados) no se consulta la API.
+    """
+    global _bulk_news_cache
+    
+    cache_key = f"{stockSymbol}_{days_back}"
+    
     
-    print(f"🔄 Obteniendo noticias para {stockSymbol} de los últimos {days_back} días...")
-    news = get_news(url)
+    # Si ya tenemos las noticias en cache, devolverlas
+    if cache_key in _bulk_news_cache:
+        return _bulk_news_cache[cache_key]
+
+    if articles is None:
+        print(f"🔄 Obteniendo noticias para {stockSymbol} de los últimos {days_back} días...")
+        articles = get_news({stockSymbol: news_query_params(stockSymbol, stockName, days_back)})[stockSymbol]
+    sentiment_by_date = aggregate_article_sentiment(articles, batch_size=batch_size)
+    
+    # Guardar en cache
+    _bulk_news_cache[cache_key] = sentiment_by_date
+    
+    return sentiment_by_date
+
+
+def aggregate_article_sentiment(articles, batch_size=None):
+    """
+    Analiza (o toma del cache persistente) el sentimiento de los artículos de NewsAPI y lo
+    promedia por fecha: {fecha: (positivo, negativo, neutral, cantidad de artículos)}.
+    """
+    news = {'articles': articles} if articles is not None else None
     news_by_date = {}
     
     if news:
         print(f"📰 API devolvió {len(news.get('articles', []))} artículos")
-        sentiment_analyzer = pipeline(
-            "sentiment-analysis", 
-            model="ProsusAI/finbert",
-            top_k=None  
-        )
-        
+
+        # Primero se juntan los artículos relevantes para analizarlos en lotes
+        pending_articles = []
         for article in news.get("articles", []):
             try:
                 published_date = article.get('publishedAt', '')
@@ -117,36 +271,40 @@ def get_bulk_news_for_period(stockSymbol, stockName=None, days_back=30):
 
                 # Verificar relevancia del artículo
                 if content and len(content.strip()) > 10:
-                    content_lower = content.lower()
-                    title_lower = title.lower()
-                    symbol_lower = stockSymbol.lower()
-                    name_lower = stockName.lower() if stockName else ""
-                    
-                
-                
-                    # Analizar sentimiento
-                    text_to_analyze = f"{title} {content}"[:512]
-                    sentiment_results = sentiment_analyzer(text_to_analyze)
-                    
-                    main_prediction = max(sentiment_results[0], key=lambda x: x['score'])
-                    
-                    sentiment_data = {
+                    pending_articles.append({
+                        'date': article_date,
                         'source': source,
-                        'sentiment': main_prediction['label'],
-                        'confidence': main_prediction['score'],
-                        'positive_score': next((s['score'] for s in sentiment_results[0] if s['label'] == 'positive'), 0),
-                        'negative_score': next((s['score'] for s in sentiment_results[0] if s['label'] == 'negative'), 0),
-                        'neutral_score': next((s['score'] for s in sentiment_results[0] if s['label'] == 'neutral'), 0),
-                        'title': title
-                    }
-                    
-                    # Agrupar por fecha
-                    if article_date not in news_by_date:
-                        news_by_date[article_date] = []
-                    news_by_date[article_date].append(sentiment_data)
+                        'title': title,
+                        'text': f"{title} {content}",
+                        'key': article_key(title, content, sentiment_model.model_id)
+                    })
                     
             except Exception as e:
                 continue
+
+        # Solo se analizan los artículos que no están en el cache persistente
+        scores_by_key = article_sentiment_cache.get_many([article['key'] for article in pending_articles])
+        new_articles = [article for article in pending_articles if article['key'] not in scores_by_key]
+        if pending_articles:
+            print(f"💾 {len(pending_articles) - len(new_articles)} artículos en cache, {len(new_articles)} nuevos")
+        if new_articles:
+            scored = score_articles(sentiment_model.get(), new_articles, batch_size=batch_size)
+            new_scores = [(article['key'], sentiment_data) for article, sentiment_data in scored]
+            article_sentiment_cache.put_many(new_scores, sentiment_model.model_id)
+            scores_by_key.update(new_scores)
+
+        for article in pending_articles:
+            if article['key'] not in scores_by_key:
+                continue
+            scores = scores_by_key[article['key']]
+            sentiment_data = {'source': article['source']}
+            sentiment_data.update({field: scores[field] for field in SCORE_FIELDS})
+            sentiment_data['title'] = article['title']
+            
+            # Agrupar por fecha
+            if article['date'] not in news_by_date:
+                news_by_date[article['date']] = []
+            news_by_date[article['date']].append(sentiment_data)
     else:
         print("❌ La API no devolvió noticias")
     
@@ -161,13 +319,71 @@ def get_bulk_news_for_period(stockSymbol, stockName=None, days_back=30):
             sentiment_by_date[date] = (positive, negative, neutral, len(articles))
     
     print(f"✅ Procesadas {len(sentiment_by_date)} fechas con noticias")
-    
-    # Guardar en cache
-    _bulk_news_cache[cache_key] = sentiment_by_date
-    
     return sentiment_by_date
 
 
+def get_bulk_news_for_symbols(symbols, days_back=30, batch_size=None):
+    """
+    Versión multi-símbolo de get_bulk_news_for_period: descarga las noticias de todos
+    los símbolos en paralelo (pool de conexiones compartido) y luego las analiza.
+    `symbols` es una lista de (símbolo, nombre). Devuelve {símbolo: sentiment_by_date}.
+    """
+    missing = [(symbol, name) for symbol, name in symbols if f"{symbol}_{days_back}" not in _bulk_news_cache]
+    fetched = {}
+    if missing:
+        print(f"🔄 Obteniendo noticias para {len(missing)} símbolos de los últimos {days_back} días...")
+        start_time = time.perf_counter()
+        fetched = get_news({symbol: news_query_params(symbol, name, days_back) for symbol, name in missing})
+        print(f"📰 Noticias descargadas en {time.perf_counter() - start_time:.1f}s")
+
+    results = {}
+    for symbol, name in symbols:
+        if symbol in fetched and fetched[symbol] is None:
+            # Ya se agotaron los reintentos: no volver a consultar la API para este símbolo
+            print(f"❌ La API no devolvió noticias para {symbol}")
+            _bulk_news_cache[f"{symbol}_{days_back}"] = {}
+        results[symbol] = get_bulk_news_for_period(symbol, name, days_back=days_back, batch_size=batch_size,
+                                                   articles=fetched.get(symbol))
+    return results
+
+
+def set_bulk_news(stockSymbol, sentiment_by_date, days_back=30):
+    """Carga en el cache sentiment ya calculado (ej. en otro proceso) para no volver a pedirlo"""
+    _bulk_news_cache[f"{stockSymbol}_{days_back}"] = sentiment_by_date
+
+
+def get_day_sentiment(stockSymbol, stockName=None, date=None):
+    """
+    Sentiment de un solo día (por defecto, ayer) consultando a la API solo ese día.
+    Devuelve (positivo, negativo, neutral, cantidad de artículos) o None si no hubo noticias.
+    """
+    date = pd.Timestamp(date if date is not None else pd.Timestamp.now() - pd.Timedelta(days=1)).normalize()
+    day = date.strftime('%Y-%m-%d')
+    if NEWS_API_KEY == 'your_news_api_key_here':
+        return None
+    params = news_query_params(stockSymbol, stockName, days_back=1)
+    params['from'] = params['to'] = day
+    print(f"🔄 Obteniendo noticias de {stockSymbol} del {day}...")
+    articles = get_news({stockSymbol: params})[stockSymbol]
+    return aggregate_article_sentiment(articles).get(day)
+
+
+def get_daily_sentiment(stockSymbol, stockName=None, days_back=30):
+    """
+    Devuelve el sentiment diario del símbolo como DataFrame indexado por fecha con
+    columnas Sentiment_Positive, Sentiment_Negative, Sentiment_Neutral y Article_Count.
+    Solo incluye los días con noticias; usa el mismo cache en bulk que sentiment_analysis.
+    """
+    bulk_news = get_bulk_news_for_period(stockSymbol, stockName, days_back=days_back)
+    daily_sentiment = pd.DataFrame.from_dict(
+        bulk_news, orient='index',
+        columns=["Sentiment_Positive", "Sentiment_Negative", "Sentiment_Neutral", "Article_Count"]
+    )
+    daily_sentiment.index = pd.to_datetime(daily_sentiment.index)
+    daily_sentiment.index.name = 'Date'
+    return daily_sentiment.sort_index()
+
+
 def sentiment_analysis(stockSymbol, stockName=None, max_date=None):
     """
     Función optimizada que usa el cache de noticias en bulk
@@ -0,0 +1,139 @@
+import os
+import time
+import random
+import asyncio
+import aiohttp
+
+# Límites del cliente de NewsAPI
+NEWS_API_MAX_CONCURRENCY = int(os.getenv('NEWS_API_MAX_CONCURRENCY', '8'))
+NEWS_API_REQUESTS_PER_SECOND = float(os.getenv('NEWS_API_REQUESTS_PER_SECOND', '5'))
+NEWS_API_MAX_PAGES = int(os.getenv('NEWS_API_MAX_PAGES', '5'))
+NEWS_API_MAX_RETRIES = int(os.getenv('NEWS_API_MAX_RETRIES', '4'))
+NEWS_API_TIMEOUT = float(os.getenv('NEWS_API_TIMEOUT', '30'))
+
+# Códigos que vale la pena reintentar
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Espacia el inicio de las requests para no superar `requests_per_second`"""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def wait(self):
+        if self.interval == 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class NewsAPIClient:
+    """
+    Cliente asíncrono de NewsAPI con un pool de conexiones compartido.
+
+    Recorre todas las páginas de resultados, reintenta con backoff exponencial
+    ante 429/5xx o errores de red y limita la tasa de requests entre todos los
+    símbolos que se consultan a la vez.
+
+        async with NewsAPIClient(api_key, base_url) as client:
+            articles = await client.fetch_articles(params)
+    """
+
+    def __init__(self, api_key, base_url, max_concurrency=NEWS_API_MAX_CONCURRENCY,
+                 requests_per_second=NEWS_API_REQUESTS_PER_SECOND, max_pages=NEWS_API_MAX_PAGES,
+                 max_retries=NEWS_API_MAX_RETRIES, timeout=NEWS_API_TIMEOUT, backoff=1.0, page_size=100):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_pages = max_pages
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.page_size = page_size
+        self._session = None
+        self._limiter = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._limiter = RateLimiter(self.requests_per_second)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
+
+    async def _get(self, params):
+        """GET con reintentos. Devuelve (status, json) o (None, None) si se agotan los intentos"""
+        query = dict(params, apiKey=self.api_key)
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.wait()
+            retry_after = None
+            try:
+                async with self._session.get(self.base_url, params=query) as response:
+                    if response.status not in RETRY_STATUS:
+                        try:
+                            data = await response.json(content_type=None)
+                        except ValueError:
+                            data = None
+                        return response.status, data
+                    retry_after = response.headers.get('Retry-After')
+                    status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+
+            if attempt == self.max_retries:
+                print(f"❌ NewsAPI: sin respuesta válida después de {attempt + 1} intentos ({status})")
+                return None, None
+
+            # Backoff exponencial con jitter; se respeta Retry-After si viene en la respuesta
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            if retry_after is not None:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+        return None, None
+
+    async def fetch_articles(self, params):
+        """
+        Devuelve todos los artículos de la búsqueda recorriendo las páginas, o None
+        si la primera página falla (mismo comportamiento que get_news).
+        """
+        articles = []
+        for page in range(1, self.max_pages + 1):
+            status, data = await self._get(dict(params, page=page, pageSize=self.page_size))
+            if status != 200 or not data or data.get('status') == 'error':
+                # El plan gratuito corta en 100 resultados (maximumResultsReached)
+                if page == 1:
+                    return None
+                break
+            page_articles = data.get('articles', [])
+            articles.extend(page_articles)
+            if len(page_articles) < self.page_size or len(articles) >= data.get('totalResults', 0):
+                break
+        return articles
+
+    async def fetch_many(self, params_by_key):
+        """Consulta varias búsquedas en paralelo: {key: params} -> {key: artículos o None}"""
+        keys = list(params_by_key)
+        results = await asyncio.gather(*(self.fetch_articles(params_by_key[key]) for key in keys))
+        return dict(zip(keys, results))
+
+
+def fetch_news(api_key, base_url, params_by_key, **client_options):
+    """Versión sincrónica de NewsAPIClient.fetch_many (para usar desde código no async)"""
+    async def run():
+        async with NewsAPIClient(api_key, base_url, **client_options) as client:
+            return await client.fetch_many(params_by_key)
+    return asyncio.run(run())
@@ -0,0 +1,51 @@
+"""
+Predicción de la próxima sesión (sin interfaz gráfica y sin backtest completo).
+
+Uso:
+    python predict_next.py AAPL MSFT,Microsoft --model random_forest
+
+Cada símbolo puede ir seguido del nombre de la empresa separado por coma. Usa el
+almacén de precios y el cache de modelos, así que después del primer análisis
+cada predicción tarda menos de un segundo.
+"""
+import argparse
+import sys
+
+from stock_analysis import predict_next_session
+from model_cache import model_cache
+from models import MODEL_BACKENDS, DEFAULT_MODEL
+
+
+def format_prediction(result):
+    direction = "SUBE 📈" if result['prediction'] == 1 else "BAJA 📉"
+    source = "modelo en cache" if result['cached_model'] else f"modelo entrenado con {result['train_rows']} filas"
+    news = f", noticias {result['sentiment'][3]}" if result['sentiment'] else ""
+    return (f"{result['symbol']}: sesión siguiente a {result['date'].strftime('%Y-%m-%d')} → {direction} "
+            f"(p={result['probability']:.4f}; {source}{news}; {result['seconds']:.2f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predice la próxima sesión de uno o más símbolos")
+    parser.add_argument('symbols', nargs='+', help="Símbolos (opcional: SIMBOLO,Nombre)")
+    parser.add_argument('--model', choices=list(MODEL_BACKENDS), default=DEFAULT_MODEL, help="Modelo de clasificación")
+    parser.add_argument('--start', type=int, default=2500, help="Tamaño inicial de entrenamiento del backtest")
+    parser.add_argument('--step', type=int, default=250, help="Paso del backtest")
+    parser.add_argument('--no-news', action='store_true', help="No usar análisis de noticias")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for entry in args.symbols:
+        symbol, _, name = entry.partition(',')
+        try:
+            result = predict_next_session(symbol.strip().upper(), name.strip() or None, model=args.model,
+                                          start=args.start, step=args.step, model_cache=model_cache,
+                                          use_news=not args.no_news)
+            print(format_prediction(result))
+        except Exception as e:
+            failed += 1
+            print(f"❌ {symbol.strip().upper()}: {e}")
+    return 1 if failed == len(args.symbols) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import os
+import tempfile
+import pandas as pd
+
+# Directorio donde se guardan los precios descargados (un archivo Parquet por símbolo)
+PRICE_STORE_DIR = os.getenv('PRICE_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.price_store'))
+# Si el archivo se actualizó hace menos de estas horas, no se consulta la red
+# (siempre que su última barra esté cerrada y no haya cerrado otra sesión desde entonces)
+PRICE_STORE_MAX_AGE_HOURS = float(os.getenv('PRICE_STORE_MAX_AGE_HOURS', '12'))
+# Zona horaria y hora de cierre del mercado de las barras diarias
+PRICE_STORE_MARKET_TZ = os.getenv('PRICE_STORE_MARKET_TZ', 'America/New_York')
+PRICE_STORE_CLOSE_HOUR = float(os.getenv('PRICE_STORE_CLOSE_HOUR', '16'))
+
+
+def _yfinance_downloader(stockSymbol, start):
+    import yfinance as yf
+    return yf.download(stockSymbol, start=start, end=None, progress=False)
+
+
+def _normalize_columns(stockData):
+    """Aplana columnas MultiIndex y reemplaza espacios por guiones bajos"""
+    if stockData.empty:
+        # Sin barras nuevas (fin de semana, feriado) yfinance devuelve un DataFrame vacío sin fechas
+        return stockData
+    if isinstance(stockData.columns, pd.MultiIndex):
+        stockData.columns = [col[0] for col in stockData.columns]
+    stockData.columns = [col.replace(' ', '_') if isinstance(col, str) else col for col in stockData.columns]
+    if stockData.index.tz is not None:
+        stockData.index = stockData.index.tz_localize(None)
+    stockData.index.name = 'Date'
+    return stockData
+
+
+def _store_path(stockSymbol, store_dir=None):
+    safe_symbol = stockSymbol.upper().replace('/', '_').replace('^', '_')
+    return os.path.join(store_dir or PRICE_STORE_DIR, f"{safe_symbol}.parquet")
+
+
+def _session_close(date):
+    """Cierre de la sesión de `date` como timestamp UTC"""
+    close = pd.Timestamp(date).normalize() + pd.Timedelta(hours=PRICE_STORE_CLOSE_HOUR)
+    return close.tz_localize(PRICE_STORE_MARKET_TZ).tz_convert('UTC')
+
+
+def _last_session_close(now):
+    """Cierre de la última sesión de lunes a viernes terminada antes de `now` (UTC)"""
+    day = now.tz_convert(PRICE_STORE_MARKET_TZ).tz_localize(None).normalize()
+    while day.weekday() >= 5 or _session_close(day) > now:
+        day -= pd.Timedelta(days=1)
+    return _session_close(day)
+
+
+def _is_fresh(stored, path, max_age_hours, now=None):
+    """
+    El almacén se puede usar sin consultar la red si se guardó después del cierre
+    de su última barra (no es una barra parcial), después del cierre de la última
+    sesión terminada y hace menos de `max_age_hours`.
+    """
+    now = pd.Timestamp.now(tz='UTC') if now is None else now
+    saved = pd.Timestamp(os.path.getmtime(path), unit='s', tz='UTC')
+    return (saved >= _session_close(stored.index[-1])
+            and saved >= _last_session_close(now)
+            and (now - saved) < pd.Timedelta(hours=max_age_hours))
+
+
+def _save(stockData, path):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Escribir a un archivo temporal propio y renombrar: no deja archivos corruptos y
+    # dos workers que actualizan el mismo símbolo no pisan el temporal del otro
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            stockData.to_parquet(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_prices(stockSymbol, start='1990-01-01', downloader=None, store_dir=None, max_age_hours=None):
+    """
+    Devuelve los precios OHLCV diarios de un símbolo usando el almacén local.
+
+    La primera vez descarga todo el historial desde `start`; las siguientes solo
+    descarga las barras posteriores a la última fecha guardada y las agrega. No se
+    consulta la red si el almacén ya tiene la última sesión cerrada (ver _is_fresh).
+    `downloader(symbol, start)` reemplaza a yfinance (útil para tests sin red).
+    """
+    downloader = downloader or _yfinance_downloader
+    max_age_hours = PRICE_STORE_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    path = _store_path(stockSymbol, store_dir)
+
+    stored = None
+    if os.path.exists(path):
+        try:
+            stored = pd.read_parquet(path)
+        except Exception as e:
+            print(f"⚠️ Almacén de precios corrupto para {stockSymbol}, se descarga de nuevo: {e}")
+            stored = None
+
+    if stored is None or stored.empty:
+        stockData = _normalize_columns(downloader(stockSymbol, start))
+        if not stockData.empty:
+            _save(stockData, path)
+        return stockData
+
+    # Datos recientes y con la última barra cerrada: evitar el round trip de red
+    if _is_fresh(stored, path, max_age_hours):
+        return stored[stored.index >= pd.Timestamp(start)]
+
+    # La última barra guardada puede ser parcial (descargada con el mercado abierto):
+    # se vuelve a descargar y se reemplaza. Para detectar ajustes se compara la
+    # anteúltima, que ya estaba cerrada.
+    last_date = stored.index[-1]
+    check_date = stored.index[-2] if len(stored) > 1 else None
+    new_data = _normalize_columns(downloader(stockSymbol, (check_date or last_date).strftime('%Y-%m-%d')))
+
+    if new_data.empty:
+        os.utime(path)
+        return stored[stored.index >= pd.Timestamp(start)]
+
+    # Si la barra cerrada solapada cambió (dividendos/splits ajustan el historial), recargar todo
+    if check_date is not None and check_date in new_data.index and 'Close' in new_data.columns:
+        old_close = stored.loc[check_date, 'Close']
+        new_close = new_data.loc[check_date, 'Close']
+        if abs(new_close - old_close) > 1e-6 * max(abs(old_close), 1.0):
+            print(f"🔄 Precios ajustados para {stockSymbol}, recargando historial completo...")
+            stockData = _normalize_columns(downloader(stockSymbol, start))
+            if stockData.empty:
+                # No reemplazar un almacén válido por uno vacío: se reintenta en la próxima llamada
+                print(f"⚠️ La descarga completa de {stockSymbol} vino vacía, se usan los precios guardados")
+                return stored[stored.index >= pd.Timestamp(start)]
+            _save(stockData, path)
+            return stockData
+
+    stockData = pd.concat([stored, new_data[new_data.index >= last_date]])
+    stockData = stockData[~stockData.index.duplicated(keep='last')]
+    _save(stockData, path)
+    return stockData[stockData.index >= pd.Timestamp(start)]
+
+
+def clear_price_store(stockSymbol=None, store_dir=None):
+    """Elimina los precios guardados de un símbolo (o de todos si no se indica)"""
+    if stockSymbol is not None:
+        path = _store_path(stockSymbol, store_dir)
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    directory = store_dir or PRICE_STORE_DIR
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(directory, name))
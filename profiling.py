@@ -0,0 +1,172 @@
+"""
+Instrumentación liviana del pipeline de análisis.
+
+Las funciones instrumentadas abren spans con `span("nombre")`; si no hay un
+Profiler activo el span no hace nada (costo de una llamada). Para medir:
+
+    profiler = Profiler()
+    with profiler.activate():
+        setDataForTraining("AAPL")
+    print(profiler.report())
+    profiler.to_chrome_trace("trace.json")   # abrir en chrome://tracing o Perfetto
+
+El pico de memoria de cada span se mide solo con PROFILE_TRACE_MEMORY=1 o
+Profiler(trace_memory=True).
+"""
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Medir el pico de memoria de cada span con tracemalloc. Desactivado por defecto:
+# tracemalloc registra cada asignación y hace bastante más lento todo el análisis
+PROFILE_TRACE_MEMORY = os.getenv('PROFILE_TRACE_MEMORY', '0') == '1'
+
+_active_profiler = None
+
+
+class Profiler:
+    """
+    Junta spans con tiempo de pared, tiempo de CPU del proceso y pico de memoria.
+
+    Los spans pueden anidarse y abrirse desde varios hilos (cada hilo lleva su pila).
+    El pico de memoria de tracemalloc es global al proceso, así que con spans
+    concurrentes en otros hilos es una cota superior.
+    """
+
+    def __init__(self, trace_memory=PROFILE_TRACE_MEMORY):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    @classmethod
+    def from_records(cls, records):
+        """Profiler con spans ya medidos (por ejemplo, en el proceso worker del análisis)"""
+        profiler = cls(trace_memory=False)
+        profiler.records = list(records)
+        return profiler
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **args):
+        stack = self._stack()
+        memory_start = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            # El pico acumulado hasta acá pertenece al span padre
+            memory_start, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        frame = {'peak': 0}
+        stack.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            stack.pop()
+            peak_memory = None
+            if self.trace_memory and tracemalloc.is_tracing():
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+                peak_memory = max(peak - memory_start, 0)
+            record = {
+                'name': name,
+                'start': wall_start - self._origin,
+                'wall': wall,
+                'cpu': cpu,
+                'peak_memory': peak_memory,
+                'thread': threading.get_ident(),
+                'depth': len(stack),
+                'args': args,
+            }
+            with self._lock:
+                self.records.append(record)
+
+    @contextmanager
+    def activate(self):
+        """Hace que los span() del código instrumentado se registren en este profiler"""
+        global _active_profiler
+        previous = _active_profiler
+        _active_profiler = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        try:
+            yield self
+        finally:
+            _active_profiler = previous
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def summary(self):
+        """Totales por nombre de span: [(nombre, llamadas, pared, cpu, pico de memoria)]"""
+        totals = {}
+        for record in self.records:
+            name = record['name']
+            count, wall, cpu, peak = totals.get(name, (0, 0.0, 0.0, None))
+            if record['peak_memory'] is not None:
+                peak = max(peak or 0, record['peak_memory'])
+            totals[name] = (count + 1, wall + record['wall'], cpu + record['cpu'], peak)
+        rows = [(name,) + values for name, values in totals.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def report(self):
+        """Tabla de texto con los totales por span, ordenada por tiempo de pared"""
+        lines = [f"{'Span':<32} {'Llamadas':>8} {'Pared (s)':>10} {'CPU (s)':>9} {'Pico mem':>10}"]
+        for name, count, wall, cpu, peak in self.summary():
+            memory = f"{peak / 1e6:.1f}MB" if peak is not None else "-"
+            lines.append(f"{name:<32} {count:>8} {wall:>10.3f} {cpu:>9.3f} {memory:>10}")
+        return "\n".join(lines)
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'spans': self.records, 'summary': [
+                dict(zip(['name', 'calls', 'wall', 'cpu', 'peak_memory'], row)) for row in self.summary()
+            ]}, f, indent=2, default=str)
+
+    def to_chrome_trace(self, path):
+        """Exporta en el formato Trace Event de Chrome (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            args = {key: str(value) for key, value in record['args'].items()}
+            args['cpu_ms'] = round(record['cpu'] * 1000, 3)
+            if record['peak_memory'] is not None:
+                args['peak_memory_bytes'] = record['peak_memory']
+            events.append({
+                'name': record['name'],
+                'ph': 'X',
+                'ts': record['start'] * 1e6,
+                'dur': record['wall'] * 1e6,
+                'pid': pid,
+                'tid': record['thread'],
+                'args': args,
+            })
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def span(name, **args):
+    """Span del profiler activo, o un contexto vacío si no se está midiendo"""
+    profiler = _active_profiler
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name, **args)
+
+
+def active_profiler():
+    return _active_profiler
@@ -0,0 +1,117 @@
+import os
+import time
+import hashlib
+import sqlite3
+
+# Base de datos con los scores de FinBERT por artículo
+SENTIMENT_CACHE_PATH = os.getenv('SENTIMENT_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sentiment_cache.sqlite'))
+SENTIMENT_CACHE_TTL_DAYS = float(os.getenv('SENTIMENT_CACHE_TTL_DAYS', '90'))
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.getenv('SENTIMENT_CACHE_MAX_ENTRIES', '200000'))
+
+SCORE_FIELDS = ['sentiment', 'confidence', 'positive_score', 'negative_score', 'neutral_score']
+
+
+def article_key(title, content, model_id):
+    """Hash del contenido del artículo y del modelo que lo analiza"""
+    raw = f"{model_id}\0{title or ''}\0{content or ''}".encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ArticleSentimentCache:
+    """
+    Cache persistente (SQLite) de los scores de sentimiento por artículo.
+
+    Las entradas vencen después de `ttl_days` y, si se supera `max_entries`,
+    se eliminan las usadas hace más tiempo.
+    """
+
+    def __init__(self, path=SENTIMENT_CACHE_PATH, ttl_days=SENTIMENT_CACHE_TTL_DAYS,
+                 max_entries=SENTIMENT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self._initialized = False
+
+    def _connect(self):
+        # Una conexión por operación: el cache se usa desde el hilo del análisis y desde la GUI
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS article_sentiment (
+                    key TEXT PRIMARY KEY,
+                    model_id TEXT NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    positive_score REAL NOT NULL,
+                    negative_score REAL NOT NULL,
+                    neutral_score REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON article_sentiment(last_access)")
+            self._initialized = True
+        return connection
+
+    def get_many(self, keys):
+        """Devuelve {key: scores} para las claves que están en el cache y no vencieron"""
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        connection = self._connect()
+        try:
+            unique_keys = list(dict.fromkeys(keys))
+            # SQLite limita la cantidad de parámetros por consulta
+            for chunk_start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[chunk_start:chunk_start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = connection.execute(
+                    f"SELECT key, {', '.join(SCORE_FIELDS)} FROM article_sentiment "
+                    f"WHERE key IN ({placeholders}) AND created_at >= ?",
+                    chunk + [now - self.ttl_seconds]
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = dict(zip(SCORE_FIELDS, row[1:]))
+            if found:
+                connection.executemany("UPDATE article_sentiment SET last_access = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+                connection.commit()
+        finally:
+            connection.close()
+        return found
+
+    def put_many(self, entries, model_id):
+        """Guarda una lista de (key, scores) y aplica la política de expiración"""
+        if not entries:
+            return
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO article_sentiment (key, model_id, {', '.join(SCORE_FIELDS)}, created_at, last_access) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(key, model_id) + tuple(scores[field] for field in SCORE_FIELDS) + (now, now) for key, scores in entries]
+            )
+            self._evict(connection, now)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _evict(self, connection, now):
+        connection.execute("DELETE FROM article_sentiment WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = connection.execute("SELECT COUNT(*) FROM article_sentiment").fetchone()[0]
+        if count > self.max_entries:
+            connection.execute(
+                "DELETE FROM article_sentiment WHERE key IN "
+                "(SELECT key FROM article_sentiment ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        connection = self._connect()
+        try:
+            connection.execute("DELETE FROM article_sentiment")
+            connection.commit()
+        finally:
+            connection.close()
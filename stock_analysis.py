@@ -1,15 +1,105 @@
+import os
+import numbers
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
-from news_analysis import sentiment_analysis
+from news_analysis import get_daily_sentiment, get_day_sentiment, NEUTRAL_SENTIMENT
+from data_from_stock import FeatureMatrix, load_live_data
+from model_cache import model_key, IGNORED_PARAMS
+from profiling import span, Profiler
+from models import create_model, model_label, worker_n_jobs, MODEL_BACKENDS
+from evaluation import EvaluationSummary
 
+SENTIMENT_COLUMNS = ["Sentiment_Positive", "Sentiment_Negative", "Sentiment_Neutral"]
 
-def predict_with_sentiment(train, test, predictors, model, stockSymbol, stockName, sentiment_stats=None):
-    # Entrenar el modelo
-    model.fit(train[predictors], train["Target"])
+# Árboles que se entrenan entre cada chequeo de cancelación
+CANCEL_CHECK_TREES = 25
 
-    # Para datos de test recientes, intentar actualizar sentiment
-    test_with_updated_sentiment = test.copy()
 
+class BacktestCancelled(Exception):
+    """El backtest se interrumpió porque se canceló su CancellationToken"""
+
+
+class CancellationToken:
+    """
+    Pedido de cancelación compartido entre quien lanza el backtest y el backtest.
+    Por defecto usa un threading.Event; puede recibir cualquier objeto con set/is_set
+    (por ejemplo un multiprocessing.Event).
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise BacktestCancelled("Backtest cancelado")
+
+
+class _CancelFile:
+    """
+    Pedido de cancelación visible desde otros procesos (los workers de joblib no
+    comparten un threading.Event): está activo si existe el archivo `path`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def set(self):
+        open(self.path, 'a').close()
+
+    def is_set(self):
+        return os.path.exists(self.path)
+
+
+@contextmanager
+def _process_cancel_token(cancel_token, poll_seconds=0.05):
+    """
+    Token de cancelación que se puede enviar a los workers de joblib. Un hilo copia
+    la cancelación de `cancel_token` al archivo mientras dura el bloque.
+    """
+    if cancel_token is None:
+        yield None
+        return
+    directory = tempfile.mkdtemp(prefix='backtest-cancel-')
+    flag = _CancelFile(os.path.join(directory, 'cancel'))
+    stop = threading.Event()
+
+    def watch():
+        while not stop.wait(poll_seconds):
+            if cancel_token.cancelled:
+                flag.set()
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        yield CancellationToken(flag)
+    finally:
+        stop.set()
+        watcher.join()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def sentiment_overrides(test_dates, stockSymbol, stockName, sentiment_stats=None):
+    """
+    Calcula el sentiment de noticias para las fechas de test recientes.
+    Devuelve (apply_mask, sentiment_values): las filas a actualizar y una matriz
+    (filas, 3) con positivo/negativo/neutral, o (None, None) si no hay nada que aplicar.
+    """
     # Obtener fecha actual real (sin zona horaria)
     current_date = pd.Timestamp.now().tz_localize(None)
     
@@ -17,77 +107,265 @@ def predict_with_sentiment(train, test, predictors, model, stockSymbol, stockNam
     # La API de noticias tiene datos disponibles aproximadamente del último mes
     earliest_news_date = current_date - pd.Timedelta(days=30)
     latest_news_date = current_date - pd.Timedelta(days=1)  # Hasta ayer
-    
-    # Para cada fecha de test, determinar si podemos usar sentiment
-    for test_date in test.index:
-        # Normalizar test_date quitando zona horaria si la tiene
-        test_date_normalized = test_date.tz_localize(None) if test_date.tz is not None else test_date
-        
-        # Solo buscar noticias si:
-        # 1. La fecha de predicción está en el rango donde tenemos noticias disponibles
-        # 2. No estamos prediciendo el futuro
-        if (earliest_news_date <= test_date_normalized <= latest_news_date):
-            try:
-                # CLAVE: Solo usar noticias hasta el día ANTERIOR al que estamos prediciendo
-                max_news_date = (test_date_normalized - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-                
-                # Verificar que la fecha de noticias no sea futura
-                max_news_date_dt = pd.to_datetime(max_news_date).tz_localize(None)
-                if max_news_date_dt <= latest_news_date:
-                    pos, neg, neu, _ = sentiment_analysis(stockSymbol, stockName, max_date=max_news_date)
-
-                    if pos > 0:
-                        test_with_updated_sentiment.loc[test_date, "Sentiment_Positive"] = pos
-                        test_with_updated_sentiment.loc[test_date, "Sentiment_Negative"] = neg
-                        test_with_updated_sentiment.loc[test_date, "Sentiment_Neutral"] = neu
-                        
-                        # ARREGLO: Actualizar estadísticas
-                        if sentiment_stats:
-                            sentiment_stats['sentiment_applied'] += 1
-                else:
-                    if sentiment_stats:
-                        sentiment_stats['skipped_future'] += 1
-                    
-            except Exception as e:
-                if sentiment_stats:
-                    sentiment_stats['skipped_other'] += 1
-        else:
-            # Para fechas fuera del rango de noticias, usar valores neutros sin búsqueda
-            if test_date_normalized < earliest_news_date:
-                if sentiment_stats:
-                    sentiment_stats['skipped_old'] += 1
-            elif test_date_normalized > latest_news_date:
-                if sentiment_stats:
-                    sentiment_stats['skipped_future'] += 1
-            else:
-                if sentiment_stats:
-                    sentiment_stats['skipped_other'] += 1
-            
-    
-    # Asegurar que todas las columnas de predictors existen
-    for col in predictors:
-        if col not in test_with_updated_sentiment.columns:
-            if 'Sentiment' in col:
-                test_with_updated_sentiment[col] = 0.33  # Neutral value
-            else:
-                return pd.DataFrame()  # Return empty if critical columns missing
-    
+
+    # Normalizar fechas quitando zona horaria si la tienen
+    test_dates = test_dates.tz_localize(None) if test_dates.tz is not None else test_dates
+    in_news_range = (test_dates >= earliest_news_date) & (test_dates <= latest_news_date)
+
+    if sentiment_stats:
+        # Para fechas fuera del rango de noticias, usar valores neutros sin búsqueda
+        sentiment_stats['skipped_old'] += int((test_dates < earliest_news_date).sum())
+        sentiment_stats['skipped_future'] += int((test_dates > latest_news_date).sum())
+
+    if not in_news_range.any():
+        return None, None
+
     try:
-        preds = model.predict_proba(test_with_updated_sentiment[predictors])[:, 1]
-        preds = [1 if x >= 0.5 else 0 for x in preds]
-        preds = pd.Series(preds, index=test.index, name="Predictions")
-        combined = pd.concat([test["Target"], preds], axis=1)
-        return combined
+        daily_sentiment = get_daily_sentiment(stockSymbol, stockName)
+
+        # CLAVE: Solo usar noticias hasta el día ANTERIOR al que estamos prediciendo (join as-of t-1)
+        news_dates = (test_dates - pd.Timedelta(days=1)).normalize()
+        joined = daily_sentiment.reindex(news_dates)
+        # Noticias fuera del período que devuelve la API cuentan como neutras
+        joined.loc[news_dates < earliest_news_date] = np.nan
+        sentiment_values = np.column_stack([
+            joined[column].fillna(neutral).to_numpy()
+            for column, neutral in zip(SENTIMENT_COLUMNS, NEUTRAL_SENTIMENT)
+        ])
+        apply_mask = in_news_range & (sentiment_values[:, 0] > 0)
+
+        # ARREGLO: Actualizar estadísticas
+        if sentiment_stats:
+            sentiment_stats['sentiment_applied'] += int(apply_mask.sum())
+        return apply_mask, sentiment_values
     except Exception as e:
-        print(f"Error making predictions: {e}")
-        return pd.DataFrame()
+        if sentiment_stats:
+            sentiment_stats['skipped_other'] += int(in_news_range.sum())
+        return None, None
+
+
+def _test_features(matrix, start, stop, stockSymbol, stockName, sentiment_stats):
+    """
+    Features de test de un paso como vista de la matriz; solo se copian las filas
+    del paso si hay que aplicarles sentiment de noticias.
+    """
+    X_test = matrix.X[start:stop]
+    apply_mask, sentiment_values = sentiment_overrides(matrix.index[start:stop], stockSymbol, stockName, sentiment_stats)
+    if apply_mask is not None and apply_mask.any():
+        X_test = X_test.copy()
+        for k, column in enumerate(SENTIMENT_COLUMNS):
+            if column in matrix.predictors:
+                X_test[apply_mask, matrix.predictors.index(column)] = sentiment_values[apply_mask, k]
+    return X_test
+
+
+def _predictions_frame(matrix, start, stop, preds):
+    return pd.DataFrame({"Target": matrix.y[start:stop], "Predictions": preds}, index=matrix.index[start:stop])
+
+
+def _prepare_warm_start(model, fold, n_estimators, trees_per_step, retire_per_step, random_state=None):
+    """
+    Deja el modelo listo para que el próximo fit solo entrene los árboles nuevos.
+    En el primer paso se entrena el bosque completo desde cero.
+
+    sklearn siembra los árboles nuevos con los números de random_state que siguen a
+    los primeros len(estimators_): al descartar árboles, los nuevos repetirían las
+    semillas de los agregados en el paso anterior. Con un random_state entero cada
+    paso usa random_state + fold, así cada árbol del backtest tiene su propia semilla.
+    """
+    if isinstance(random_state, numbers.Integral):
+        model.random_state = random_state + fold
+    if fold == 0:
+        model.warm_start = False
+        model.n_estimators = n_estimators
+        return
+    model.warm_start = True
+    if retire_per_step > 0:
+        retire = min(retire_per_step, len(model.estimators_) - 1)
+        model.estimators_ = model.estimators_[retire:]
+    model.n_estimators = len(model.estimators_) + trees_per_step
+
+
+def _copy_fitted_state(model, fitted_model):
+    """
+    Copia en `model` el estado entrenado de `fitted_model` (del cache o de un clon)
+    conservando los parámetros del llamador que no forman parte de la clave del
+    cache (n_jobs, verbose): el modelo guardado pudo entrenarse con otros valores.
+    """
+    params = model.get_params()
+    model.__setstate__(fitted_model.__getstate__())
+    model.set_params(**{name: value for name, value in params.items()
+                        if name.rsplit('__', 1)[-1] in IGNORED_PARAMS})
 
 
-def backtest(stockData, model, predictors, start=2500, step=250, stockSymbol=None, stockName=None):
+def _fit_model(model, X, y, cancel_token=None):
+    """
+    Entrena el modelo revisando `cancel_token` entre tandas de CANCEL_CHECK_TREES
+    árboles. Los bosques crecen con warm_start, que con un random_state fijo da el
+    mismo bosque que un único fit; el resto de los modelos se entrena de una vez.
+    """
+    if cancel_token is None or not (hasattr(model, "warm_start") and hasattr(model, "n_estimators")):
+        model.fit(X, y)
+        return
+    n_estimators, warm_start = model.n_estimators, model.warm_start
+    built = len(getattr(model, "estimators_", [])) if warm_start else 0
+    try:
+        for n_trees in range(built + CANCEL_CHECK_TREES, n_estimators + CANCEL_CHECK_TREES, CANCEL_CHECK_TREES):
+            cancel_token.raise_if_cancelled()
+            model.set_params(n_estimators=min(n_trees, n_estimators),
+                             warm_start=warm_start or n_trees > built + CANCEL_CHECK_TREES)
+            model.fit(X, y)
+    finally:
+        model.set_params(n_estimators=n_estimators, warm_start=warm_start)
+
+
+def _report_fold(progress, fold, folds, matrix, start, stop, preds, seconds, cached, completed=None):
+    """
+    Envía a `progress` el avance del backtest después de cada paso. En paralelo los
+    pasos terminan en cualquier orden: `completed` es cuántos terminaron hasta ahora.
+    """
+    if progress is not None:
+        progress({'fold': fold, 'folds': folds, 'completed': fold if completed is None else completed,
+                  'train_rows': start, 'predictions': stop - start,
+                  'accuracy': float((preds == matrix.y[start:stop]).mean()), 'seconds': seconds,
+                  'cached': cached})
+
+
+def _fit_predict_fold(fold, model, X, y, train_end, X_test, return_model, cancel_token=None):
+    """
+    Entrena y predice un paso del backtest; con `cancel_token` el fit se corta entre
+    tandas de árboles. Devuelve (fold, predicciones, modelo o None, segundos del paso).
+    """
+    fold_start = time.perf_counter()
+    # En el pool, X e y llegan como memmap de solo lectura y X[:train_end] es una vista
+    _fit_model(model, X[:train_end], y[:train_end], cancel_token)
+    preds = model.predict_proba(X_test)[:, 1]
+    return fold, (preds >= 0.5).astype(int), (model if return_model else None), time.perf_counter() - fold_start
+
+
+def _cached_fold_model(model, matrix, train_end, stockSymbol, model_cache):
+    """Devuelve (clave, modelo del cache o None) para el paso que entrena con train_end filas"""
+    if model_cache is None:
+        return None, None
+    key = model_key(model, matrix.predictors, matrix.index[:train_end],
+                    matrix.X[:train_end], matrix.y[:train_end], stockSymbol)
+    return key, model_cache.get(key)
+
+
+def _parallel_folds(matrix, model, start, step, stockSymbol, stockName, sentiment_stats, n_jobs, model_cache=None,
+                    progress=None, cancel_token=None):
+    """
+    Ejecuta los pasos del backtest en paralelo con un clon del modelo por paso.
+    El sentiment se aplica acá (usa el cache de noticias del proceso principal) y los
+    workers solo entrenan y predicen; los pasos con modelo en cache no se reentrenan.
+    Al terminar, `model` queda como el del último paso.
+
+    Los resultados se reciben a medida que terminan los pasos (en cualquier orden) y
+    el avance se informa por paso con su tiempo de entrenamiento y predicción en el
+    worker. Los workers revisan la cancelación entre tandas de árboles, así que al
+    cancelar también se cortan los fits en curso y se descartan los pendientes.
+    """
+    folds = []
+    results = {}
+    starts = range(start, len(matrix), step)
+    for k, i in enumerate(starts):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        stop = min(i + step, len(matrix))
+        sentiment_stats['total_predictions'] += stop - i
+        key, cached_model = _cached_fold_model(model, matrix, i, stockSymbol, model_cache)
+        X_test = _test_features(matrix, i, stop, stockSymbol, stockName, sentiment_stats)
+        if cached_model is not None:
+            results[k] = ((cached_model.predict_proba(X_test)[:, 1] >= 0.5).astype(int), cached_model)
+            sentiment_stats['cached_models'] += 1
+            _report_fold(progress, k + 1, len(starts), matrix, i, stop, results[k][0], 0.0, True, len(results))
+        folds.append((i, stop, X_test, key, cached_model))
+
+    # joblib guarda X e y una sola vez como memmap y los comparte con todos los workers
+    pending = [k for k, fold in enumerate(folds) if fold[4] is None]
+    # Cada worker de joblib entrena un paso: los clones usan solo su parte de los núcleos
+    fold_model = clone(model)
+    if 'n_jobs' in fold_model.get_params():
+        fold_model.set_params(n_jobs=worker_n_jobs(effective_n_jobs(n_jobs)))
+    with span('backtest.paralelo', pasos=len(pending), n_jobs=n_jobs), \
+            _process_cancel_token(cancel_token) as worker_cancel_token:
+        outputs = Parallel(n_jobs=n_jobs, max_nbytes='1M', mmap_mode='r', return_as='generator_unordered')(
+            delayed(_fit_predict_fold)(k, clone(fold_model), matrix.X, matrix.y, folds[k][0], folds[k][2],
+                                       model_cache is not None or k == len(folds) - 1, worker_cancel_token)
+            for k in pending
+        )
+        try:
+            for k, preds, fitted_model, seconds in outputs:
+                results[k] = (preds, fitted_model)
+                i, stop = folds[k][:2]
+                _report_fold(progress, k + 1, len(folds), matrix, i, stop, preds, seconds, False, len(results))
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+        finally:
+            outputs.close()
+
+    all_predictions = []
+    for k, (i, stop, X_test, key, cached_model) in enumerate(folds):
+        preds, fitted_model = results[k]
+        if cached_model is None and model_cache is not None:
+            model_cache.put(key, fitted_model)
+        all_predictions.append(_predictions_frame(matrix, i, stop, preds))
+        if k == len(folds) - 1:
+            _copy_fitted_state(model, fitted_model)
+    return all_predictions
+
+
+def backtest(stockData, model, predictors, start=2500, step=250, stockSymbol=None, stockName=None,
+             mode="refit", trees_per_step=50, retire_per_step=None, n_jobs=None, model_cache=None,
+             progress=None, cancel_token=None):
     """
     Backtesting mejorado con sentiment cuando sea relevante
+
+    mode="refit": reentrena el modelo completo en cada paso (comportamiento original).
+    mode="warm_start": entrena el bosque completo solo en el primer paso; en los siguientes
+    agrega `trees_per_step` árboles entrenados con la ventana expandida y descarta los
+    `retire_per_step` más antiguos (por defecto los mismos que se agregan, así el tamaño
+    del bosque se mantiene).
+
+    n_jobs: con un valor distinto de None/1 los pasos del modo "refit" se ejecutan en
+    paralelo (-1 usa todos los núcleos). Con un random_state fijo el resultado es
+    idéntico al de la ejecución serial.
+
+    `stockData` puede ser el DataFrame de setDataForTraining o un FeatureMatrix; en
+    ambos casos los pasos entrenan sobre vistas de una única matriz float32.
+
+    model: un estimador de sklearn o el nombre de un modelo del registro (ver models.MODEL_BACKENDS).
+
+    model_cache: un ModelCache para reutilizar los modelos ya entrenados de cada paso
+    (solo en modo "refit"); al volver a analizar un símbolo solo se entrenan los pasos nuevos.
+
+    progress: función que recibe un dict por paso terminado con fold, folds, completed
+    (pasos terminados; en paralelo pueden terminar fuera de orden), train_rows,
+    predictions, accuracy, seconds (entrenamiento y predicción del paso) y cached.
+
+    cancel_token: un CancellationToken que se revisa en cada paso y entre tandas de
+    CANCEL_CHECK_TREES árboles; al cancelarlo el backtest lanza BacktestCancelled.
     """
+    if mode not in ("refit", "warm_start"):
+        raise ValueError(f"Modo de backtest desconocido: {mode}")
+    if isinstance(model, str):
+        model = create_model(model)
+    if mode == "warm_start" and not (hasattr(model, "warm_start") and hasattr(model, "n_estimators")):
+        raise ValueError("El modo warm_start requiere un bosque con warm_start (ej. RandomForest o ExtraTrees)")
+    if mode == "warm_start" and n_jobs not in (None, 1):
+        raise ValueError("El modo warm_start es secuencial y no admite n_jobs")
+    if mode == "warm_start" and model_cache is not None:
+        raise ValueError("El modo warm_start depende del paso anterior y no admite model_cache")
+    if retire_per_step is None:
+        retire_per_step = trees_per_step
+
+    # Una sola conversión a float32 con solo los predictores; los pasos usan vistas
+    matrix = stockData if isinstance(stockData, FeatureMatrix) else FeatureMatrix.from_frame(stockData, predictors)
+
     all_predictions = []
+    original_warm_start = getattr(model, "warm_start", None)
+    original_n_estimators = getattr(model, "n_estimators", None)
+    original_random_state = getattr(model, "random_state", None)
     
     # Estadísticas para el análisis de noticias
     sentiment_stats = {
@@ -95,19 +373,55 @@ def backtest(stockData, model, predictors, start=2500, step=250, stockSymbol=Non
         'sentiment_applied': 0,
         'skipped_old': 0,
         'skipped_future': 0,
-        'skipped_other': 0
+        'skipped_other': 0,
+        'cached_models': 0
     }
 
-    for i in range(start, stockData.shape[0], step):
-        train = stockData.iloc[0:i].copy()
-        test = stockData.iloc[i:(i + step)].copy()
-        
-        # Contar predicciones totales
-        sentiment_stats['total_predictions'] += len(test)
+    try:
+        if n_jobs not in (None, 1):
+            all_predictions = _parallel_folds(matrix, model, start, step, stockSymbol, stockName,
+                                              sentiment_stats, n_jobs, model_cache, progress, cancel_token)
+        else:
+            starts = range(start, len(matrix), step)
+            for fold, i in enumerate(starts):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                stop = min(i + step, len(matrix))
+                fold_start = time.perf_counter()
 
-        predictions = predict_with_sentiment(train, test, predictors, model, stockSymbol, stockName, sentiment_stats)
-        if not predictions.empty:
-            all_predictions.append(predictions)
+                # Contar predicciones totales
+                sentiment_stats['total_predictions'] += stop - i
+
+                with span('backtest.paso', fold=fold, train_rows=i):
+                    if mode == "warm_start":
+                        _prepare_warm_start(model, fold, original_n_estimators, trees_per_step, retire_per_step,
+                                            original_random_state)
+
+                    # Entrenar el modelo sobre una vista de las primeras i filas (o cargarlo del cache)
+                    key, cached_model = _cached_fold_model(model, matrix, i, stockSymbol, model_cache)
+                    if cached_model is not None:
+                        _copy_fitted_state(model, cached_model)
+                        sentiment_stats['cached_models'] += 1
+                    else:
+                        with span('backtest.entrenar', rows=i):
+                            _fit_model(model, matrix.X[:i], matrix.y[:i], cancel_token)
+                        if model_cache is not None:
+                            model_cache.put(key, model)
+
+                    X_test = _test_features(matrix, i, stop, stockSymbol, stockName, sentiment_stats)
+                    try:
+                        preds = (model.predict_proba(X_test)[:, 1] >= 0.5).astype(int)
+                    except Exception as e:
+                        print(f"Error making predictions: {e}")
+                        continue
+                    all_predictions.append(_predictions_frame(matrix, i, stop, preds))
+                _report_fold(progress, fold + 1, len(starts), matrix, i, stop, preds,
+                             time.perf_counter() - fold_start, cached_model is not None)
+    finally:
+        if mode == "warm_start":
+            model.warm_start = original_warm_start
+            model.n_estimators = original_n_estimators
+            model.random_state = original_random_state
     
     # Mostrar estadísticas al final
     print(f"\n📊 Estadísticas del análisis de noticias:")
@@ -115,6 +429,8 @@ def backtest(stockData, model, predictors, start=2500, step=250, stockSymbol=Non
     print(f"  Con sentiment aplicado: {sentiment_stats['sentiment_applied']}")
     print(f"  Saltadas (muy antiguas): {sentiment_stats['skipped_old']}")
     print(f"  Saltadas (futuras): {sentiment_stats['skipped_future']}")
+    if model_cache is not None:
+        print(f"  Modelos reutilizados del cache: {sentiment_stats['cached_models']}")
     if sentiment_stats['total_predictions'] > 0:
         pct_with_news = (sentiment_stats['sentiment_applied'] / sentiment_stats['total_predictions']) * 100
         print(f"  Porcentaje con noticias: {pct_with_news:.1f}%")
@@ -125,3 +441,86 @@ def backtest(stockData, model, predictors, start=2500, step=250, stockSymbol=Non
         return pd.DataFrame()
 
 
+def predict_next_session(stockSymbol, stockName=None, model=None, start=2500, step=250,
+                         model_cache=None, use_news=True, live_data=None):
+    """
+    Predice la sesión siguiente a la última barra disponible sin correr el backtest.
+
+    Usa el modelo del paso del backtest (con los mismos `start`/`step`) que contiene a
+    la barra nueva: si está en `model_cache` se carga y si no se entrena una sola vez.
+    Del análisis de noticias solo se consulta el día anterior a la barra (as-of t-1).
+    `live_data` permite pasar el resultado de load_live_data ya calculado.
+    Devuelve un dict con la fecha de la barra, la probabilidad de suba y la predicción.
+    """
+    start_time = time.perf_counter()
+    if model is None or isinstance(model, str):
+        model = create_model(model)
+
+    with span('prediccion.datos'):
+        matrix, predictors, live_row = live_data or load_live_data(stockSymbol)
+    if live_row is None:
+        raise ValueError("La última barra no tiene todos los predictores calculados")
+    if len(matrix) < start:
+        raise ValueError(f"Historial insuficiente: {len(matrix)} filas y el backtest empieza en {start}")
+
+    # Mismo paso que usaría backtest para esta fila: entrenado con las primeras train_end filas
+    train_end = start + ((len(matrix) - start) // step) * step
+    key, cached_model = _cached_fold_model(model, matrix, train_end, stockSymbol, model_cache)
+    if cached_model is not None:
+        _copy_fitted_state(model, cached_model)
+    else:
+        with span('prediccion.entrenar', rows=train_end):
+            model.fit(matrix.X[:train_end], matrix.y[:train_end])
+        if model_cache is not None:
+            model_cache.put(key, model)
+
+    X_live = live_row[predictors].to_numpy(dtype=np.float32)
+    bar_date = live_row.index[-1]
+    sentiment = None
+    if use_news:
+        with span('prediccion.noticias'):
+            sentiment = get_day_sentiment(stockSymbol, stockName, bar_date - pd.Timedelta(days=1))
+        if sentiment is not None and sentiment[0] > 0:
+            for k, column in enumerate(SENTIMENT_COLUMNS):
+                if column in predictors:
+                    X_live[0, predictors.index(column)] = sentiment[k]
+
+    probability = float(model.predict_proba(X_live)[0, 1])
+    return {
+        'symbol': stockSymbol,
+        'date': bar_date,
+        'probability': probability,
+        'prediction': int(probability >= 0.5),
+        'cached_model': cached_model is not None,
+        'train_rows': train_end,
+        'sentiment': sentiment,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def compare_models(stockData, predictors, names=None, start=2500, step=250, stockSymbol=None, stockName=None,
+                   model_n_jobs=None, cancel_token=None):
+    """
+    Corre el mismo backtest con cada modelo del registro y devuelve una tabla con
+    el tiempo total, el tiempo de entrenamiento y las métricas de cada uno.
+    `model_n_jobs` limita los núcleos de los modelos que lo admiten.
+    """
+    matrix = stockData if isinstance(stockData, FeatureMatrix) else FeatureMatrix.from_frame(stockData, predictors)
+    rows = []
+    for name in names or MODEL_BACKENDS:
+        model = create_model(name, n_jobs=model_n_jobs)
+        profiler = Profiler(trace_memory=False)
+        start_time = time.perf_counter()
+        with profiler.activate():
+            predictions = backtest(matrix, model, predictors, start=start, step=step,
+                                   stockSymbol=stockSymbol, stockName=stockName, cancel_token=cancel_token)
+        elapsed = time.perf_counter() - start_time
+        fit_time = sum(record['wall'] for record in profiler.records if record['name'] == 'backtest.entrenar')
+        row = {'Modelo': model_label(name), 'Tiempo (s)': elapsed, 'Entrenamiento (s)': fit_time,
+               'Accuracy': np.nan, 'Precision': np.nan, 'Predicciones': len(predictions)}
+        if not predictions.empty:
+            evaluation = EvaluationSummary(predictions)
+            row['Accuracy'] = evaluation.accuracy
+            row['Precision'] = evaluation.precision
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -1,33 +1,104 @@
 
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import numpy as np
 import pandas as pd
+from profiling import span
+
+
+def minmax_indices(values, start, stop, buckets):
+    """
+    Índices a dibujar de values[start:stop] con `buckets` grupos: el mínimo y el
+    máximo de cada grupo más los extremos del rango. Si el rango ya tiene pocos
+    puntos se devuelven todos (resolución completa).
+    """
+    count = stop - start
+    if count <= 2 * buckets:
+        return np.arange(start, stop)
+    size = -(-count // buckets)
+    full = count // size
+    segments = values[start:start + full * size].reshape(full, size)
+    offsets = start + np.arange(full) * size
+    indices = [offsets + segments.argmin(axis=1), offsets + segments.argmax(axis=1), [start, stop - 1]]
+    tail_start = start + full * size
+    if tail_start < stop:
+        tail = values[tail_start:stop]
+        indices.append([tail_start + tail.argmin(), tail_start + tail.argmax()])
+    return np.unique(np.concatenate(indices))
+
+
+class DownsampledLines:
+    """
+    Líneas con nivel de detalle: solo se dibujan ~2 puntos por píxel del ancho visible
+    (mínimo y máximo por grupo, así no se pierden los cambios de 0 a 1).
+
+    Al hacer zoom o mover el gráfico con la barra de navegación, o al cambiar el tamaño
+    de la ventana, se vuelve a muestrear el rango visible desde los datos completos.
+    Hay que conservar una referencia al objeto: matplotlib guarda los callbacks como
+    referencias débiles.
+    """
+
+    def __init__(self, ax, dates):
+        self.ax = ax
+        self.x = mdates.date2num(pd.DatetimeIndex(dates).tz_localize(None).to_pydatetime())
+        self.lines = []
+        ax.xaxis_date()
+        self._xlim_cid = ax.callbacks.connect('xlim_changed', self.update)
+        self._resize_cid = ax.figure.canvas.mpl_connect('resize_event', self.update)
+
+    def plot(self, values, *args, **kwargs):
+        line, = self.ax.plot([], [], *args, **kwargs)
+        self.lines.append((line, np.asarray(values, dtype=float)))
+        return line
+
+    def update(self, *_):
+        """Recalcula los puntos visibles según los límites y el ancho actual del eje"""
+        if len(self.x) == 0:
+            return
+        low, high = self.ax.get_xlim()
+        start = max(np.searchsorted(self.x, low, side='left') - 1, 0)
+        stop = min(np.searchsorted(self.x, high, side='right') + 1, len(self.x))
+        buckets = max(int(self.ax.bbox.width), 1)
+        for line, values in self.lines:
+            indices = minmax_indices(values, start, stop, buckets)
+            line.set_data(self.x[indices], values[indices])
+
+    def show_all(self):
+        if len(self.x):
+            self.ax.set_xlim(self.x[0], self.x[-1])
+        self.update()
+
+    def disconnect(self):
+        self.ax.callbacks.disconnect(self._xlim_cid)
+        self.ax.figure.canvas.mpl_disconnect(self._resize_cid)
 
 def create_graph(predictions_data, stock_symbol):
     """
     Crea un gráfico de las predicciones vs targets reales
     """
-    plt.figure(figsize=(15, 8))
+    with span('grafico.render', tipo='matplotlib'):
+        plt.figure(figsize=(15, 8))
     
-    # Crear subplots
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
+        # Crear subplots
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
     
-    # Gráfico 1: Predicciones vs Target real
-    predictions_data['Target'].plot(ax=ax1, label='Target Real', color='blue', alpha=0.7)
-    predictions_data['Predictions'].plot(ax=ax1, label='Predicciones', color='red', alpha=0.7)
-    ax1.set_title(f'Predicciones vs Target Real - {stock_symbol}')
-    ax1.set_xlabel('Fecha')
-    ax1.set_ylabel('Valor (0=Baja, 1=Sube)')
-    ax1.legend()
-    ax1.grid(True, alpha=0.3)
+        # Gráfico 1: Predicciones vs Target real
+        predictions_data['Target'].plot(ax=ax1, label='Target Real', color='blue', alpha=0.7)
+        predictions_data['Predictions'].plot(ax=ax1, label='Predicciones', color='red', alpha=0.7)
+        ax1.set_title(f'Predicciones vs Target Real - {stock_symbol}')
+        ax1.set_xlabel('Fecha')
+        ax1.set_ylabel('Valor (0=Baja, 1=Sube)')
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
     
-    # Gráfico 2: Diferencia entre predicción y realidad
-    diff = predictions_data['Predictions'] - predictions_data['Target']
-    diff.plot(ax=ax2, color='purple', alpha=0.7)
-    ax2.axhline(y=0, color='black', linestyle='--', alpha=0.5)
-    ax2.set_title('Diferencia (Predicción - Target Real)')
-    ax2.set_xlabel('Fecha')
-    ax2.set_ylabel('Diferencia')
-    ax2.grid(True, alpha=0.3)
+        # Gráfico 2: Diferencia entre predicción y realidad
+        diff = predictions_data['Predictions'] - predictions_data['Target']
+        diff.plot(ax=ax2, color='purple', alpha=0.7)
+        ax2.axhline(y=0, color='black', linestyle='--', alpha=0.5)
+        ax2.set_title('Diferencia (Predicción - Target Real)')
+        ax2.set_xlabel('Fecha')
+        ax2.set_ylabel('Diferencia')
+        ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+        plt.tight_layout()
     plt.show()
@@ -0,0 +1,299 @@
+import numpy as np
+import pandas as pd
+from profiling import span
+
+# Filas de historial necesarias para recalcular cualquier ventana (RSI_30 es la más larga)
+LOOKBACK_ROWS = 40
+
+INDICATOR_COLUMNS = [
+    "RSI_14", "RSI_7", "RSI_30",
+    "MACD", "MACD_Signal", "MACD_Histogram",
+    "MACD_Ratio", "MACD_Signal_Ratio",
+    "BB_Upper", "BB_Lower", "BB_Position", "BB_Width",
+    "Stoch_K", "Stoch_D",
+    "Williams_R",
+    "ATR_14", "ATR_Ratio",
+    "CCI",
+    "MFI",
+    "OBV", "OBV_Ratio",
+    "Momentum_5", "Momentum_10", "Momentum_20",
+    "ROC_5", "ROC_10", "ROC_20",
+]
+
+
+def _shift(values, periods=1):
+    """Equivalente a Series.shift sobre un array de numpy"""
+    out = np.full(len(values), np.nan)
+    if len(values) > periods:
+        out[periods:] = values[:-periods]
+    return out
+
+
+def _rolling_sum(values, window):
+    """
+    Suma móvil que solo depende de los valores de cada ventana.
+
+    A diferencia de pandas (que acumula una suma corrida sobre toda la serie), el
+    resultado de cada fila es idéntico bit a bit sin importar desde dónde se empiece
+    a calcular, lo que permite actualizar solo las filas nuevas. El redondeo no es el
+    de pandas: con ~8000 filas las bandas de Bollinger difieren hasta ~2e-10 en valor
+    absoluto (y BB_Position, cerca de cero, hasta ~4e-8 en relativo).
+    """
+    out = np.full(len(values), np.nan)
+    n = len(values) - window + 1
+    if n > 0:
+        total = values[0:n].copy()
+        for k in range(1, window):
+            total += values[k:k + n]
+        out[window - 1:] = total
+    return out
+
+
+def _rolling_mean(values, window):
+    return _rolling_sum(values, window) / window
+
+
+def _rolling_std(values, window):
+    """Desviación estándar móvil (ddof=1) calculada ventana por ventana"""
+    out = np.full(len(values), np.nan)
+    n = len(values) - window + 1
+    if n > 0:
+        mean = _rolling_mean(values, window)[window - 1:]
+        total = (values[0:n] - mean) ** 2
+        for k in range(1, window):
+            total += (values[k:k + n] - mean) ** 2
+        out[window - 1:] = np.sqrt(total / (window - 1))
+    return out
+
+
+def rolling_mad(values, window):
+    """
+    Desviación media absoluta móvil: mean(|x - mean(x)|) para cada ventana.
+
+    Reemplaza a rolling(window).apply(lambda ...) recorriendo la ventana con `window`
+    operaciones vectorizadas sobre toda la serie en lugar de una llamada Python por fila.
+    Las primeras `window - 1` filas (o cualquier ventana con NaN) quedan en NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    n = len(values) - window + 1
+    if n > 0:
+        mean = _rolling_mean(values, window)[window - 1:]
+        total = np.abs(values[0:n] - mean)
+        for k in range(1, window):
+            total += np.abs(values[k:k + n] - mean)
+        out[window - 1:] = total / window
+    return out
+
+
+def _rolling_extreme(values, window, func):
+    out = np.full(len(values), np.nan)
+    n = len(values) - window + 1
+    if n > 0:
+        result = values[0:n].copy()
+        for k in range(1, window):
+            result = func(result, values[k:k + n])
+        out[window - 1:] = result
+    return out
+
+
+def _ewm_mean(values, span, state):
+    """
+    Media exponencial equivalente a Series.ewm(span=span).mean() (adjust=True).
+
+    `state` es (weighted, old_wt, nobs) al final del bloque anterior y se devuelve
+    actualizado, así agregar N filas cuesta O(N).
+    """
+    alpha = 2.0 / (span + 1.0)
+    factor = 1.0 - alpha
+    weighted, old_wt, nobs = state
+    out = np.empty(len(values))
+
+    # Camino rápido: historial completo sin NaN, se usa pandas y se reconstruye el estado
+    if nobs == 0 and len(values) > 0 and not np.isnan(values).any():
+        out[:] = pd.Series(values).ewm(span=span).mean().to_numpy()
+        old_wt = 1.0
+        for _ in range(len(values) - 1):
+            new_wt = old_wt * factor + 1.0
+            if new_wt == old_wt:
+                break
+            old_wt = new_wt
+        return out, (out[-1], old_wt, len(values))
+
+    for i, cur in enumerate(values):
+        is_observation = cur == cur
+        nobs += is_observation
+        if weighted == weighted:
+            old_wt *= factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = ((old_wt * weighted) + cur) / (old_wt + 1.0)
+                old_wt += 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= 1 else np.nan
+    return out, (weighted, old_wt, nobs)
+
+
+def on_balance_volume(close, volume, prev_close=None, start_value=None):
+    """
+    On-Balance Volume vectorizado: suma acumulada de signo(ΔClose) * Volume.
+
+    `prev_close` y `start_value` permiten continuar un OBV ya calculado; sin ellos
+    el primer valor es el volumen de la primera barra. Las sumas se hacen en el
+    mismo orden que el acumulador fila por fila, así que el resultado es idéntico.
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    if len(close) == 0:
+        return np.empty(0)
+    previous = np.empty(len(close))
+    previous[1:] = close[:-1]
+    previous[0] = np.nan if prev_close is None else prev_close
+    signed_volume = np.where(close > previous, volume, np.where(close < previous, -volume, 0.0))
+    if start_value is None:
+        signed_volume[0] = volume[0]
+        return np.cumsum(signed_volume)
+    return np.cumsum(np.concatenate([[start_value], signed_volume]))[1:]
+
+
+def _rsi(close, window):
+    delta = close - _shift(close)
+    gain = _rolling_mean(np.where(delta > 0, delta, 0.0), window)
+    loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), window)
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+class TechnicalIndicatorEngine:
+    """
+    Motor de indicadores técnicos con estado.
+
+    Guarda las últimas filas de precios, los acumuladores de las medias exponenciales
+    y el total corrido de OBV, de modo que `update` solo calcula las filas nuevas.
+    El resultado es idéntico bit a bit al de calcular todo el historial de una vez.
+    """
+
+    def __init__(self):
+        self.tail = None
+        self.ewm_state = {
+            'ema12': (np.nan, 1.0, 0),
+            'ema26': (np.nan, 1.0, 0),
+            'macd_signal': (np.nan, 1.0, 0),
+        }
+        self.obv_last = None
+        self.rows_seen = 0
+
+    def update(self, new_rows):
+        """
+        Calcula los indicadores para las filas nuevas (deben ser posteriores a las ya vistas)
+        y devuelve un DataFrame con las columnas de INDICATOR_COLUMNS indexado como `new_rows`.
+        """
+        if len(new_rows) == 0:
+            return pd.DataFrame(columns=INDICATOR_COLUMNS, index=new_rows.index, dtype=float)
+        if self.tail is not None and len(self.tail) and new_rows.index[0] <= self.tail.index[-1]:
+            raise ValueError("Las filas nuevas deben ser posteriores a la última fila procesada")
+
+        raw = pd.DataFrame({
+            'Close': new_rows['Close'].to_numpy(dtype=float),
+            'High': new_rows['High'].to_numpy(dtype=float),
+            'Low': new_rows['Low'].to_numpy(dtype=float),
+            'Volume': new_rows['Volume'].to_numpy(dtype=float),
+        }, index=new_rows.index)
+
+        # OBV: total corrido desde el último valor guardado
+        close_new = raw['Close'].to_numpy()
+        prev_close = self.tail['Close'].iloc[-1] if self.tail is not None and len(self.tail) else None
+        obv_new = on_balance_volume(close_new, raw['Volume'].to_numpy(),
+                                    prev_close=prev_close, start_value=self.obv_last)
+        raw['OBV'] = obv_new
+
+        data = raw if self.tail is None else pd.concat([self.tail, raw])
+        close = data['Close'].to_numpy()
+        high = data['High'].to_numpy()
+        low = data['Low'].to_numpy()
+        volume = data['Volume'].to_numpy()
+        obv = data['OBV'].to_numpy()
+        result = {}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # RSI (Relative Strength Index)
+            with span('indicadores.rsi'):
+                result['RSI_14'] = _rsi(close, 14)
+                result['RSI_7'] = _rsi(close, 7)
+                result['RSI_30'] = _rsi(close, 30)
+
+            # MACD: solo las filas nuevas avanzan las medias exponenciales
+            with span('indicadores.macd'):
+                offset = len(data) - len(raw)
+                ema12, self.ewm_state['ema12'] = _ewm_mean(close_new, 12, self.ewm_state['ema12'])
+                ema26, self.ewm_state['ema26'] = _ewm_mean(close_new, 26, self.ewm_state['ema26'])
+                macd = ema12 - ema26
+                macd_signal, self.ewm_state['macd_signal'] = _ewm_mean(macd, 9, self.ewm_state['macd_signal'])
+                pad = np.full(offset, np.nan)
+                result['MACD'] = np.concatenate([pad, macd])
+                result['MACD_Signal'] = np.concatenate([pad, macd_signal])
+                result['MACD_Histogram'] = result['MACD'] - result['MACD_Signal']
+                result['MACD_Ratio'] = result['MACD'] / close
+                result['MACD_Signal_Ratio'] = result['MACD_Signal'] / close
+
+            # Bollinger Bands
+            with span('indicadores.bollinger'):
+                sma20 = _rolling_mean(close, 20)
+                std20 = _rolling_std(close, 20)
+                result['BB_Upper'] = sma20 + (std20 * 2)
+                result['BB_Lower'] = sma20 - (std20 * 2)
+                result['BB_Position'] = (close - result['BB_Lower']) / (result['BB_Upper'] - result['BB_Lower'])
+                result['BB_Width'] = (result['BB_Upper'] - result['BB_Lower']) / sma20
+
+            # Stochastic Oscillator
+            with span('indicadores.estocastico'):
+                low_min = _rolling_extreme(low, 14, np.minimum)
+                high_max = _rolling_extreme(high, 14, np.maximum)
+                result['Stoch_K'] = 100 * (close - low_min) / (high_max - low_min)
+                result['Stoch_D'] = _rolling_mean(result['Stoch_K'], 3)
+
+                # Williams %R
+                result['Williams_R'] = -100 * (high_max - close) / (high_max - low_min)
+
+            # Average True Range (ATR) - Volatilidad
+            with span('indicadores.atr'):
+                prev_close = _shift(close)
+                true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+                result['ATR_14'] = _rolling_mean(true_range, 14)
+                result['ATR_Ratio'] = result['ATR_14'] / close
+
+            # Commodity Channel Index (CCI)
+            with span('indicadores.cci'):
+                typical_price = (high + low + close) / 3
+                sma_tp = _rolling_mean(typical_price, 20)
+                mad = rolling_mad(typical_price, 20)
+                result['CCI'] = (typical_price - sma_tp) / (0.015 * mad)
+
+            # Money Flow Index (MFI)
+            with span('indicadores.mfi'):
+                money_flow = typical_price * volume
+                prev_tp = _shift(typical_price)
+                positive_flow = _rolling_sum(np.where(typical_price > prev_tp, money_flow, 0.0), 14)
+                negative_flow = _rolling_sum(np.where(typical_price < prev_tp, money_flow, 0.0), 14)
+                money_ratio = positive_flow / negative_flow
+                result['MFI'] = 100 - (100 / (1 + money_ratio))
+
+            # On-Balance Volume (OBV)
+            with span('indicadores.obv'):
+                result['OBV'] = obv
+                result['OBV_Ratio'] = obv / _rolling_mean(obv, 20)
+
+            # Momentum y Rate of Change (ROC)
+            with span('indicadores.momentum'):
+                for periods in (5, 10, 20):
+                    ratio = close / _shift(close, periods)
+                    result[f'Momentum_{periods}'] = ratio - 1
+                    result[f'ROC_{periods}'] = (ratio - 1) * 100
+
+        self.tail = data.iloc[-LOOKBACK_ROWS:]
+        self.obv_last = obv_new[-1]
+        self.rows_seen += len(raw)
+
+        start = len(data) - len(raw)
+        return pd.DataFrame({col: result[col][start:] for col in INDICATOR_COLUMNS}, index=new_rows.index)
@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_worker import (AnalysisPool, array_to_index, attach_arrays, attach_matrix, index_to_array,
+                             predictions_path, share_arrays, share_matrix)
+from benchmarks.synthetic import generate_ohlcv
+from data_from_stock import FeatureMatrix
+from models import MODEL_BACKENDS, model_label
+from price_store import load_prices
+
+
+def test_predictions_path_is_unique_per_session():
+    paths = {predictions_path(symbol, model) for symbol in ("AAPL", "MSFT", "^GSPC")
+             for model in ("random_forest", "extra_trees")}
+    assert len(paths) == 6
+    assert predictions_path("^GSPC", "random_forest") == "predictions__GSPC_random_forest.csv"
+
+
+def test_shared_arrays_round_trip():
+    arrays = {'X': np.arange(12, dtype=np.float32).reshape(3, 4), 'y': np.array([0, 1, 1]),
+              'empty': np.empty(0)}
+    restored = attach_arrays(share_arrays(arrays))
+    for name, array in arrays.items():
+        assert restored[name].dtype == array.dtype
+        assert np.array_equal(restored[name], array)
+
+
+def test_shared_matrix_round_trip():
+    index = pd.bdate_range('2020-01-01', periods=3, name='Date')
+    matrix = FeatureMatrix(np.ones((3, 2), dtype=np.float32), np.array([0, 1, 0]), index, ["a", "b"])
+    restored = attach_matrix(share_matrix(matrix))
+    assert np.array_equal(restored.X, matrix.X) and np.array_equal(restored.y, matrix.y)
+    assert restored.index.equals(index) and restored.predictors == ["a", "b"]
+
+
+def test_index_round_trip_keeps_timezone():
+    index = pd.date_range('2024-01-02', periods=5, freq='B', tz='America/New_York', name='Date')
+    values, meta = index_to_array(index)
+    assert array_to_index(values, meta).equals(index)
+
+
+def run_task(pool, task, timeout=180):
+    """Mensajes de la tarea hasta 'done'"""
+    messages = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for message in pool.poll():
+            if message['task'] == task:
+                messages.append(message)
+                if message['type'] == 'done':
+                    return messages
+        time.sleep(0.05)
+    raise TimeoutError(f"La tarea {task} no terminó")
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    # Los workers (spawn) heredan el entorno: almacén de precios y cache de modelos temporales
+    monkeypatch.setenv('PRICE_STORE_DIR', str(tmp_path / "prices"))
+    monkeypatch.setenv('MODEL_CACHE_DIR', str(tmp_path / "models"))
+    pool = AnalysisPool(workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_runs_model_comparison_on_shared_matrix(pool):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2800, 4)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(np.int64)
+    matrix = FeatureMatrix(X, y, pd.bdate_range('1995-01-02', periods=len(y), name='Date'),
+                           ["f0", "f1", "f2", "f3"])
+
+    pool.clear_sentiment_cache()
+    messages = run_task(pool, pool.submit("TEST", "Test", kind='compare', matrix=matrix))
+
+    results = [message for message in messages if message['type'] == 'result']
+    assert len(results) == 1, messages
+    comparison = results[0]['comparison']
+    assert list(comparison['Modelo']) == [model_label(name) for name in MODEL_BACKENDS]
+    assert (comparison['Predicciones'] == 300).all()
+
+
+def test_pool_predicts_next_session_from_price_store(pool, tmp_path):
+    history = generate_ohlcv(3800, seed=5)
+    load_prices("TEST", downloader=lambda symbol, start: history, store_dir=str(tmp_path / "prices"))
+
+    messages = run_task(pool, pool.submit("TEST", "", "random_forest", kind='next_session'))
+
+    results = [message for message in messages if message['type'] == 'result']
+    assert len(results) == 1, messages
+    prediction = results[0]['prediction']
+    assert prediction['date'] == history.index[-1]
+    assert prediction['prediction'] in (0, 1)
+    assert any(message['type'] == 'log' and "🔮" in message['text'] for message in messages)
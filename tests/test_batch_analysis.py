@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import batch_analysis
+import news_analysis
+import price_store
+from batch_analysis import RESULT_COLUMNS, analyze_symbol, run_batch
+from benchmarks.synthetic import generate_ohlcv
+from price_store import load_prices
+
+START, STEP = 1500, 250
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Almacén de precios temporal visible para los procesos del lote"""
+    directory = str(tmp_path / "prices")
+    monkeypatch.setenv('PRICE_STORE_DIR', directory)
+    monkeypatch.setattr(price_store, 'PRICE_STORE_DIR', directory)
+    return directory
+
+
+def store_prices(symbol, history, directory):
+    load_prices(symbol, downloader=lambda symbol, start: history, store_dir=directory)
+
+
+def crash_on_symbol(stockSymbol, *args):
+    if stockSymbol == "CRASH":
+        os._exit(1)
+    return {'Symbol': stockSymbol, 'Name': None, 'Accuracy': 0.5, 'Seconds': 0.0, 'Error': None}
+
+
+def analyze_with_news(stockSymbol, sentiment_by_date):
+    """Corre en un proceso del pool: devuelve la fila, las noticias que vio y el resumen del backtest"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        row = analyze_symbol(stockSymbol, None, sentiment_by_date, START, STEP)
+    return row, news_analysis.get_bulk_news_for_period(stockSymbol), output.getvalue()
+
+
+def test_run_batch_analyzes_symbols_in_process_pool(store):
+    for seed, symbol in enumerate(("AAA", "BBB")):
+        store_prices(symbol, generate_ohlcv(3000, seed=seed), store)
+
+    results = run_batch([("BBB", "Beta"), ("AAA", None)], jobs=2, start=START, step=STEP, use_news=False)
+
+    assert list(results.columns) == RESULT_COLUMNS
+    assert list(results['Symbol']) == ["BBB", "AAA"]
+    assert results.loc[0, 'Name'] == "Beta" and pd.isna(results.loc[1, 'Name'])
+    assert results['Error'].isna().all(), results['Error'].tolist()
+    assert (results['Predictions'] > 0).all()
+    assert results['Accuracy'].between(0, 1).all()
+
+
+def test_run_batch_reports_crashed_worker_per_symbol(monkeypatch):
+    monkeypatch.setattr(batch_analysis, 'analyze_symbol', crash_on_symbol)
+
+    results = run_batch([("CRASH", None), ("OK", None)], jobs=1, use_news=False)
+
+    assert list(results['Symbol']) == ["CRASH", "OK"]
+    assert "BrokenProcessPool" in results.loc[0, 'Error']
+
+
+def test_injected_news_reach_pool_worker(store, monkeypatch):
+    today = pd.Timestamp.now().normalize()
+    history = generate_ohlcv(3000, seed=3)
+    history.index = pd.bdate_range(end=today - pd.Timedelta(days=1), periods=len(history), name='Date')
+    store_prices("NEWS", history, store)
+    news = {(today - pd.Timedelta(days=d)).strftime('%Y-%m-%d'): (0.7, 0.2, 0.1, 2) for d in range(1, 20)}
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("las noticias deberían venir de set_bulk_news")
+    monkeypatch.setattr(news_analysis, 'get_news', no_network)
+    news_analysis.clear_sentiment_cache()
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        row, seen_news, output = executor.submit(analyze_with_news, "NEWS", news).result()
+
+    assert row['Error'] is None, row['Error']
+    assert seen_news == news
+    applied = int(output.split("Con sentiment aplicado: ")[1].split()[0])
+    assert applied > 0
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv
+from data_from_stock import TENDENCY_DAYS, horizon_features, prepare_training_data
+
+
+def rolling_features(close, target, horizons):
+    """Cálculo original con rolling de pandas, una columna por horizonte"""
+    ratios = np.column_stack([close / close.rolling(horizon).mean() for horizon in horizons])
+    trends = np.column_stack([target.shift(1).rolling(horizon).sum() for horizon in horizons])
+    return ratios, trends
+
+
+@pytest.mark.parametrize("rows", [1, 4, 5, 6, 300, 2500])
+def test_horizon_features_match_rolling(rows):
+    prices = generate_ohlcv(rows, seed=rows)
+    close = prices['Close']
+    target = (close.shift(-1) > close).astype(int)
+    horizons = [2, 5, 60, 250, 1000]
+
+    ratios, trends = horizon_features(close, target, horizons)
+    expected_ratios, expected_trends = rolling_features(close, target, horizons)
+
+    assert np.array_equal(np.isnan(ratios), np.isnan(expected_ratios))
+    np.testing.assert_allclose(ratios, expected_ratios, rtol=1e-12, atol=0)
+    np.testing.assert_array_equal(trends, expected_trends)
+
+
+def test_horizon_features_nan_close_invalidates_its_windows():
+    close = pd.Series(generate_ohlcv(400, seed=1)['Close'].to_numpy())
+    close.iloc[[50, 51, 200]] = np.nan
+    target = pd.Series(np.arange(400) % 3 == 0, dtype=int)
+
+    ratios, _ = horizon_features(close, target, [5, 60])
+    expected, _ = rolling_features(close, target, [5, 60])
+
+    assert np.array_equal(np.isnan(ratios), np.isnan(expected))
+    np.testing.assert_allclose(ratios, expected, rtol=1e-12, atol=0)
+
+
+def test_prepare_training_data_keeps_horizon_columns():
+    stockData, predictors = prepare_training_data(generate_ohlcv(1500, seed=2))
+    horizon_columns = [column for column in predictors if column.startswith(('Close_Ratio_', 'Trend_'))]
+    assert horizon_columns == [f"{name}_{days}" for days in TENDENCY_DAYS for name in ("Close_Ratio", "Trend")]
+    assert stockData[horizon_columns].notna().all().all()
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import confusion_matrix, precision_score
+
+from evaluation import EvaluationSummary, PERIOD_STEP, PERIOD_WINDOW
+
+
+def make_predictions(size, seed=0):
+    rng = np.random.default_rng(seed)
+    target = rng.integers(0, 2, size)
+    predictions = np.where(rng.random(size) < 0.6, target, 1 - target)
+    # Un tramo sin predicciones de suba: precision indefinida en esas ventanas
+    predictions[size // 3:size // 3 + 40] = 0
+    index = pd.bdate_range('2015-06-01', periods=size, name='Date')
+    return pd.DataFrame({'Target': target, 'Predictions': predictions}, index=index)
+
+
+@pytest.fixture(params=[0, 1, 5, 99, 100, 101, 1250])
+def predictions(request):
+    return make_predictions(request.param, seed=request.param)
+
+
+def test_totals_match_sklearn(predictions):
+    summary = EvaluationSummary(predictions)
+    assert summary.size == len(predictions)
+    if len(predictions) == 0:
+        assert np.isnan(summary.accuracy)
+        return
+    target, preds = predictions['Target'], predictions['Predictions']
+    assert summary.accuracy == pytest.approx((target == preds).mean(), abs=1e-15)
+    assert summary.precision == pytest.approx(precision_score(target, preds, zero_division=0), abs=1e-15)
+    tn, fp, fn, tp = confusion_matrix(target, preds, labels=[0, 1]).ravel()
+    assert summary.confusion == {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp}
+    assert summary.predicted_counts == {0: int((preds == 0).sum()), 1: int((preds == 1).sum())}
+    assert summary.target_counts == {0: int((target == 0).sum()), 1: int((target == 1).sum())}
+
+
+def test_accuracy_by_period_matches_window_loop(predictions):
+    # Bucle del gráfico "Accuracy por Período" que reemplaza el resumen
+    accuracies, dates = [], []
+    for i in range(PERIOD_WINDOW, len(predictions), PERIOD_STEP):
+        window_data = predictions.iloc[i - PERIOD_WINDOW:i]
+        accuracies.append((window_data['Target'] == window_data['Predictions']).mean())
+        dates.append(window_data.index[-1])
+
+    by_period = EvaluationSummary(predictions).accuracy_by_period
+    assert list(by_period.index) == dates
+    np.testing.assert_allclose(by_period.to_numpy(), accuracies, rtol=0, atol=1e-15)
+
+
+def test_per_year_matches_groupby(predictions):
+    per_year = EvaluationSummary(predictions).per_year
+    if len(predictions) == 0:
+        assert per_year.empty
+        return
+    rows = []
+    for year, group in predictions.groupby(predictions.index.year):
+        rows.append({'Predicciones': len(group),
+                     'Accuracy': (group['Target'] == group['Predictions']).mean(),
+                     'Precision': precision_score(group['Target'], group['Predictions'], zero_division=0),
+                     'Up_Ratio': (group['Predictions'] == 1).mean()})
+    expected = pd.DataFrame(rows, index=pd.Index(sorted(set(predictions.index.year)), name='Año'))
+
+    assert list(per_year.index) == list(expected.index)
+    assert list(per_year['Predicciones']) == list(expected['Predicciones'])
+    for column in ('Accuracy', 'Precision', 'Up_Ratio'):
+        np.testing.assert_allclose(per_year[column].to_numpy(), expected[column].to_numpy(), rtol=0, atol=1e-15)
+
+
+def test_window_stats_match_slices():
+    predictions = make_predictions(500, seed=3)
+    summary = EvaluationSummary(predictions)
+    rng = np.random.default_rng(1)
+    starts = rng.integers(0, 499, 200)
+    ends = starts + rng.integers(1, 500 - starts)
+    accuracy, precision = summary._window_stats(starts, ends)
+    for a, b, acc, prec in zip(starts, ends, accuracy, precision):
+        window = predictions.iloc[a:b]
+        assert acc == pytest.approx((window['Target'] == window['Predictions']).mean(), abs=1e-15)
+        up = window['Predictions'] == 1
+        if up.any():
+            assert prec == pytest.approx((window['Target'][up] == 1).mean(), abs=1e-15)
+        else:
+            assert np.isnan(prec)
@@ -0,0 +1,84 @@
+import os
+import threading
+
+import joblib
+import pytest
+
+from model_cache import ModelCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ModelCache(directory=str(tmp_path))
+
+
+def test_put_and_get_round_trip(cache, tmp_path):
+    cache.put("k1", {'trees': [1, 2, 3]})
+    assert cache.get("k1") == {'trees': [1, 2, 3]}
+    assert cache.get("missing") is None
+    # No quedan temporales después de guardar
+    assert os.listdir(tmp_path) == ["k1.joblib"]
+
+
+def test_get_tolerates_file_removed_by_another_process(cache, monkeypatch):
+    cache.put("k1", [1])
+
+    def load_and_remove(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(joblib, 'load', load_and_remove)
+    assert cache.get("k1") is None
+
+
+def test_corrupt_entry_is_discarded(cache, tmp_path):
+    (tmp_path / "k1.joblib").write_bytes(b"no es un pickle")
+    assert cache.get("k1") is None
+    assert not (tmp_path / "k1.joblib").exists()
+
+
+def test_entries_skip_files_removed_while_listing(cache, tmp_path, monkeypatch):
+    cache.put("k1", [1])
+    cache.put("k2", [2])
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        if str(path).endswith("k1.joblib"):
+            raise FileNotFoundError(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'stat', stat)
+    assert [os.path.basename(path) for _, _, path in cache._entries()] == ["k2.joblib"]
+
+
+def test_evict_tolerates_concurrent_removal(cache, tmp_path, monkeypatch):
+    cache.put("k1", [1])
+    cache.put("k2", [2])
+    entries = cache._entries()
+    # Otro proceso borra k1 entre el listado y la eliminación
+    os.remove(entries[0][2])
+    monkeypatch.setattr(cache, '_entries', lambda: entries)
+    cache.max_bytes = 0
+    cache._evict()
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_puts_of_the_same_key(cache, tmp_path):
+    errors = []
+
+    def put(value):
+        try:
+            for _ in range(20):
+                cache.put("k1", [value] * 1000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put, args=(value,)) for value in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.get("k1") in [[value] * 1000 for value in range(4)]
+    assert os.listdir(tmp_path) == ["k1.joblib"]
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import models
+from data_from_stock import FeatureMatrix
+from models import MODEL_BACKENDS, MODEL_N_JOBS, create_model, feature_importances, worker_n_jobs
+from stock_analysis import backtest
+
+
+def test_worker_n_jobs_splits_cores():
+    cores = os.cpu_count() or 1
+    assert worker_n_jobs(1) == cores
+    assert worker_n_jobs(cores) == 1
+    assert worker_n_jobs(cores * 4) == 1
+    assert worker_n_jobs(0) == cores
+
+
+@pytest.mark.parametrize("name", list(MODEL_BACKENDS))
+def test_create_model_overrides_n_jobs(name):
+    default, limited = create_model(name), create_model(name, n_jobs=1)
+    if 'n_jobs' in default.get_params():
+        assert default.get_params()['n_jobs'] == MODEL_N_JOBS
+        assert limited.get_params()['n_jobs'] == 1
+    else:
+        assert limited.get_params() == default.get_params()
+
+
+def test_permutation_importance_uses_caller_n_jobs(monkeypatch):
+    calls = []
+
+    class Result:
+        importances_mean = np.array([0.2, -0.1])
+
+    def fake_permutation_importance(model, X, y, **kwargs):
+        calls.append(kwargs['n_jobs'])
+        return Result()
+    monkeypatch.setattr(models, 'permutation_importance', fake_permutation_importance)
+
+    model = create_model('hist_gradient_boosting')
+    X, y = np.zeros((4, 2)), np.array([0, 1, 0, 1])
+    assert list(feature_importances(model, X, y, n_jobs=2)) == [0.2, 0.0]
+    feature_importances(model, X, y)
+    assert calls == [2, MODEL_N_JOBS]
+
+
+class RecordingCache:
+    """Cache sin aciertos que guarda los modelos entrenados por los workers"""
+    def __init__(self):
+        self.models = []
+
+    def get(self, key):
+        return None
+
+    def put(self, key, model):
+        self.models.append(model)
+
+
+def test_parallel_fold_clones_use_their_share_of_cores():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 4)).astype(np.float32)
+    matrix = FeatureMatrix(X, (X[:, 0] > 0).astype(np.int64), pd.bdate_range('1995-01-02', periods=600, name='Date'),
+                           ["f0", "f1", "f2", "f3"])
+    model = RandomForestClassifier(n_estimators=10, random_state=1, n_jobs=-1)
+    cache = RecordingCache()
+
+    backtest(matrix, model, matrix.predictors, start=300, step=100, n_jobs=2, model_cache=cache)
+
+    assert len(cache.models) == 3
+    assert {fitted.n_jobs for fitted in cache.models} == {worker_n_jobs(2)}
+    # El modelo del llamador conserva su n_jobs
+    assert model.n_jobs == -1
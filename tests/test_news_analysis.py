@@ -0,0 +1,84 @@
+from news_analysis import score_articles
+
+LABELS = ('positive', 'negative', 'neutral')
+
+
+class StubTokenizer:
+    """Tokenizer por palabras que trunca igual que el de transformers"""
+
+    def __call__(self, texts, truncation=False, max_length=None):
+        tokens = [text.split() for text in texts]
+        if truncation:
+            tokens = [words[:max_length] for words in tokens]
+        return tokens
+
+
+class StubModel:
+    """Clasificador determinístico: la etiqueta depende del largo de la entrada tokenizada"""
+
+    def __call__(self, batch):
+        results = []
+        for words in batch:
+            main = LABELS[len(words) % 3]
+            results.append([{'label': label, 'score': 0.8 if label == main else 0.1} for label in LABELS])
+        return results
+
+
+class StubPipeline:
+    """Misma firma que el pipeline de text-classification; registra cada llamada"""
+
+    def __init__(self, fail_on=None):
+        self.tokenizer = StubTokenizer()
+        self.model = StubModel()
+        self.calls = []
+        self.fail_on = fail_on
+
+    def __call__(self, texts, batch_size=None, truncation=False, max_length=None):
+        self.calls.append({'texts': list(texts), 'batch_size': batch_size, 'truncation': truncation,
+                           'max_length': max_length})
+        if self.fail_on is not None and self.fail_on in texts:
+            raise RuntimeError("lote inválido")
+        tokens = self.tokenizer(texts, truncation=truncation, max_length=max_length)
+        if any(len(words) > 512 for words in tokens):
+            raise ValueError("La entrada supera el largo máximo del modelo")
+        return self.model(tokens)
+
+
+def make_articles(lengths):
+    return [{'text': " ".join(["word"] * length), 'source': f"fuente{k}", 'title': f"titulo{k}"}
+            for k, length in enumerate(lengths)]
+
+
+def test_batches_preserve_article_order():
+    articles = make_articles([3, 4, 5, 6, 7, 8, 9])
+    pipeline = StubPipeline()
+    scored = score_articles(pipeline, articles, batch_size=3)
+
+    assert [len(call['texts']) for call in pipeline.calls] == [3, 3, 1]
+    assert all(call['batch_size'] == 3 for call in pipeline.calls)
+    assert [article['title'] for article, _ in scored] == [article['title'] for article in articles]
+    for article, sentiment in scored:
+        expected = LABELS[len(article['text'].split()) % 3]
+        assert sentiment['sentiment'] == expected
+        assert sentiment['confidence'] == 0.8
+        assert sentiment[f'{expected}_score'] == 0.8
+        assert sentiment['source'] == article['source']
+
+
+def test_long_articles_are_truncated_to_model_length():
+    articles = make_articles([10, 2000, 513])
+    pipeline = StubPipeline()
+    scored = score_articles(pipeline, articles, batch_size=16)
+
+    assert all(call['truncation'] and call['max_length'] == 512 for call in pipeline.calls)
+    assert len(scored) == 3
+    # Los textos largos se clasifican con sus primeros 512 tokens
+    assert scored[1][1]['sentiment'] == scored[2][1]['sentiment'] == LABELS[512 % 3]
+
+
+def test_failed_batch_is_skipped_without_reordering():
+    articles = make_articles([3, 4, 5, 6, 7])
+    pipeline = StubPipeline(fail_on=articles[2]['text'])
+    scored = score_articles(pipeline, articles, batch_size=2)
+
+    assert [article['title'] for article, _ in scored] == ['titulo0', 'titulo1', 'titulo4']
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import news_analysis
+from news_client import fetch_news
+
+
+class StubNewsAPI:
+    """
+    Servidor de NewsAPI de prueba en un hilo propio (fetch_news usa asyncio.run).
+    Cada búsqueda (`q`) tiene `total` artículos y `failures` respuestas de error
+    antes de la primera válida; registra las requests recibidas.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.failures = {}
+        self.requests = []
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    async def handle(self, request):
+        query = request.query
+        self.requests.append((time.monotonic(), dict(query)))
+        pending = self.failures.get(query['q'], [])
+        if pending:
+            status = pending.pop(0)
+            return web.json_response({'status': 'error'}, status=status, headers={'Retry-After': '0'})
+        total = self.totals.get(query['q'], 0)
+        page, page_size = int(query['page']), int(query['pageSize'])
+        numbers = range((page - 1) * page_size, min(page * page_size, total))
+        return web.json_response({'status': 'ok', 'totalResults': total,
+                                  'articles': [{'title': f"{query['q']}-{n}"} for n in numbers]})
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/v2/everything', self.handle)
+        self.server = TestServer(app)
+        self._loop.run_until_complete(self.server.start_server())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return str(self.server.make_url('/v2/everything'))
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def queries(self, q):
+        return [params for _, params in self.requests if params['q'] == q]
+
+
+@pytest.fixture
+def news_api():
+    api = StubNewsAPI()
+    api.url = api.start()
+    yield api
+    api.stop()
+
+
+def fetch(api, params_by_key, **options):
+    options = dict(dict(requests_per_second=0, backoff=0.01, page_size=10), **options)
+    return fetch_news("test-key", api.url, params_by_key, **options)
+
+
+def test_pagination_collects_every_page(news_api):
+    news_api.totals = {'AAPL': 25, 'MSFT': 20}
+    result = fetch(news_api, {'a': {'q': 'AAPL'}, 'm': {'q': 'MSFT'}})
+
+    assert [article['title'] for article in result['a']] == [f"AAPL-{n}" for n in range(25)]
+    assert [int(params['page']) for params in news_api.queries('AAPL')] == [1, 2, 3]
+    # La última página llena coincide con totalResults: no se pide una página vacía
+    assert len(result['m']) == 20 and len(news_api.queries('MSFT')) == 2
+    assert all(params['apiKey'] == "test-key" for _, params in news_api.requests)
+
+
+def test_pagination_stops_at_max_pages(news_api):
+    news_api.totals = {'AAPL': 100}
+    result = fetch(news_api, {'a': {'q': 'AAPL'}}, max_pages=2)
+    assert len(result['a']) == 20 and len(news_api.queries('AAPL')) == 2
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_retries_transient_errors(news_api, status):
+    news_api.totals = {'AAPL': 5}
+    news_api.failures = {'AAPL': [status, status]}
+    result = fetch(news_api, {'a': {'q': 'AAPL'}})
+    assert len(result['a']) == 5
+    assert len(news_api.queries('AAPL')) == 3
+
+
+def test_gives_up_after_max_retries(news_api):
+    news_api.totals = {'AAPL': 5}
+    news_api.failures = {'AAPL': [500] * 10}
+    result = fetch(news_api, {'a': {'q': 'AAPL'}}, max_retries=2)
+    assert result == {'a': None}
+    assert len(news_api.queries('AAPL')) == 3
+
+
+def test_client_errors_are_not_retried(news_api):
+    news_api.failures = {'AAPL': [401]}
+    result = fetch(news_api, {'a': {'q': 'AAPL'}})
+    assert result == {'a': None}
+    assert len(news_api.queries('AAPL')) == 1
+
+
+def test_rate_limit_spaces_requests(news_api):
+    news_api.totals = {f"S{k}": 1 for k in range(6)}
+    fetch(news_api, {k: {'q': f"S{k}"} for k in range(6)}, requests_per_second=20)
+
+    times = sorted(t for t, _ in news_api.requests)
+    assert len(times) == 6
+    # 6 requests a 20/s: la primera sale enseguida y las demás cada 50 ms
+    assert times[-1] - times[0] >= 5 * 0.05 * 0.9
+
+
+def test_get_news_maps_results_to_keys(news_api, monkeypatch):
+    monkeypatch.setattr(news_analysis, 'NEWS_API_KEY', "test-key")
+    monkeypatch.setattr(news_analysis, 'NEWS_API_BASE_URL', news_api.url)
+    news_api.totals = {'Apple': 3, 'Microsoft': 1}
+    news_api.failures = {'Tesla': [401]}
+
+    result = news_analysis.get_news({('AAPL', 30): {'q': 'Apple'}, ('MSFT', 30): {'q': 'Microsoft'},
+                                     ('TSLA', 30): {'q': 'Tesla'}})
+
+    assert set(result) == {('AAPL', 30), ('MSFT', 30), ('TSLA', 30)}
+    assert [article['title'] for article in result[('AAPL', 30)]] == ["Apple-0", "Apple-1", "Apple-2"]
+    assert [article['title'] for article in result[('MSFT', 30)]] == ["Microsoft-0"]
+    assert result[('TSLA', 30)] is None
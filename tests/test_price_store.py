@@ -0,0 +1,173 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv
+from price_store import load_prices, _is_fresh, _last_session_close, _store_path
+
+
+class FakeDownloader:
+    """Reemplaza a yfinance: devuelve las barras de `history` desde `start` y registra las llamadas"""
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def __call__(self, symbol, start):
+        self.calls.append(start)
+        return self.history[self.history.index >= pd.Timestamp(start)].copy()
+
+
+@pytest.fixture
+def history():
+    return generate_ohlcv(300, seed=1)
+
+
+def _age(path, hours):
+    past = os.path.getmtime(path) - hours * 3600
+    os.utime(path, (past, past))
+
+
+def test_first_download_saves_full_history(tmp_path, history):
+    downloader = FakeDownloader(history)
+    prices = load_prices("TEST", downloader=downloader, store_dir=tmp_path)
+    assert downloader.calls == ['1990-01-01']
+    pd.testing.assert_frame_equal(prices, history, check_freq=False)
+    assert os.path.exists(_store_path("TEST", tmp_path))
+
+
+def test_incremental_append_downloads_only_recent_bars(tmp_path, history):
+    load_prices("TEST", downloader=FakeDownloader(history.iloc[:250]), store_dir=tmp_path)
+    _age(_store_path("TEST", tmp_path), 24)
+
+    downloader = FakeDownloader(history)
+    prices = load_prices("TEST", downloader=downloader, store_dir=tmp_path, max_age_hours=12)
+    # Se pide desde la anteúltima barra guardada (cerrada), no el historial completo
+    assert downloader.calls == [history.index[248].strftime('%Y-%m-%d')]
+    pd.testing.assert_frame_equal(prices, history, check_freq=False)
+
+
+def test_partial_last_bar_is_replaced_without_full_reload(tmp_path, history):
+    partial = history.iloc[:250].copy()
+    partial.iloc[-1, partial.columns.get_loc('Close')] *= 1.05  # barra intradía parcial
+    load_prices("TEST", downloader=FakeDownloader(partial), store_dir=tmp_path)
+    _age(_store_path("TEST", tmp_path), 24)
+
+    downloader = FakeDownloader(history)
+    prices = load_prices("TEST", downloader=downloader, store_dir=tmp_path, max_age_hours=12)
+    assert len(downloader.calls) == 1
+    pd.testing.assert_frame_equal(prices, history, check_freq=False)
+
+
+def test_empty_download_keeps_stored_prices(tmp_path, history):
+    load_prices("TEST", downloader=FakeDownloader(history), store_dir=tmp_path)
+    path = _store_path("TEST", tmp_path)
+    _age(path, 24)
+
+    prices = load_prices("TEST", downloader=lambda symbol, start: pd.DataFrame(), store_dir=tmp_path,
+                         max_age_hours=12)
+    pd.testing.assert_frame_equal(prices, history, check_freq=False)
+    # Se marca como actualizado para no volver a consultar la red enseguida
+    assert (pd.Timestamp.now().timestamp() - os.path.getmtime(path)) < 60
+
+
+def test_revised_history_triggers_full_reload(tmp_path, history):
+    load_prices("TEST", downloader=FakeDownloader(history.iloc[:250]), store_dir=tmp_path)
+    _age(_store_path("TEST", tmp_path), 24)
+
+    adjusted = history.copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] *= 0.98  # dividendo: todo el historial ajustado
+    downloader = FakeDownloader(adjusted)
+    prices = load_prices("TEST", downloader=downloader, store_dir=tmp_path, max_age_hours=12)
+    assert downloader.calls[-1] == '1990-01-01'
+    assert np.allclose(prices['Close'], adjusted['Close'])
+
+
+def test_recent_store_skips_download(tmp_path, history):
+    load_prices("TEST", downloader=FakeDownloader(history), store_dir=tmp_path)
+    downloader = FakeDownloader(history)
+    prices = load_prices("TEST", downloader=downloader, store_dir=tmp_path, max_age_hours=12)
+    assert downloader.calls == []
+    pd.testing.assert_frame_equal(prices, history, check_freq=False)
+
+
+def _set_mtime(path, timestamp):
+    seconds = pd.Timestamp(timestamp).timestamp()
+    os.utime(path, (seconds, seconds))
+
+
+def test_last_session_close_skips_weekends_and_open_sessions():
+    # Martes 15:00 en Nueva York: la última sesión cerrada es la del lunes
+    tuesday = pd.Timestamp('2024-03-05 15:00', tz='America/New_York').tz_convert('UTC')
+    assert _last_session_close(tuesday) == pd.Timestamp('2024-03-04 16:00', tz='America/New_York')
+    # Domingo: la del viernes
+    sunday = pd.Timestamp('2024-03-10 12:00', tz='America/New_York').tz_convert('UTC')
+    assert _last_session_close(sunday) == pd.Timestamp('2024-03-08 16:00', tz='America/New_York')
+
+
+def test_partial_last_bar_is_not_fresh(tmp_path):
+    stored = generate_ohlcv(5, start='2024-03-01')  # última barra: jueves 7/3
+    path = tmp_path / "TEST.parquet"
+    stored.to_parquet(path)
+    at = lambda text: pd.Timestamp(text, tz='America/New_York').tz_convert('UTC')
+
+    # Guardado a las 10:00 con la sesión abierta: a las 17:00 la barra ya cerró y hay que refrescar
+    _set_mtime(path, at('2024-03-07 10:00'))
+    assert not _is_fresh(stored, path, 12, now=at('2024-03-07 11:00'))
+    assert not _is_fresh(stored, path, 12, now=at('2024-03-07 17:00'))
+    # Guardado después del cierre: vale hasta que cierre la próxima sesión
+    _set_mtime(path, at('2024-03-07 16:30'))
+    assert _is_fresh(stored, path, 12, now=at('2024-03-07 20:00'))
+    assert _is_fresh(stored, path, 24, now=at('2024-03-08 15:00'))
+    assert not _is_fresh(stored, path, 48, now=at('2024-03-08 16:30'))
+    # max_age_hours sigue limitando la edad
+    assert not _is_fresh(stored, path, 1, now=at('2024-03-07 20:00'))
+
+
+def test_empty_full_reload_keeps_store(tmp_path, history):
+    load_prices("TEST", downloader=FakeDownloader(history.iloc[:250]), store_dir=tmp_path)
+    _age(_store_path("TEST", tmp_path), 24)
+
+    adjusted = history.copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] *= 0.98
+
+    def downloader(symbol, start):
+        # La descarga incremental detecta el ajuste, pero la completa falla
+        return adjusted[adjusted.index >= pd.Timestamp(start)] if start != '1990-01-01' else pd.DataFrame()
+
+    prices = load_prices("TEST", downloader=downloader, store_dir=tmp_path, max_age_hours=12)
+    pd.testing.assert_frame_equal(prices, history.iloc[:250], check_freq=False)
+    stored = pd.read_parquet(_store_path("TEST", tmp_path))
+    pd.testing.assert_frame_equal(stored, history.iloc[:250], check_freq=False)
+
+
+def test_concurrent_loads_of_the_same_symbol(tmp_path, history):
+    # Dos workers del pool refrescan el mismo símbolo a la vez
+    errors = []
+    results = []
+
+    def load():
+        try:
+            for _ in range(10):
+                path = _store_path("TEST", tmp_path)
+                if os.path.exists(path):
+                    _age(path, 24)
+                results.append(load_prices("TEST", downloader=FakeDownloader(history), store_dir=tmp_path,
+                                           max_age_hours=12))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    for prices in results:
+        pd.testing.assert_frame_equal(prices, history, check_freq=False)
+    assert os.listdir(tmp_path) == ["TEST.parquet"]
+    pd.testing.assert_frame_equal(pd.read_parquet(_store_path("TEST", tmp_path)), history, check_freq=False)
@@ -0,0 +1,74 @@
+import pytest
+
+import sentiment_cache
+from sentiment_cache import ArticleSentimentCache, article_key
+
+
+def scores(label='positive', value=0.8):
+    return {'sentiment': label, 'confidence': value, 'positive_score': value,
+            'negative_score': 0.1, 'neutral_score': 0.1}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sentiment_cache.time, 'time', clock)
+    return clock
+
+
+def test_round_trip(tmp_path):
+    cache = ArticleSentimentCache(path=str(tmp_path / "cache.sqlite"))
+    cache.put_many([("a", scores()), ("b", scores('negative', 0.6))], "model")
+    assert cache.get_many(["a", "b", "missing", "a"]) == {'a': scores(), 'b': scores('negative', 0.6)}
+    cache.clear()
+    assert cache.get_many(["a", "b"]) == {}
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = ArticleSentimentCache(path=str(tmp_path / "cache.sqlite"), ttl_days=1)
+    cache.put_many([("old", scores())], "model")
+    clock.now += 12 * 3600
+    cache.put_many([("new", scores())], "model")
+
+    clock.now += 13 * 3600
+    # "old" tiene 25 horas: vencida aunque todavía esté en la base
+    assert cache.get_many(["old", "new"]) == {'new': scores()}
+
+    # El próximo put elimina las vencidas
+    cache.put_many([("other", scores())], "model")
+    clock.now -= 25 * 3600
+    assert set(cache.get_many(["old", "new", "other"])) == {"new", "other"}
+
+
+def test_lru_eviction_at_max_entries(tmp_path, clock):
+    cache = ArticleSentimentCache(path=str(tmp_path / "cache.sqlite"), max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.put_many([(key, scores())], "model")
+        clock.now += 1
+    # Leer "a" la marca como usada recientemente: la menos usada pasa a ser "b"
+    cache.get_many(["a"])
+    clock.now += 1
+    cache.put_many([("d", scores())], "model")
+
+    assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+
+
+def test_article_key_depends_on_title_content_and_model():
+    base = article_key("Título", "Contenido", "ProsusAI/finbert")
+    assert article_key("Título", "Contenido", "ProsusAI/finbert") == base
+    assert article_key("Título", None, "m") == article_key("Título", "", "m")
+    variants = {base, article_key("Otro título", "Contenido", "ProsusAI/finbert"),
+                article_key("Título", "Otro contenido", "ProsusAI/finbert"),
+                article_key("Título", "Contenido", "otro/modelo"),
+                # El separador evita que se mezclen título y contenido
+                article_key("TítuloCont", "enido", "ProsusAI/finbert")}
+    assert len(variants) == 5
+    assert len(base) == 64
@@ -0,0 +1,172 @@
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic import generate_ohlcv
+from data_from_stock import FeatureMatrix, prepare_training_data
+from model_cache import ModelCache
+import news_analysis
+from stock_analysis import (backtest, BacktestCancelled, CancellationToken, _fit_predict_fold,
+                            _process_cancel_token, sentiment_overrides)
+
+
+def synthetic_matrix(rows=900, features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.5, size=rows) > 0).astype(np.int64)
+    index = pd.bdate_range('1995-01-02', periods=rows, name='Date')
+    return FeatureMatrix(X, y, index, [f"f{k}" for k in range(features)])
+
+
+def tree_seeds(model):
+    return [tree.random_state for tree in model.estimators_]
+
+
+def test_warm_start_keeps_seed_diversity_across_folds():
+    matrix = synthetic_matrix()
+    model = RandomForestClassifier(n_estimators=20, min_samples_split=20, random_state=1)
+    seen = []
+    backtest(matrix, model, matrix.predictors, start=300, step=100, mode="warm_start",
+             trees_per_step=10, progress=lambda info: seen.append(tree_seeds(model)))
+
+    assert len(seen) == 6
+    for seeds in seen:
+        # Cada paso conserva un bosque de 20 árboles con semillas distintas
+        assert len(seeds) == 20
+        assert len(set(seeds)) == 20
+    grown = seen[0] + [seed for seeds in seen[1:] for seed in seeds[-10:]]
+    assert len(set(grown)) == len(grown)
+    # El modelo vuelve a quedar con sus parámetros originales
+    assert model.random_state == 1 and model.n_estimators == 20
+
+
+def test_cached_models_keep_caller_params(tmp_path):
+    matrix = synthetic_matrix(rows=500)
+    cache = ModelCache(directory=str(tmp_path))
+    first = backtest(matrix, RandomForestClassifier(n_estimators=10, random_state=1, n_jobs=2, verbose=0),
+                     matrix.predictors, start=300, step=100, model_cache=cache)
+
+    # n_jobs y verbose no son parte de la clave: el modelo del cache se reutiliza
+    model = RandomForestClassifier(n_estimators=10, random_state=1, n_jobs=1, verbose=0)
+    seen = []
+    second = backtest(matrix, model, matrix.predictors, start=300, step=100, model_cache=cache,
+                      progress=lambda info: seen.append((info['cached'], model.n_jobs)))
+
+    assert seen == [(True, 1), (True, 1)]
+    assert model.n_jobs == 1 and model.verbose == 0
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_process_cancel_token_mirrors_cancellation():
+    token = CancellationToken()
+    with _process_cancel_token(token, poll_seconds=0.01) as worker_token:
+        # Se envía a los workers de joblib, así que tiene que poder serializarse
+        worker_token = pickle.loads(pickle.dumps(worker_token))
+        assert not worker_token.cancelled
+        token.cancel()
+        deadline = time.monotonic() + 5
+        while not worker_token.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert worker_token.cancelled
+    assert not os.path.exists(os.path.dirname(worker_token._event.path))
+
+
+def test_fold_fit_stops_when_cancelled():
+    matrix = synthetic_matrix(rows=500)
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(BacktestCancelled):
+        _fit_predict_fold(0, RandomForestClassifier(n_estimators=100), matrix.X, matrix.y, 400,
+                          matrix.X[400:], False, token)
+
+
+def test_parallel_backtest_cancels_running_fits():
+    matrix = synthetic_matrix(rows=12000, features=20)
+    model = RandomForestClassifier(n_estimators=2000, random_state=1, n_jobs=1)
+    token = CancellationToken()
+    timer = threading.Timer(1.0, token.cancel)
+    start = time.perf_counter()
+    timer.start()
+    try:
+        with pytest.raises(BacktestCancelled):
+            backtest(matrix, model, matrix.predictors, start=10000, step=1000, n_jobs=2, cancel_token=token)
+    finally:
+        timer.cancel()
+    # Cada fit completo tarda bastante más: se cortó en medio de los árboles
+    assert time.perf_counter() - start < 15
+
+
+def test_parallel_progress_reports_each_fold_with_its_fit_time():
+    matrix = synthetic_matrix(rows=900)
+    reports = []
+    backtest(matrix, RandomForestClassifier(n_estimators=20, random_state=1, n_jobs=1), matrix.predictors,
+             start=300, step=100, n_jobs=2, progress=reports.append)
+
+    assert sorted(report['fold'] for report in reports) == list(range(1, 7))
+    assert [report['completed'] for report in reports] == list(range(1, 7))
+    # Cada paso informa su propio tiempo en el worker, no la espera entre resultados
+    assert all(report['seconds'] > 0 and not report['cached'] for report in reports)
+
+
+def test_parallel_backtest_matches_serial():
+    stockData, predictors = prepare_training_data(generate_ohlcv(2000, seed=7))
+    matrix = FeatureMatrix.from_frame(stockData, predictors)
+
+    def run(n_jobs):
+        model = RandomForestClassifier(n_estimators=30, min_samples_split=50, random_state=1, n_jobs=1)
+        return backtest(matrix, model, predictors, start=600, step=100, n_jobs=n_jobs)
+
+    serial = run(1)
+    assert len(serial) == len(matrix) - 600
+    pd.testing.assert_frame_equal(run(2), serial)
+
+
+def per_row_sentiment(test_dates, stockSymbol):
+    """Búsqueda fila por fila del backtest original (sentiment_analysis con max_date = t-1)"""
+    current_date = pd.Timestamp.now().tz_localize(None)
+    earliest_news_date = current_date - pd.Timedelta(days=30)
+    latest_news_date = current_date - pd.Timedelta(days=1)
+    applied = {}
+    for test_date in test_dates:
+        if earliest_news_date <= test_date <= latest_news_date:
+            max_news_date = (test_date - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+            if pd.to_datetime(max_news_date) <= latest_news_date:
+                pos, neg, neu, _ = news_analysis.sentiment_analysis(stockSymbol, max_date=max_news_date)
+                if pos > 0:
+                    applied[test_date] = (pos, neg, neu)
+    return applied
+
+
+def test_sentiment_join_matches_per_row_lookup():
+    today = pd.Timestamp.now().normalize()
+    news = {}
+    for days_ago in (1, 2, 4, 5, 9, 16, 17, 29, 31, 40):
+        day = today - pd.Timedelta(days=days_ago)
+        news[day.strftime('%Y-%m-%d')] = (0.1 + days_ago / 100, 0.2, 0.7 - days_ago / 100, days_ago)
+    # Noticias de un fin de semana: las usa el lunes siguiente (t-1 es el domingo)
+    sunday = today - pd.Timedelta(days=(today.weekday() + 1) % 7 + 7)
+    news[sunday.strftime('%Y-%m-%d')] = (0.9, 0.05, 0.05, 3)
+
+    news_analysis.clear_sentiment_cache()
+    news_analysis.set_bulk_news("TEST", news)
+    try:
+        test_dates = pd.date_range(today - pd.Timedelta(days=45), today + pd.Timedelta(days=3), freq='D')
+        apply_mask, sentiment_values = sentiment_overrides(test_dates, "TEST", None)
+        expected = per_row_sentiment(test_dates, "TEST")
+    finally:
+        news_analysis.clear_sentiment_cache()
+
+    assert [date for date, applied in zip(test_dates, apply_mask) if applied] == list(expected)
+    for k, date in enumerate(test_dates):
+        if date in expected:
+            assert tuple(sentiment_values[k]) == expected[date]
+    monday = sunday + pd.Timedelta(days=1)
+    assert expected[monday] == (0.9, 0.05, 0.05)
+    # Días sin noticias dentro del período: relleno neutro (0.33, 0.33, 0.34)
+    assert (0.33, 0.33, 0.34) in expected.values()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv
+from technical_indicators import INDICATOR_COLUMNS, TechnicalIndicatorEngine
+
+
+def pandas_indicators(stockData):
+    """Implementación original con pandas (fila por fila para OBV), usada como referencia"""
+    out = pd.DataFrame(index=stockData.index)
+    close, high, low, volume = stockData['Close'], stockData['High'], stockData['Low'], stockData['Volume']
+
+    def rsi(prices, window):
+        delta = prices.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+        return 100 - (100 / (1 + gain / loss))
+
+    for window in (14, 7, 30):
+        out[f'RSI_{window}'] = rsi(close, window)
+
+    out['MACD'] = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+    out['MACD_Signal'] = out['MACD'].ewm(span=9).mean()
+    out['MACD_Histogram'] = out['MACD'] - out['MACD_Signal']
+    out['MACD_Ratio'] = out['MACD'] / close
+    out['MACD_Signal_Ratio'] = out['MACD_Signal'] / close
+
+    sma20 = close.rolling(window=20).mean()
+    std20 = close.rolling(window=20).std()
+    out['BB_Upper'] = sma20 + (std20 * 2)
+    out['BB_Lower'] = sma20 - (std20 * 2)
+    out['BB_Position'] = (close - out['BB_Lower']) / (out['BB_Upper'] - out['BB_Lower'])
+    out['BB_Width'] = (out['BB_Upper'] - out['BB_Lower']) / sma20
+
+    low_min = low.rolling(window=14).min()
+    high_max = high.rolling(window=14).max()
+    out['Stoch_K'] = 100 * (close - low_min) / (high_max - low_min)
+    out['Stoch_D'] = out['Stoch_K'].rolling(window=3).mean()
+    out['Williams_R'] = -100 * (high_max - close) / (high_max - low_min)
+
+    true_range = pd.concat([high - low, np.abs(high - close.shift()), np.abs(low - close.shift())],
+                           axis=1).max(axis=1)
+    out['ATR_14'] = true_range.rolling(window=14).mean()
+    out['ATR_Ratio'] = out['ATR_14'] / close
+
+    typical_price = (high + low + close) / 3
+    sma_tp = typical_price.rolling(window=20).mean()
+    mad = typical_price.rolling(window=20).apply(lambda x: np.mean(np.abs(x - x.mean())))
+    out['CCI'] = (typical_price - sma_tp) / (0.015 * mad)
+
+    money_flow = typical_price * volume
+    positive_flow = money_flow.where(typical_price > typical_price.shift(), 0).rolling(14).sum()
+    negative_flow = money_flow.where(typical_price < typical_price.shift(), 0).rolling(14).sum()
+    out['MFI'] = 100 - (100 / (1 + positive_flow / negative_flow))
+
+    obv = []
+    obv_value = 0
+    for i in range(len(stockData)):
+        if i == 0:
+            obv_value = volume.iloc[i]
+        elif close.iloc[i] > close.iloc[i - 1]:
+            obv_value += volume.iloc[i]
+        elif close.iloc[i] < close.iloc[i - 1]:
+            obv_value -= volume.iloc[i]
+        obv.append(obv_value)
+    out['OBV'] = obv
+    out['OBV_Ratio'] = out['OBV'] / out['OBV'].rolling(20).mean()
+
+    for periods in (5, 10, 20):
+        out[f'Momentum_{periods}'] = close / close.shift(periods) - 1
+        out[f'ROC_{periods}'] = close.pct_change(periods=periods) * 100
+    return out[INDICATOR_COLUMNS]
+
+
+@pytest.fixture(scope='module')
+def prices():
+    return generate_ohlcv(600, seed=3)
+
+
+def test_chunked_update_matches_full_pass(prices):
+    full = TechnicalIndicatorEngine().update(prices)
+
+    engine = TechnicalIndicatorEngine()
+    bounds = [0, 1, 7, 45, 46, 300, 599, 600]
+    chunks = [engine.update(prices.iloc[a:b]) for a, b in zip(bounds, bounds[1:])]
+    chunked = pd.concat(chunks)
+
+    assert chunked.index.equals(full.index)
+    for column in INDICATOR_COLUMNS:
+        # Idéntico bit a bit, incluidos los NaN del período de calentamiento
+        assert np.array_equal(chunked[column].to_numpy(), full[column].to_numpy(), equal_nan=True), column
+
+
+@pytest.mark.parametrize("rows, seed", [(600, 3), (8000, 1), (8000, 2), (8000, 3)])
+def test_matches_original_pandas_implementation(rows, seed):
+    prices = generate_ohlcv(rows, seed=seed)
+    expected = pandas_indicators(prices)
+    result = TechnicalIndicatorEngine().update(prices)
+    for column in INDICATOR_COLUMNS:
+        # La suma corrida de pandas acumula redondeo: con 8000 filas la mayor diferencia
+        # absoluta observada es ~2e-10 (BB_Upper); en relativo no sirve porque
+        # BB_Position pasa por cero (hasta ~4e-8)
+        np.testing.assert_allclose(result[column].to_numpy(), expected[column].to_numpy(),
+                                   rtol=0, atol=5e-10, equal_nan=True, err_msg=column)
+
+
+def test_out_of_order_rows_raise(prices):
+    engine = TechnicalIndicatorEngine()
+    engine.update(prices.iloc[:100])
+    with pytest.raises(ValueError):
+        engine.update(prices.iloc[50:120])
+    with pytest.raises(ValueError):
+        engine.update(prices.iloc[99:100])